@@ -1,13 +1,15 @@
 import os
 import logging
 import warnings
-from datetime import datetime
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-import pinecone
-from pinecone import Pinecone, ServerlessSpec
-import google.generativeai as genai
-from google.generativeai import GenerativeModel
+
+import model_registry
+import retrieval
+import context_builder
+import interview_metrics
+import vector_store
+import summary_engine
+from summary_output import create_output_and_save_summary
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -16,96 +18,16 @@ logging.getLogger('pinecone').setLevel(logging.CRITICAL)
 # Load environment variables
 load_dotenv()
 
-def create_output_and_save_summary(base_path, summary_text, filename="active_listening_summary.txt"):
-    """
-    Creates the 'outputs' directory if it doesn't exist and saves the communication analysis summary to the specified file.
-    This file will be overwritten each time the function is called.
-    """
-    # Define the output directory path
-    output_dir = os.path.join(base_path, 'outputs')
-
-    # Check if the directory exists, if not, create it
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # Define the path for the summary file (fixed filename)
-    summary_file_path = os.path.join(output_dir, filename)
-
-    # Write the summary_text to the file (overwrites the file each time)
-    try:
-        with open(summary_file_path, 'w', encoding='utf-8') as file:
-            file.write(summary_text)
-        print(f"Summary successfully saved at: {summary_file_path}")
-    except Exception as e:
-        print(f"Error saving the summary: {e}")
+# Retrieval query used for this analysis
+ACTIVE_LISTENING_QUERY = "Can you evaluate the candidate's active listening skills during the interview?"
 
-    return summary_file_path  # Return the path in case it's needed later
+# Measured timing metrics added to the prompt
+TIMING_METRICS = ['interruptions_made', 'interruptions_received', 'response_latency_seconds']
 
+# Number of matches retrieved from each index
+RETRIEVAL_TOP_K = {vector_store.CANDIDATE_INDEX_NAME: 10, vector_store.INTERVIEWER_INDEX_NAME: 10, vector_store.MAIN_INDEX_NAME: 10}
 
-def init_pinecone(PINECONE_API_KEY, index_dimension):
-    """
-    Initializes Pinecone and returns the candidate and interviewer indexes.
-    """
-    # Create a Pinecone instance
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-
-    # Define index names
-    candidate_index_name = "candidate-index"
-    interviewer_index_name = "interviewer-index"
-
-    # Check if the indexes exist, if not create them
-    if candidate_index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=candidate_index_name,
-            dimension=index_dimension,
-            metric='cosine',
-            spec=ServerlessSpec(
-                cloud='aws',
-                region='us-west-2'
-            )
-        )
-
-    if interviewer_index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=interviewer_index_name,
-            dimension=index_dimension,
-            metric='cosine',
-            spec=ServerlessSpec(
-                cloud='aws',
-                region='us-west-2'
-            )
-        )
-
-    # Return the initialized indexes
-    return pc.Index(candidate_index_name), pc.Index(interviewer_index_name)
-
-def retrieve_relevant_segments(query, index, embedding_model, top_k=10):
-    """
-    Retrieves the top-k relevant segments from Pinecone based on the query.
-    """
-    try:
-        query_embedding = embedding_model.encode(query).tolist()
-
-        result = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-        return result['matches']
-    except Exception as e:
-        print(f"Retrieval error: {e}")
-        return []
-
-def prepare_context(retrieved_segments):
-    """
-    Prepares the context for the summary generation.
-    """
-    context = ""
-    for match in retrieved_segments:
-        context += match['metadata'].get('text', '') + "\n"
-    return context
-
-def construct_prompt(candidate_context, interviewer_context, main_context):
+def construct_prompt(candidate_context, interviewer_context, main_context, timing=""):
     """
     Constructs a prompt for the Gemini model for active listening analysis.
     """
@@ -118,7 +40,7 @@ Your task is to evaluate the following candidate-related interview context and p
 3. **Responsiveness**: Did the candidate respond appropriately to the interviewer's questions and comments?
 4. **Flow of Communication**: Was the conversation smooth, or did the candidate's responses indicate a lack of attention or understanding?
 
-**Candidate Context (Candidate's Speech):**
+{timing}**Candidate Context (Candidate's Speech):**
 {candidate_context}
 
 **Interviewer Context (Interviewer's Speech):**
@@ -137,28 +59,41 @@ Please ensure that your response is detailed and addresses each of the key point
 """
     return prompt
 
-def generate_active_listening_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension):
+def prompt_from_matches(matches, metrics=None):
     """
-    Generate summary of Active Listening based on attentiveness and interruptions and save to outputs/active_listening_summary.txt.
+    Builds the Active Listening prompt from the matches retrieved from each index
+    and, when available, the measured interview metrics.
     """
-    # Initialize Pinecone index for candidate and interviewer data
-    candidate_index, interviewer_index = init_pinecone(PINECONE_API_KEY, embedding_dimension)
+    # Prepare context; a sentence found in several indexes is only sent once
+    contexts = context_builder.build_contexts([
+        (name, matches[name]) for name in (vector_store.CANDIDATE_INDEX_NAME, vector_store.INTERVIEWER_INDEX_NAME,
+                                           vector_store.MAIN_INDEX_NAME)
+    ])
+    candidate_context = contexts[vector_store.CANDIDATE_INDEX_NAME]
+    interviewer_context = contexts[vector_store.INTERVIEWER_INDEX_NAME]
+    main_context = contexts[vector_store.MAIN_INDEX_NAME]
 
-    # Retrieve relevant segments from the candidate and interviewer indexes
-    relevant_candidate = retrieve_relevant_segments(query, candidate_index, embedding_model)
-    relevant_interviewer = retrieve_relevant_segments(query, interviewer_index, embedding_model)
-
-    # Retrieve full discussion context (main index)
-    full_discussion_index = init_pinecone(PINECONE_API_KEY, embedding_dimension)[0]  # Use any index for full context
-    relevant_main_context = retrieve_relevant_segments(query, full_discussion_index, embedding_model)
+    # Construct prompt for Gemini model
+    timing = interview_metrics.prompt_section(metrics, TIMING_METRICS)
+    return construct_prompt(candidate_context, interviewer_context, main_context, timing)
 
-    # Prepare context
-    candidate_context = prepare_context(relevant_candidate)
-    interviewer_context = prepare_context(relevant_interviewer)
-    main_context = prepare_context(relevant_main_context)
+def build_active_listening_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID, metrics=None):
+    """
+    Retrieves the candidate, interviewer and full interview context and builds the Active Listening
+    prompt, with the measured interview metrics when given.
+    """
+    matches = retrieval.retrieve(
+        {'active_listening': {'query': query, 'top_k': RETRIEVAL_TOP_K}},
+        embedding_dimension, interview_id, PINECONE_API_KEY, embedding_model
+    )['active_listening']
+    return prompt_from_matches(matches, metrics)
 
-    # Construct prompt for Gemini model
-    prompt = construct_prompt(candidate_context, interviewer_context, main_context)
+def generate_active_listening_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID):
+    """
+    Generate summary of Active Listening based on attentiveness and interruptions and save to outputs/active_listening_summary.txt.
+    """
+    prompt = build_active_listening_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id,
+                                           summary_engine.load_measured_metrics(project_base_path))
 
     try:
         # Generate summary
@@ -166,7 +101,7 @@ def generate_active_listening_summary(query, PINECONE_API_KEY, project_base_path
         summary = response.text
 
         # Save summary to outputs/active_listening_summary.txt (overwrite existing file)
-        summary_file_path = create_output_and_save_summary(project_base_path, summary)
+        summary_file_path = create_output_and_save_summary(project_base_path, summary, 'active_listening_summary.txt')
 
         print(f"Active Listening Summary saved to: {summary_file_path}")
         return summary
@@ -182,15 +117,9 @@ def main():
     project_base_path = os.path.dirname(os.path.abspath(__file__))
     project_base_path = os.path.dirname(project_base_path)  # Go up one level to project root
 
-    # Configure Gemini API
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    genai.configure(api_key=GOOGLE_API_KEY)
-
-    # Initialize Gemini models
-    gemini_model = GenerativeModel("gemini-pro")
-
-    # Load SentenceTransformer model for embeddings
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    # Gemini and SentenceTransformer models are shared through the model registry
+    gemini_model = model_registry.get_gemini_model()
+    embedding_model = model_registry.get_sentence_transformer()
 
     # Define embedding dimension
     embedding_dimension = embedding_model.get_sentence_embedding_dimension()
@@ -199,7 +128,7 @@ def main():
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 
     # Example query
-    query = "Can you evaluate the candidate's active listening skills during the interview?"
+    query = ACTIVE_LISTENING_QUERY
 
     # Generate and save active listening summary
     summary = generate_active_listening_summary(
@@ -0,0 +1,57 @@
+import os
+import numpy as np
+
+# Every stage works on 16 kHz mono float32 audio (what Whisper expects)
+SAMPLE_RATE = 16000
+
+# Bytes read from ffmpeg's stdout per chunk
+CHUNK_SIZE = 1 << 20
+
+
+def decode_audio(input_path, sr=SAMPLE_RATE, mmap_path=None):
+    """
+    Decodes any audio or video file once with ffmpeg, streaming the raw PCM
+    output straight into a float32 NumPy buffer.
+
+    Args:
+    - input_path (str): Audio or video file to decode.
+    - sr (int): Target sampling rate.
+    - mmap_path (str, optional): If given, the samples are streamed to this raw
+      float32 file and returned as a read-only memory map instead of being held in RAM.
+
+    Returns:
+    - numpy.ndarray: Mono float32 samples in [-1, 1].
+    """
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f"Audio source not found: {input_path}")
+
+    import ffmpeg
+
+    process = (
+        ffmpeg.input(input_path)
+        .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=sr)
+        .global_args('-nostdin', '-loglevel', 'error')
+        .run_async(pipe_stdout=True)
+    )
+
+    if mmap_path:
+        os.makedirs(os.path.dirname(mmap_path), exist_ok=True)
+        with open(mmap_path, 'wb') as file:
+            for chunk in iter(lambda: process.stdout.read(CHUNK_SIZE), b''):
+                file.write(chunk)
+    else:
+        buffer = bytearray()
+        for chunk in iter(lambda: process.stdout.read(CHUNK_SIZE), b''):
+            buffer += chunk
+
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed to decode: {input_path}")
+
+    if mmap_path:
+        if os.path.getsize(mmap_path) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(mmap_path, dtype=np.float32, mode='r')
+    # Whole float32 samples only; frombuffer shares the bytearray's memory
+    usable = len(buffer) - len(buffer) % 4
+    return np.frombuffer(buffer, dtype=np.float32, count=usable // 4)
+
@@ -1,7 +1,8 @@
 import os
-import librosa
-import soundfile as sf
-from pyAudioAnalysis import audioSegmentation as aS
+import numpy as np
+from audio_io import SAMPLE_RATE
+import metrics
+from diarization_backends import DIARIZATION_SPEAKERS, get_backend
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning)  # Ignore general UserWarnings
@@ -17,52 +18,119 @@ def segment_audio(input_audio, sr, start, end):
     return input_audio[start_sample:end_sample]
 
 
-def separate_speakers(audio_path, speaker1_output_path, speaker2_output_path):
+def save_diarization(segments, output_path):
+    """
+    Saves diarization segments to a .npy file.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    np.save(output_path, segments)
+
+
+def load_diarization(input_path):
+    """
+    Loads diarization segments saved by save_diarization.
+    """
+    return np.load(input_path)
+
+
+def split_by_speaker(y, sr, segments):
+    """
+    Builds one contiguous audio track per speaker from the diarization segments.
+
+    Each track is a single concatenation of array slices, so memory stays close
+    to the size of the decoded audio.
+
+    Args:
+    - y (numpy.ndarray): Decoded audio samples.
+    - sr (int): Sampling rate of `y`.
+    - segments (numpy.ndarray): Diarization segments (DIARIZATION_DTYPE).
+
+    Returns:
+    - dict: Speaker label -> numpy.ndarray of that speaker's samples.
+    """
+    tracks = {}
+    for label in np.unique(segments['speaker']):
+        speaker_segments = segments[segments['speaker'] == label]
+        tracks[int(label)] = np.concatenate([
+            segment_audio(y, sr, start, end)
+            for start, end in zip(speaker_segments['start'], speaker_segments['end'])
+        ])
+    return tracks
+
+
+def speaker_output_path(speaker_output_paths, label):
+    """
+    Returns where a speaker's audio is written: its entry in `speaker_output_paths`, or
+    speaker<N>.wav next to them for speakers beyond the listed ones (panel interviews).
+    """
+    if label < len(speaker_output_paths):
+        return speaker_output_paths[label]
+    return os.path.join(os.path.dirname(speaker_output_paths[0]), f'speaker{label + 1}.wav')
+
+
+def separate_speakers(audio_path, speaker_output_paths, diarization_output_path=None, n_speakers=None, audio=None,
+                      backend=None):
+    """
+    Diarizes the interview audio and writes one audio file per speaker.
+
+    Args:
+    - audio_path (str): Path to the interview audio.
+    - speaker_output_paths (list): Output path for each speaker's audio, indexed by speaker label.
+      Speakers beyond these are written as speaker<N>.wav in the same directory.
+    - diarization_output_path (str, optional): Where to save the diarization segments.
+    - n_speakers (int, optional): Number of speakers. Defaults to DIARIZATION_SPEAKERS;
+      0 lets the backend find it.
+    - audio (numpy.ndarray, optional): Already decoded 16 kHz samples of `audio_path`.
+      When given, the file is not decoded again here.
+    - backend (str, optional): Diarization backend. Defaults to DIARIZATION_BACKEND.
+
+    Returns:
+    - numpy.ndarray: Diarization segments (DIARIZATION_DTYPE), or None on failure.
+    """
     try:
-        print(f"Loading audio file from: {audio_path}...")
-        y, sr = librosa.load(audio_path, sr=16000)
-        print("Audio loaded successfully.")
-        
-        print("Performing speaker diarization...")
-        # Perform speaker diarization and get the result
-        diarization_result, _, _ = aS.speaker_diarization(audio_path, 2)  # 2 speakers
-        
-        # Create output directories if they don't exist
-        os.makedirs(os.path.dirname(speaker1_output_path), exist_ok=True)
-        os.makedirs(os.path.dirname(speaker2_output_path), exist_ok=True)
-        
-        # Initialize audio containers for each speaker
-        speaker1_audio = []
-        speaker2_audio = []
+        if n_speakers is None:
+            n_speakers = DIARIZATION_SPEAKERS
+        diarization_backend = get_backend(backend)
 
-        print("Splitting audio based on speaker diarization...")
-        segment_duration = len(y) / sr
-        segment_size = segment_duration / len(diarization_result)
-
-        # Process diarization results to separate speakers
-        for i, speaker in enumerate(diarization_result):
-            start_time = i * segment_size
-            end_time = start_time + segment_size
-            
-            if speaker == 0:
-                speaker1_audio.extend(segment_audio(y, sr, start_time, end_time))
-            elif speaker == 1:
-                speaker2_audio.extend(segment_audio(y, sr, start_time, end_time))
-
-        # Save separated audio
-        if speaker1_audio:
-            sf.write(speaker1_output_path, speaker1_audio, sr)
-            print(f"Speaker 1 audio saved to: {speaker1_output_path}")
-        else:
-            print("No audio detected for Speaker 1.")
-        
-        if speaker2_audio:
-            sf.write(speaker2_output_path, speaker2_audio, sr)
-            print(f"Speaker 2 audio saved to: {speaker2_output_path}")
+        import soundfile as sf
+
+        if audio is None:
+            # Imported here: librosa takes seconds to import
+            import librosa
+
+            print(f"Loading audio file from: {audio_path}...")
+            y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
+            print("Audio loaded successfully.")
         else:
-            print("No audio detected for Speaker 2.")
+            y, sr = audio, SAMPLE_RATE
+
+        print(f"Performing speaker diarization ({diarization_backend.name})...")
+        diarization = diarization_backend.diarize(y, sr, audio_path=audio_path, n_speakers=n_speakers)
+        metrics.increment('audio_seconds_diarized', len(y) / sr)
+        speakers = np.unique(diarization['speaker'])
+        print(f"Found {len(speakers)} speaker(s) in {len(diarization)} segments.")
+
+        print("Splitting audio based on speaker diarization...")
+        tracks = split_by_speaker(y, sr, diarization)
+
+        # Save separated audio. Every listed path is written, empty when its speaker was not
+        # found (e.g. a single speaker with automatic speaker count), since later stages expect them
+        for label in sorted(set(range(len(speaker_output_paths))) | set(tracks)):
+            output_path = speaker_output_path(speaker_output_paths, label)
+            speaker_audio = tracks.get(label)
+            if speaker_audio is None or not speaker_audio.size:
+                print(f"No audio detected for Speaker {label + 1}.")
+                speaker_audio = np.zeros(0, dtype=np.float32)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            sf.write(output_path, speaker_audio, sr)
+            print(f"Speaker {label + 1} audio saved to: {output_path}")
+
+        if diarization_output_path:
+            save_diarization(diarization, diarization_output_path)
+            print(f"Diarization segments saved to: {diarization_output_path}")
 
         print("Speaker separation and saving completed.")
+        return diarization
 
     except FileNotFoundError as e:
         print(f"Error: {e}")
@@ -76,6 +144,7 @@ if __name__ == "__main__":
     audio_path = os.path.join(base_path, 'main.wav')
     speaker1_output_path = os.path.join(base_path, 'speaker1.wav')
     speaker2_output_path = os.path.join(base_path, 'speaker2.wav')
+    diarization_output_path = os.path.join(base_path, 'diarization.npy')
 
     print(audio_path)
     print(speaker1_output_path)
@@ -84,4 +153,4 @@ if __name__ == "__main__":
     if not os.path.exists(audio_path):
         print(f"Error: Audio file '{audio_path}' does not exist.")
     else:
-        separate_speakers(audio_path, speaker1_output_path, speaker2_output_path)
+        separate_speakers(audio_path, [speaker1_output_path, speaker2_output_path], diarization_output_path)
@@ -0,0 +1,247 @@
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# File extensions picked up when a directory of videos is given
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.mkv', '.avi', '.webm', '.m4v')
+
+# Rough peak memory of one pipeline worker (Whisper base + spaCy + SentenceTransformer + audio)
+DEFAULT_MEMORY_PER_WORKER_GB = 3.0
+
+
+def discover_videos(source):
+    """
+    Lists the interview videos to process.
+
+    Args:
+    - source (str): Directory of videos, or a manifest file. A manifest is either a
+      .json list of video paths or a text file with one video path per line.
+      Relative paths in a manifest are resolved against the manifest's directory.
+
+    Returns:
+    - list: Absolute paths of the videos, in a stable order.
+    """
+    if os.path.isdir(source):
+        videos = [
+            os.path.join(source, name) for name in sorted(os.listdir(source))
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        ]
+        return [os.path.abspath(video) for video in videos]
+
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Video directory or manifest not found: {source}")
+
+    with open(source, 'r', encoding='utf-8') as file:
+        if source.lower().endswith('.json'):
+            entries = json.load(file)
+            if not isinstance(entries, list):
+                raise ValueError(f"Manifest {source} must be a JSON list of video paths.")
+            for position, entry in enumerate(entries):
+                if not isinstance(entry, str):
+                    raise ValueError(f"Manifest {source}: entry {position} is not a video path: {entry!r}")
+        else:
+            entries = [line.strip() for line in file]
+
+    manifest_dir = os.path.dirname(os.path.abspath(source))
+    return [
+        os.path.abspath(os.path.join(manifest_dir, entry))
+        for entry in entries
+        if entry and not entry.startswith('#')
+    ]
+
+
+def make_interview_ids(video_paths):
+    """
+    Derives a unique, filesystem-safe interview ID from each video file name.
+    """
+    ids = []
+    seen = {}
+    for video_path in video_paths:
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        interview_id = re.sub(r'[^A-Za-z0-9_-]+', '-', stem).strip('-').lower() or 'interview'
+        count = seen.get(interview_id, 0)
+        seen[interview_id] = count + 1
+        ids.append(interview_id if count == 0 else f"{interview_id}-{count + 1}")
+    return ids
+
+
+def available_memory_bytes():
+    """
+    Returns the memory currently available to new processes, or None if unknown.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_worker_count(memory_per_worker_gb=DEFAULT_MEMORY_PER_WORKER_GB):
+    """
+    Sizes the process pool to the available cores and memory.
+
+    Args:
+    - memory_per_worker_gb (float): Expected peak memory of one worker.
+
+    Returns:
+    - int: Number of workers, at least 1.
+    """
+    workers = os.cpu_count() or 1
+    memory = available_memory_bytes()
+    if memory is not None and memory_per_worker_gb > 0:
+        workers = min(workers, int(memory // (memory_per_worker_gb * 1024 ** 3)))
+    return max(1, workers)
+
+
+def process_interview(video_path, workspace_dir, interview_id):
+    """
+    Runs the full pipeline for one interview inside its own workspace.
+
+    Models stay loaded in the worker's registry, so the next interview
+    handled by the same worker skips model loading.
+
+    Returns:
+    - dict: Interview ID, workspace, status and elapsed seconds.
+    """
+    # Imported here so the parent process does not pay for the pipeline imports
+    from main import get_paths, run_pipeline
+
+    start = time.perf_counter()
+    paths = get_paths(workspace_dir, video_path=video_path, interview_id=interview_id)
+    try:
+        run_pipeline(paths)
+        status = 'ok'
+    except SystemExit:
+        status = 'failed'
+    except Exception as e:
+        print(f"An unexpected error occurred while processing {interview_id}: {e}")
+        status = 'failed'
+    return {
+        'interview_id': interview_id,
+        'video': video_path,
+        'workspace': workspace_dir,
+        'status': status,
+        'elapsed_seconds': round(time.perf_counter() - start, 2),
+        'run_report': paths['run_report'],
+    }
+
+
+def run_batch(source, workspaces_dir, max_workers=None, memory_per_worker_gb=DEFAULT_MEMORY_PER_WORKER_GB):
+    """
+    Processes every interview from a directory or manifest on a process pool.
+
+    Args:
+    - source (str): Directory of videos or manifest file.
+    - workspaces_dir (str): Directory under which each interview gets its own workspace.
+    - max_workers (int, optional): Pool size. Defaults to what the cores and memory allow.
+    - memory_per_worker_gb (float): Expected peak memory of one worker, used for sizing.
+
+    Returns:
+    - list: One result dict per interview, in input order.
+    """
+    video_paths = discover_videos(source)
+    if not video_paths:
+        print(f"No interview videos found in: {source}")
+        return []
+
+    interview_ids = make_interview_ids(video_paths)
+    if max_workers is None:
+        max_workers = default_worker_count(memory_per_worker_gb)
+    max_workers = max(1, min(max_workers, len(video_paths)))
+
+    print(f"Processing {len(video_paths)} interviews with {max_workers} workers...")
+    if max_workers > 1:
+        # The interviews already run in parallel; a transcription pool per worker would oversubscribe the cores
+        os.environ.setdefault('TRANSCRIPTION_WORKERS', '1')
+    start = time.perf_counter()
+    results = {}
+    # Spawned workers start clean instead of inheriting the parent's threads and state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(
+                process_interview,
+                video_path,
+                os.path.abspath(os.path.join(workspaces_dir, interview_id)),
+                interview_id
+            ): interview_id
+            for video_path, interview_id in zip(video_paths, interview_ids)
+        }
+        for future in as_completed(futures):
+            interview_id = futures[future]
+            try:
+                results[interview_id] = future.result()
+            except Exception as e:
+                print(f"Worker crashed while processing {interview_id}: {e}")
+                results[interview_id] = {'interview_id': interview_id, 'status': 'failed'}
+            print(f"{interview_id}: {results[interview_id]['status']}")
+
+    ordered = [results[interview_id] for interview_id in interview_ids]
+    failed = sum(1 for result in ordered if result['status'] != 'ok')
+    print(f"Batch completed: {len(ordered) - failed} succeeded, {failed} failed.")
+    save_batch_report(ordered, os.path.join(workspaces_dir, 'batch_report.json'), max_workers,
+                      time.perf_counter() - start)
+    return ordered
+
+
+def save_batch_report(results, output_path, workers, wall_seconds):
+    """
+    Aggregates the run reports of every interview of a batch into one JSON report.
+
+    Args:
+    - results (list): Result dicts from process_interview.
+    - output_path (str): Where to write the batch report.
+    - workers (int): Pool size used for the batch.
+    - wall_seconds (float): Elapsed time of the whole batch.
+    """
+    import metrics
+
+    reports = []
+    for result in results:
+        try:
+            with open(result['run_report'], 'r', encoding='utf-8') as file:
+                reports.append(json.load(file))
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            continue
+
+    report = {
+        'workers': workers,
+        'succeeded': sum(1 for result in results if result['status'] == 'ok'),
+        'failed': sum(1 for result in results if result['status'] != 'ok'),
+        'batch_wall_seconds': round(wall_seconds, 2),
+        'results': [
+            {key: result.get(key) for key in ('interview_id', 'status', 'elapsed_seconds')}
+            for result in results
+        ],
+        **metrics.aggregate_reports(reports),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Batch report saved at: {output_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process many interview videos in parallel.")
+    parser.add_argument('source', help="Directory of interview videos, or a .txt/.json manifest of video paths.")
+    parser.add_argument('--workspaces', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workspaces'),
+                        help="Directory under which each interview gets its own workspace.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: sized to available cores and memory).")
+    parser.add_argument('--memory-per-worker-gb', type=float, default=DEFAULT_MEMORY_PER_WORKER_GB,
+                        help="Expected peak memory of one worker, used to size the pool.")
+    args = parser.parse_args()
+
+    run_batch(args.source, args.workspaces, args.workers, args.memory_per_worker_gb)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,602 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+
+import metrics
+
+SAMPLE_RATE = 16000
+DEFAULT_DURATION_SECONDS = 120
+DEFAULT_REPEAT = 3
+DEFAULT_WHISPER_MODEL = "tiny"
+# Regressions smaller than this fraction of the baseline p50 are treated as noise
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+# Rough speaking rate used to size synthetic turns
+WORDS_PER_SECOND = 2.5
+# Fundamental frequencies of the two synthetic voices (interviewer, candidate)
+SPEAKER_PITCHES = (210.0, 120.0)
+
+INTERVIEWER_SENTENCES = [
+    "Can you tell me about a project you are proud of?",
+    "How did you handle disagreements within your team?",
+    "What would you do differently if you started that project again?",
+    "Walk me through how you debug a production issue.",
+    "Why are you interested in this role?",
+    "How do you prioritize when several deadlines collide?",
+]
+CANDIDATE_WORDS = (
+    "we built a data pipeline that processed customer events in real time and I led the design of "
+    "the storage layer while coordinating with the platform team on deployment and monitoring so the "
+    "service stayed reliable as traffic grew and I learned to communicate tradeoffs early with "
+    "stakeholders which made planning much easier for everyone involved in the release"
+).split()
+
+BENCHMARKS = (
+    'extract_audio', 'separate_speakers', 'transcribe_audio', 'split_into_sentences',
+    'embed_sentences', 'vector_upsert', 'vector_query', 'summaries',
+)
+
+
+class HashingEmbedder:
+    """
+    Offline stand-in for the SentenceTransformer: a deterministic hashed bag of words.
+
+    Lets the vector store and summary benchmarks run without downloading a model.
+    """
+
+    def __init__(self, dimension=384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, sentences, convert_to_numpy=True, **kwargs):
+        embeddings = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in sentence.lower().split():
+                digest = hashlib.md5(word.encode('utf-8')).digest()
+                column = int.from_bytes(digest[:4], 'little') % self.dimension
+                embeddings[row, column] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+def synthesize_interview(duration_seconds, seed=0):
+    """
+    Builds a synthetic two-speaker interview: alternating question and answer turns.
+
+    Each speaker is a harmonic voice at its own pitch, voiced in syllable-sized bursts
+    with short pauses between turns, so diarization has two separable speakers.
+
+    Args:
+    - duration_seconds (float): Target length of the interview.
+    - seed (int): Random seed; the same seed always yields the same interview.
+
+    Returns:
+    - tuple: (float32 samples at 16 kHz, list of turns with 'speaker', 'start', 'end' and 'text').
+    """
+    rng = np.random.default_rng(seed)
+    pieces = []
+    turns = []
+    position = 0.0
+    speaker = 0
+    while position < duration_seconds:
+        if speaker == 0:
+            text = INTERVIEWER_SENTENCES[int(rng.integers(len(INTERVIEWER_SENTENCES)))]
+        else:
+            length = int(rng.integers(25, 70))
+            start_word = int(rng.integers(len(CANDIDATE_WORDS)))
+            words = [CANDIDATE_WORDS[(start_word + i) % len(CANDIDATE_WORDS)] for i in range(length)]
+            # Break the answer into sentences of 8 to 15 words
+            sentences = []
+            while words:
+                size = int(rng.integers(8, 16))
+                sentences.append(" ".join(words[:size]).capitalize() + ".")
+                words = words[size:]
+            text = " ".join(sentences)
+
+        turn_seconds = min(len(text.split()) / WORDS_PER_SECOND, max(0.5, duration_seconds - position))
+        pieces.append(_synthesize_voice(turn_seconds, SPEAKER_PITCHES[speaker], rng))
+        turns.append({'speaker': speaker, 'start': position, 'end': position + turn_seconds, 'text': text})
+        position += turn_seconds
+
+        pause_seconds = float(rng.uniform(0.3, 0.8))
+        pieces.append(np.zeros(int(pause_seconds * SAMPLE_RATE), dtype=np.float32))
+        position += pause_seconds
+        speaker = 1 - speaker
+
+    audio = np.concatenate(pieces)
+    audio += rng.normal(0, 0.003, size=audio.shape).astype(np.float32)
+    return audio.astype(np.float32), turns
+
+
+def _synthesize_voice(seconds, pitch, rng):
+    t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    # Slow pitch drift makes the voice less tonal
+    phase = 2 * np.pi * np.cumsum(pitch * (1 + 0.03 * np.sin(2 * np.pi * 0.7 * t))) / SAMPLE_RATE
+    voice = sum(np.sin(harmonic * phase) / harmonic for harmonic in range(1, 6))
+    # Syllable-rate amplitude envelope (about 4 syllables per second)
+    envelope = np.clip(np.sin(2 * np.pi * float(rng.uniform(3.5, 4.5)) * t), 0, None) ** 2
+    return (0.2 * voice * envelope).astype(np.float32)
+
+
+def write_interview(workdir, duration_seconds, seed=0):
+    """
+    Writes a synthetic interview to `workdir`: main.wav, an audio-only interview.mp4 (when
+    ffmpeg is available) and the ground-truth transcripts main.txt, speaker1.txt and speaker2.txt.
+
+    Returns:
+    - dict: Paths of the written files, the turns and the audio duration.
+    """
+    import soundfile as sf
+
+    audio, turns = synthesize_interview(duration_seconds, seed)
+    os.makedirs(workdir, exist_ok=True)
+    files = {
+        'audio': audio,
+        'turns': turns,
+        'duration_seconds': len(audio) / SAMPLE_RATE,
+        'wav': os.path.join(workdir, 'main.wav'),
+        'video': os.path.join(workdir, 'interview.mp4'),
+        'transcripts_dir': os.path.join(workdir, 'transcripts'),
+    }
+    sf.write(files['wav'], audio, SAMPLE_RATE)
+
+    try:
+        import ffmpeg
+        ffmpeg.input(files['wav']).output(files['video'], acodec='aac').overwrite_output().run(quiet=True)
+    except Exception as e:
+        print(f"Could not write the synthetic video ({e}); extract_audio will be skipped.")
+        files['video'] = None
+
+    os.makedirs(files['transcripts_dir'], exist_ok=True)
+    texts = {
+        'main': " ".join(turn['text'] for turn in turns),
+        'speaker1': " ".join(turn['text'] for turn in turns if turn['speaker'] == 0),
+        'speaker2': " ".join(turn['text'] for turn in turns if turn['speaker'] == 1),
+    }
+    for name, text in texts.items():
+        with open(os.path.join(files['transcripts_dir'], f'{name}.txt'), 'w', encoding='utf-8') as file:
+            file.write(text)
+    files['texts'] = texts
+    return files
+
+
+def configure_stand_ins(workdir, llm_latency):
+    """
+    Points the pipeline at local stand-ins: the embedded vector store in `workdir` instead of
+    Pinecone and the deterministic stub model instead of Gemini. Caches are disabled so every
+    iteration does the full work. Must run before the pipeline modules are imported.
+    """
+    os.environ['VECTOR_STORE_BACKEND'] = 'local'
+    os.environ['VECTOR_STORE_DIR'] = os.path.join(workdir, 'vector_store')
+    os.environ['EMBEDDING_CACHE'] = '0'
+    os.environ['LLM_BACKEND'] = 'stub'
+    os.environ['LLM_CACHE'] = '0'
+    os.environ['LLM_STUB_LATENCY'] = str(llm_latency)
+
+
+def time_iterations(run, repeat, warmup=0):
+    """
+    Runs `run` warmup + repeat times and returns the durations of the timed runs, in seconds.
+    """
+    for _ in range(warmup):
+        run()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def checked_output(run, output_path):
+    """
+    Wraps a pipeline step that prints its errors instead of raising them, so a failed
+    step raises (and the benchmark is marked failed) instead of timing an instant failure.
+
+    The output file is removed before each run, so a file left by an earlier run does not count.
+    """
+    def checked():
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        result = run()
+        if not os.path.exists(output_path):
+            raise RuntimeError(f"the step did not write {output_path}")
+        return result
+    return checked
+
+
+def summarize(durations, items, unit):
+    """
+    Turns iteration durations into comparable results: latency percentiles and throughput.
+    """
+    latencies = [duration * 1000 for duration in durations]
+    p50 = metrics.percentile(latencies, 0.5)
+    return {
+        'status': 'ok',
+        'iterations': len(durations),
+        'items_per_iteration': items,
+        'unit': unit,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'p50': round(p50, 2),
+            'p95': round(metrics.percentile(latencies, 0.95), 2),
+            'min': round(min(latencies), 2),
+            'max': round(max(latencies), 2),
+        },
+        'throughput_per_s': round(items / (p50 / 1000), 3) if p50 else None,
+        'peak_rss_mb': metrics.peak_rss_mb(),
+    }
+
+
+def run_benchmarks(duration_seconds=DEFAULT_DURATION_SECONDS, repeat=DEFAULT_REPEAT,
+                   whisper_model=DEFAULT_WHISPER_MODEL, embedding_backend='minilm', llm_latency=0.0,
+                   only=None, seed=0, workdir=None):
+    """
+    Benchmarks every pipeline stage on a synthetic interview.
+
+    Stages whose dependencies are missing are reported as skipped rather than failing the run.
+
+    Args:
+    - duration_seconds (float): Length of the synthetic interview.
+    - repeat (int): Timed iterations per benchmark.
+    - whisper_model (str): Whisper model used by the transcription benchmark.
+    - embedding_backend (str): 'minilm' for the real SentenceTransformer, 'hashing' for the offline stand-in.
+    - llm_latency (float): Simulated seconds per call of the stub LLM.
+    - only (list, optional): Names of the benchmarks to run. Defaults to all of them.
+    - seed (int): Seed of the synthetic interview.
+    - workdir (str, optional): Scratch directory. Defaults to a temporary directory that is removed afterwards.
+
+    Returns:
+    - dict: Environment, settings and one result per benchmark.
+    """
+    owns_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix='interview-benchmark-')
+    configure_stand_ins(workdir, llm_latency)
+    selected = list(only or BENCHMARKS)
+
+    results = {
+        'environment': environment_info(),
+        'settings': {
+            'duration_seconds': duration_seconds, 'repeat': repeat, 'whisper_model': whisper_model,
+            'embedding_backend': embedding_backend, 'llm_latency': llm_latency, 'seed': seed,
+        },
+        'benchmarks': {},
+    }
+    try:
+        interview = write_interview(workdir, duration_seconds, seed)
+        state = {'interview': interview, 'workdir': workdir}
+        for name in selected:
+            print(f"Benchmarking {name}...")
+            try:
+                results['benchmarks'][name] = BENCHMARK_FUNCTIONS[name](
+                    state, repeat, whisper_model=whisper_model, embedding_backend=embedding_backend)
+            except ImportError as e:
+                results['benchmarks'][name] = {'status': 'skipped', 'reason': f"missing dependency: {e}"}
+            except Exception as e:
+                results['benchmarks'][name] = {'status': 'failed', 'reason': str(e)}
+            result = results['benchmarks'][name]
+            if result['status'] == 'ok':
+                print(f"{name}: p50 {result['latency_ms']['p50']} ms, "
+                      f"{result['throughput_per_s']} {result['unit']}/s")
+            else:
+                print(f"{name}: {result['status']} ({result['reason']})")
+    finally:
+        if owns_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_extract_audio(state, repeat, **settings):
+    from video_processing import extract_audio
+
+    interview = state['interview']
+    if interview['video'] is None:
+        return {'status': 'skipped', 'reason': "no synthetic video (ffmpeg unavailable)"}
+    output_path = os.path.join(state['workdir'], 'extracted', 'main.wav')
+    durations = time_iterations(lambda: extract_audio(interview['video'], output_path), repeat)
+    return summarize(durations, interview['duration_seconds'], 'audio_s')
+
+
+def diarization_accuracy(segments, turns, duration_seconds, frame_seconds=0.01):
+    """
+    Share of the ground-truth speech frames given to the right speaker, after mapping
+    each found speaker to at most one true speaker (largest overlaps first).
+    Frames the diarization left out count as wrong.
+    """
+    frame_count = int(duration_seconds / frame_seconds) + 1
+    reference = np.full(frame_count, -1)
+    hypothesis = np.full(frame_count, -1)
+    for labels, rows in ((reference, [(turn['start'], turn['end'], turn['speaker']) for turn in turns]),
+                         (hypothesis, zip(segments['start'], segments['end'], segments['speaker']))):
+        for start, end, speaker in rows:
+            labels[int(start / frame_seconds):int(end / frame_seconds)] = speaker
+    speech = reference >= 0
+    if not speech.any():
+        return 0.0
+
+    found = hypothesis[speech] >= 0
+    confusion = np.zeros((max(hypothesis.max(), 0) + 1, reference.max() + 1), dtype=np.int64)
+    np.add.at(confusion, (hypothesis[speech][found], reference[speech][found]), 1)
+    correct = 0
+    while confusion.size and confusion.max() > 0:
+        found_speaker, true_speaker = np.unravel_index(confusion.argmax(), confusion.shape)
+        correct += confusion[found_speaker, true_speaker]
+        confusion[found_speaker, :] = 0
+        confusion[:, true_speaker] = 0
+    return round(float(correct / speech.sum()), 4)
+
+
+def bench_separate_speakers(state, repeat, **settings):
+    from audio_processing import separate_speakers
+    from diarization_backends import DIARIZATION_BACKEND
+
+    interview = state['interview']
+    output_dir = os.path.join(state['workdir'], 'speakers')
+    speaker_paths = [os.path.join(output_dir, 'speaker1.wav'), os.path.join(output_dir, 'speaker2.wav')]
+    diarization = {}
+
+    def run():
+        diarization['segments'] = separate_speakers(interview['wav'], speaker_paths, audio=interview['audio'])
+        if diarization['segments'] is None:
+            raise RuntimeError("speaker separation failed")
+
+    durations = time_iterations(checked_output(run, speaker_paths[0]), repeat)
+    result = summarize(durations, interview['duration_seconds'], 'audio_s')
+    # Accuracy against the synthetic ground truth, so backends can be compared (DIARIZATION_BACKEND)
+    result['backend'] = DIARIZATION_BACKEND
+    result['speakers_found'] = int(len(np.unique(diarization['segments']['speaker'])))
+    result['frame_accuracy'] = diarization_accuracy(diarization['segments'], interview['turns'],
+                                                    interview['duration_seconds'])
+    return result
+
+
+def bench_transcribe_audio(state, repeat, whisper_model=DEFAULT_WHISPER_MODEL, **settings):
+    import model_registry
+    from transcription import transcribe_audio
+
+    interview = state['interview']
+    # Loaded outside the timed iterations; the load time is reported separately
+    start = time.perf_counter()
+    model = model_registry.get_whisper_model(whisper_model)
+    load_seconds = time.perf_counter() - start
+    output_path = os.path.join(state['workdir'], 'transcribed', 'main.txt')
+    durations = time_iterations(
+        checked_output(lambda: transcribe_audio(interview['wav'], output_path, model=model), output_path), repeat)
+    result = summarize(durations, interview['duration_seconds'], 'audio_s')
+    result['model_load_seconds'] = round(load_seconds, 3)
+    result['real_time_factor'] = round(result['latency_ms']['p50'] / 1000 / interview['duration_seconds'], 4)
+    return result
+
+
+def bench_split_into_sentences(state, repeat, **settings):
+    import model_registry
+    from text_preprocessing import split_into_sentences, SENTENCE_SEGMENTER
+
+    text = state['interview']['texts']['main']
+    nlp = model_registry.get_sentence_segmenter(SENTENCE_SEGMENTER)
+    durations = time_iterations(lambda: split_into_sentences(text, nlp=nlp), repeat)
+    state['sentences'] = split_into_sentences(text, nlp=nlp)
+    return summarize(durations, len(text.split()), 'words')
+
+
+def get_embedding_model(state, embedding_backend):
+    if 'embedding_model' not in state:
+        if embedding_backend == 'hashing':
+            state['embedding_model'] = HashingEmbedder()
+        else:
+            import model_registry
+            state['embedding_model'] = model_registry.get_sentence_transformer()
+    return state['embedding_model']
+
+
+def get_sentences(state):
+    if 'sentences' not in state:
+        # Without spaCy, fall back to the sentences the synthetic transcript was built from
+        text = state['interview']['texts']['main']
+        state['sentences'] = [sentence.strip() + '.' for sentence in text.split('.') if sentence.strip()]
+    return state['sentences']
+
+
+def get_sentence_embeddings(state, embedding_backend):
+    if 'embeddings' not in state:
+        model = get_embedding_model(state, embedding_backend)
+        state['embeddings'] = np.asarray(model.encode(get_sentences(state), convert_to_numpy=True), dtype=np.float32)
+    return state['embeddings']
+
+
+def bench_embed_sentences(state, repeat, embedding_backend='minilm', **settings):
+    model = get_embedding_model(state, embedding_backend)
+    sentences = get_sentences(state)
+    durations = time_iterations(lambda: model.encode(sentences, convert_to_numpy=True), repeat, warmup=1)
+    return summarize(durations, len(sentences), 'sentences')
+
+
+def bench_vector_upsert(state, repeat, embedding_backend='minilm', **settings):
+    import vector_store
+    from embeddings_and_pinecone_store import store_embeddings_in_pinecone
+
+    sentences = get_sentences(state)
+    embeddings = get_sentence_embeddings(state, embedding_backend)
+    index = vector_store.get_index(vector_store.MAIN_INDEX_NAME, embeddings.shape[1])
+
+    def run():
+        index.delete_namespace('benchmark')
+        store_embeddings_in_pinecone(index, sentences, embeddings, 'benchmark')
+
+    durations = time_iterations(run, repeat)
+    return summarize(durations, len(sentences), 'vectors')
+
+
+def bench_vector_query(state, repeat, embedding_backend='minilm', **settings):
+    import vector_store
+    from embeddings_and_pinecone_store import store_embeddings_in_pinecone
+
+    sentences = get_sentences(state)
+    embeddings = get_sentence_embeddings(state, embedding_backend)
+    index = vector_store.get_index(vector_store.MAIN_INDEX_NAME, embeddings.shape[1])
+    index.delete_namespace('benchmark')
+    store_embeddings_in_pinecone(index, sentences, embeddings, 'benchmark')
+
+    queries = embeddings[np.random.default_rng(0).integers(len(embeddings), size=32)]
+    durations = time_iterations(
+        lambda: index.query_many(queries, top_k=10, include_metadata=True, namespace='benchmark'),
+        repeat, warmup=1)
+    return summarize(durations, len(queries), 'queries')
+
+
+def bench_summaries(state, repeat, embedding_backend='minilm', **settings):
+    import model_registry
+    import vector_store
+    import summary_engine
+    from embeddings_and_pinecone_store import store_embeddings_in_pinecone
+
+    sentences = get_sentences(state)
+    embeddings = get_sentence_embeddings(state, embedding_backend)
+    embedding_model = get_embedding_model(state, embedding_backend)
+    dimension = embeddings.shape[1]
+    for index_name in (vector_store.INTERVIEWER_INDEX_NAME, vector_store.CANDIDATE_INDEX_NAME,
+                       vector_store.MAIN_INDEX_NAME):
+        index = vector_store.get_index(index_name, dimension)
+        index.delete_namespace('benchmark')
+        store_embeddings_in_pinecone(index, sentences, embeddings, 'benchmark')
+
+    gemini_model = model_registry.get_gemini_model()
+    project_dir = os.path.join(state['workdir'], 'project')
+    durations = time_iterations(
+        lambda: summary_engine.generate_all_summaries(gemini_model, project_dir, None, embedding_model,
+                                                      dimension, 'benchmark'),
+        repeat)
+    return summarize(durations, len(summary_engine.build_analyses()), 'analyses')
+
+
+BENCHMARK_FUNCTIONS = {
+    'extract_audio': bench_extract_audio,
+    'separate_speakers': bench_separate_speakers,
+    'transcribe_audio': bench_transcribe_audio,
+    'split_into_sentences': bench_split_into_sentences,
+    'embed_sentences': bench_embed_sentences,
+    'vector_upsert': bench_vector_upsert,
+    'vector_query': bench_vector_query,
+    'summaries': bench_summaries,
+}
+
+
+def environment_info():
+    """
+    Describes the code version and machine a benchmark ran on, so results can be compared.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'commit': commit or None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    Compares two benchmark result files.
+
+    Args:
+    - baseline (dict): Results of the reference version.
+    - current (dict): Results of the version under test.
+    - threshold (float): Relative p50 slowdown above which a benchmark counts as a regression.
+
+    Returns:
+    - list: One row per benchmark present in both, with the p50 and throughput changes
+      and a 'regression' flag.
+    """
+    rows = []
+    for name, before in baseline.get('benchmarks', {}).items():
+        after = current.get('benchmarks', {}).get(name)
+        if not after or before.get('status') != 'ok' or after.get('status') != 'ok':
+            continue
+        p50_change = after['latency_ms']['p50'] / before['latency_ms']['p50'] - 1 if before['latency_ms']['p50'] else None
+        throughput_change = (after['throughput_per_s'] / before['throughput_per_s'] - 1
+                             if before.get('throughput_per_s') and after.get('throughput_per_s') else None)
+        rows.append({
+            'name': name,
+            'baseline_p50_ms': before['latency_ms']['p50'],
+            'current_p50_ms': after['latency_ms']['p50'],
+            'p50_change': p50_change,
+            'throughput_change': throughput_change,
+            'regression': p50_change is not None and p50_change > threshold,
+        })
+    return rows
+
+
+def print_comparison(rows):
+    print(f"{'benchmark':<22}{'baseline p50':>14}{'current p50':>14}{'p50':>10}{'throughput':>12}")
+    for row in rows:
+        p50 = f"{row['p50_change']:+.1%}" if row['p50_change'] is not None else 'n/a'
+        throughput = f"{row['throughput_change']:+.1%}" if row['throughput_change'] is not None else 'n/a'
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:<22}{row['baseline_p50_ms']:>12.1f}ms{row['current_p50_ms']:>12.1f}ms"
+              f"{p50:>10}{throughput:>12}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on a synthetic interview.")
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION_SECONDS,
+                        help="Length of the synthetic interview in seconds.")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed iterations per benchmark.")
+    parser.add_argument('--only', help=f"Comma-separated benchmarks to run ({', '.join(BENCHMARKS)}).")
+    parser.add_argument('--whisper-model', default=DEFAULT_WHISPER_MODEL, help="Whisper model to benchmark.")
+    parser.add_argument('--embedding-backend', choices=['minilm', 'hashing'], default='minilm',
+                        help="'hashing' uses an offline stand-in instead of the SentenceTransformer.")
+    parser.add_argument('--llm-latency', type=float, default=0.0,
+                        help="Simulated latency of the stub LLM, in seconds per call.")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the synthetic interview.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two result files instead of running the benchmarks.")
+    parser.add_argument('--baseline', help="After running, compare the results against this result file.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Relative p50 slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(args.compare[1], 'r', encoding='utf-8') as file:
+            current = json.load(file)
+    else:
+        only = [name.strip() for name in args.only.split(',')] if args.only else None
+        unknown = set(only or []) - set(BENCHMARKS)
+        if unknown:
+            parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        current = run_benchmarks(args.duration, args.repeat, args.whisper_model, args.embedding_backend,
+                                 args.llm_latency, only, args.seed)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as file:
+                json.dump(current, file, indent=2)
+            print(f"Benchmark results saved at: {args.output}")
+        if not args.baseline:
+            return
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+
+    rows = compare_results(baseline, current, args.threshold)
+    print_comparison(rows)
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import model_registry
+import transcription_backends
+from audio_io import SAMPLE_RATE
+
+# Audio longer than this is transcribed in chunks on a process pool
+LONG_AUDIO_SECONDS = float(os.getenv("LONG_AUDIO_SECONDS", "600"))
+# Target chunk length; cuts are moved to the nearest speaker change or silence
+TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "120"))
+# Audio added on both sides of a chunk so words at the cut are heard whole
+TRANSCRIPTION_CHUNK_OVERLAP = float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP", "1.0"))
+# Worker processes; 0 sizes the pool to the cores and memory
+TRANSCRIPTION_WORKERS = int(os.getenv("TRANSCRIPTION_WORKERS", "0"))
+# Rough peak memory of one worker holding a Whisper model and a chunk
+WORKER_MEMORY_GB = 1.5
+
+# Length of the frames whose energy is compared when looking for silence
+SILENCE_FRAME_SECONDS = 0.05
+
+# Backend of the current worker process, loaded once by the pool initializer
+_worker_backend = None
+
+
+def default_worker_count(memory_per_worker_gb=WORKER_MEMORY_GB):
+    """
+    Sizes the transcription pool to the available cores and memory.
+    """
+    from batch_processing import default_worker_count as pool_size
+    return pool_size(memory_per_worker_gb)
+
+
+def find_cut(audio, sr, window_start, window_end, desired, boundaries):
+    """
+    Picks where to cut within [window_start, window_end) seconds: the speaker change
+    closest to `desired` if there is one, otherwise the quietest frame.
+
+    Returns:
+    - float: Cut position in seconds.
+    """
+    in_window = boundaries[(boundaries >= window_start) & (boundaries < window_end)]
+    if in_window.size:
+        return float(in_window[np.argmin(np.abs(in_window - desired))])
+
+    frame = max(1, int(SILENCE_FRAME_SECONDS * sr))
+    samples = np.asarray(audio[int(window_start * sr):int(window_end * sr)], dtype=np.float32)
+    frames = samples[:samples.size // frame * frame].reshape(-1, frame)
+    if frames.shape[0] == 0:
+        return desired
+    energy = np.einsum('ij,ij->i', frames, frames)
+    return window_start + (int(np.argmin(energy)) + 0.5) * frame / sr
+
+
+def plan_chunks(audio, sr=SAMPLE_RATE, diarization=None, chunk_seconds=TRANSCRIPTION_CHUNK_SECONDS):
+    """
+    Splits the audio into consecutive chunks of about `chunk_seconds`, cutting at
+    speaker changes when diarization is available and at silences otherwise.
+
+    Args:
+    - audio (numpy.ndarray): Mono samples (may be a memory map).
+    - sr (int): Sampling rate.
+    - diarization (numpy.ndarray, optional): Segments with 'start', 'end' and 'speaker'.
+    - chunk_seconds (float): Target chunk length.
+
+    Returns:
+    - list: (start, end) of each chunk in seconds, covering the whole audio without overlap.
+    """
+    duration = len(audio) / sr
+    boundaries = np.zeros(0)
+    if diarization is not None and len(diarization) > 1:
+        changes = np.flatnonzero(np.diff(diarization['speaker']) != 0)
+        # Cut in the middle of the gap (if any) between one speaker's turn and the next
+        boundaries = (diarization['end'][changes] + diarization['start'][changes + 1]) / 2
+
+    chunks = []
+    start = 0.0
+    while duration - start > chunk_seconds * 1.25:
+        desired = start + chunk_seconds
+        cut = find_cut(audio, sr, start + chunk_seconds * 0.75, start + chunk_seconds * 1.25, desired, boundaries)
+        chunks.append((start, cut))
+        start = cut
+    chunks.append((start, duration))
+    return chunks
+
+
+def _init_worker(backend_name, preset, model_name, threads):
+    """
+    Loads the transcription model once per worker process.
+    """
+    global _worker_backend
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_backend = transcription_backends.get_backend(backend_name, preset, model_name)
+    # Loaded now rather than on the first chunk
+    _worker_backend.model
+
+
+def _transcribe_chunk(samples, offset):
+    """
+    Transcribes one chunk in a worker and shifts its timestamps to the whole recording.
+    """
+    result = _worker_backend.transcribe(samples, word_timestamps=True)
+    segments = []
+    for segment in result.get('segments', []):
+        words = [
+            {'word': word['word'], 'start': float(word['start']) + offset, 'end': float(word['end']) + offset}
+            for word in segment.get('words') or []
+        ]
+        segments.append({
+            'start': float(segment['start']) + offset,
+            'end': float(segment['end']) + offset,
+            'text': segment['text'],
+            'words': words,
+        })
+    return segments
+
+
+def _normalize_word(word):
+    return ''.join(character for character in word.lower() if character.isalnum())
+
+
+def stitch_chunks(chunk_segments, chunks):
+    """
+    Joins the per-chunk results into one Whisper-style result.
+
+    Each chunk was transcribed with some overlap, so a word is kept only by the chunk
+    whose own (non-overlapping) span contains the word's midpoint. A word repeated
+    across the cut with overlapping timestamps is dropped.
+
+    Args:
+    - chunk_segments (list): For each chunk, its segments with global timestamps.
+    - chunks (list): (start, end) of each chunk's own span, in seconds.
+
+    Returns:
+    - dict: {'text': str, 'segments': list} like whisper's transcribe().
+    """
+    segments = []
+    previous_word = None
+    for (chunk_start, chunk_end), chunk in zip(chunks, chunk_segments):
+        for segment in chunk:
+            if segment['words']:
+                kept = []
+                for word in segment['words']:
+                    midpoint = (word['start'] + word['end']) / 2
+                    if not chunk_start <= midpoint < chunk_end:
+                        continue
+                    if (previous_word is not None and word['start'] < previous_word['end']
+                            and _normalize_word(word['word']) == _normalize_word(previous_word['word'])):
+                        continue
+                    kept.append(word)
+                    previous_word = word
+                if kept:
+                    segments.append({
+                        'start': kept[0]['start'],
+                        'end': kept[-1]['end'],
+                        'text': ''.join(word['word'] for word in kept),
+                        'words': kept,
+                    })
+            elif chunk_start <= (segment['start'] + segment['end']) / 2 < chunk_end:
+                segments.append(segment)
+
+    return {'text': ''.join(segment['text'] for segment in segments), 'segments': segments}
+
+
+def transcribe_chunked(audio, sr=SAMPLE_RATE, diarization=None, model_name=model_registry.WHISPER_MODEL_NAME,
+                       workers=TRANSCRIPTION_WORKERS, chunk_seconds=TRANSCRIPTION_CHUNK_SECONDS,
+                       overlap=TRANSCRIPTION_CHUNK_OVERLAP, backend=None, preset=None):
+    """
+    Transcribes long audio in chunks on a process pool, with word timestamps.
+
+    Args:
+    - audio (numpy.ndarray): Mono 16 kHz float32 samples.
+    - sr (int): Sampling rate.
+    - diarization (numpy.ndarray, optional): Diarization segments, used to cut at speaker changes.
+    - model_name (str): Whisper model loaded by every worker.
+    - workers (int): Worker processes; 0 sizes the pool to the cores and memory.
+    - chunk_seconds (float): Target chunk length.
+    - overlap (float): Seconds of context added on both sides of each chunk.
+    - backend (str, optional): Transcription backend. Defaults to TRANSCRIPTION_BACKEND.
+    - preset (str, optional): Decoding preset. Defaults to TRANSCRIPTION_PRESET.
+
+    Returns:
+    - dict: {'text': str, 'segments': list} with timestamps relative to the whole audio.
+    """
+    chunks = plan_chunks(audio, sr, diarization, chunk_seconds)
+    workers = max(1, min(workers or default_worker_count(), len(chunks)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Transcribing {len(audio) / sr:.0f}s of audio in {len(chunks)} chunks on {workers} workers...")
+
+    duration = len(audio) / sr
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(backend, preset, model_name, threads)) as executor:
+        futures = []
+        for start, end in chunks:
+            padded_start = max(0.0, start - overlap)
+            padded_end = min(duration, end + overlap)
+            samples = np.array(audio[int(padded_start * sr):int(padded_end * sr)], dtype=np.float32)
+            futures.append(executor.submit(_transcribe_chunk, samples, padded_start))
+        chunk_segments = [future.result() for future in futures]
+
+    return stitch_chunks(chunk_segments, chunks)
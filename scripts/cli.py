@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+
+# Lightweight entry points: nothing here imports torch, spaCy, Whisper or the
+# SentenceTransformer, and the pipeline modules are only imported by the
+# commands that need them.
+
+PROJECT_BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WORKSPACES_DIR = os.path.join(PROJECT_BASE_PATH, 'workspaces')
+
+SUMMARY_FILES = {
+    'communication_style': 'communication_style_summary.txt',
+    'active_listening': 'active_listening_summary.txt',
+    'engagement': 'engagement_summary.txt',
+    'interview_summary': 'summary.txt',
+}
+
+# Environment settings checked by validate-config: name -> (kind, allowed values)
+CONFIG_SPEC = {
+    'VECTOR_STORE_BACKEND': ('choice', ('pinecone', 'local')),
+    'LLM_BACKEND': ('choice', ('gemini', 'stub')),
+    'RETRIEVAL_MODE': ('choice', ('hybrid', 'dense', 'lexical')),
+    'TRANSCRIPTION_BACKEND': ('choice', ('whisper', 'faster-whisper')),
+    'DIARIZATION_BACKEND': ('choice', ('embedding', 'pyaudioanalysis')),
+    'TRANSCRIPTION_PRESET': ('choice', ('fast', 'balanced', 'accurate')),
+    'SENTENCE_SEGMENTER': ('choice', ('senter', 'parser', 'rule')),
+    'STREAM_PRESET': ('choice', ('fast', 'balanced', 'accurate')),
+    'EMBEDDING_CACHE': ('choice', ('0', '1')),
+    'LLM_CACHE': ('choice', ('0', '1')),
+    'VECTOR_STORE_ANN': ('choice', ('0', '1')),
+    'AUDIO_MMAP': ('choice', ('0', '1')),
+    'UPSERT_BATCH_SIZE': ('int', None),
+    'UPSERT_WORKERS': ('int', None),
+    'PINECONE_QUERY_WORKERS': ('int', None),
+    'VECTOR_STORE_ANN_MIN_VECTORS': ('int', None),
+    'VECTOR_STORE_ANN_NPROBE': ('int', None),
+    'EMBEDDING_CACHE_MAX_BYTES': ('int', None),
+    'LLM_CACHE_MAX_BYTES': ('int', None),
+    'SUMMARY_CONCURRENCY': ('int', None),
+    'LLM_BURST': ('int', None),
+    'LLM_MAX_RETRIES': ('int', None),
+    'LLM_REQUESTS_PER_MINUTE': ('float', None),
+    'LLM_RETRY_BASE_DELAY': ('float', None),
+    'LLM_RETRY_MAX_DELAY': ('float', None),
+    'LLM_CACHE_TTL_SECONDS': ('float', None),
+    'LLM_STUB_LATENCY': ('float', None),
+    'TRANSCRIPTION_WORKERS': ('int', None),
+    'LONG_AUDIO_SECONDS': ('float', None),
+    'TRANSCRIPTION_CHUNK_SECONDS': ('float', None),
+    'TRANSCRIPTION_CHUNK_OVERLAP': ('float', None),
+    'SEGMENTATION_PROCESSES': ('int', None),
+    'SEGMENTATION_BATCH_SIZE': ('int', None),
+    'SEGMENTATION_CHUNK_CHARS': ('int', None),
+    'RRF_K': ('int', None),
+    'CONTEXT_TOKEN_BUDGET': ('int', None),
+    'CONTEXT_MMR_LAMBDA': ('float', None),
+    'CONTEXT_DUPLICATE_THRESHOLD': ('float', None),
+    'DIARIZATION_SPEAKERS': ('int', None),
+    'DIARIZATION_MAX_SPEAKERS': ('int', None),
+    'DIARIZATION_WINDOW_SECONDS': ('float', None),
+    'VAD_THRESHOLD_DB': ('float', None),
+    'PAUSE_SECONDS': ('float', None),
+    'INTERRUPTION_GAP_SECONDS': ('float', None),
+    'STREAM_WINDOW_SECONDS': ('float', None),
+    'STREAM_HOLDBACK_SECONDS': ('float', None),
+    'STREAM_MAX_BUFFER_SECONDS': ('float', None),
+    'STREAM_IDLE_TIMEOUT': ('float', None),
+}
+
+
+def load_environment():
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def validate_config():
+    """
+    Checks the environment settings without loading any model.
+
+    Returns:
+    - list: Problems found, empty when the configuration is valid.
+    """
+    problems = []
+    for name, (kind, allowed) in CONFIG_SPEC.items():
+        value = os.getenv(name)
+        if value is None:
+            continue
+        if kind == 'choice' and value not in allowed:
+            problems.append(f"{name}={value!r} must be one of: {', '.join(allowed)}")
+        elif kind in ('int', 'float'):
+            try:
+                number = int(value) if kind == 'int' else float(value)
+            except ValueError:
+                problems.append(f"{name}={value!r} is not a valid {kind}")
+                continue
+            if number < 0:
+                problems.append(f"{name}={value!r} must not be negative")
+
+    if os.getenv('VECTOR_STORE_BACKEND', 'pinecone') == 'pinecone' and not os.getenv('PINECONE_API_KEY'):
+        problems.append("PINECONE_API_KEY is required by the pinecone vector store backend")
+    if os.getenv('LLM_BACKEND', 'gemini') == 'gemini' and not os.getenv('GOOGLE_API_KEY'):
+        problems.append("GOOGLE_API_KEY is required by the gemini LLM backend")
+    if shutil.which('ffmpeg') is None:
+        problems.append("ffmpeg was not found on PATH")
+    return problems
+
+
+def interview_paths(project_base_path):
+    """
+    Returns the pipeline paths of a project, preferring those recorded by its last run.
+    """
+    from main import get_paths
+    import pipeline_dag
+
+    paths = get_paths(project_base_path)
+    recorded = pipeline_dag.load_state(paths['pipeline_state']).get('paths')
+    return {**paths, **recorded} if recorded else paths
+
+
+def print_status(project_base_path):
+    from main import STAGES
+    import pipeline_dag
+
+    paths = interview_paths(project_base_path)
+    print(f"Interview: {paths['interview_id']} ({project_base_path})")
+    for name, status in pipeline_dag.stage_status(STAGES, paths, paths['pipeline_state']):
+        print(f"  {name:<32}{status}")
+
+    report_path = os.path.join(project_base_path, 'outputs', 'run_report.json')
+    if os.path.exists(report_path):
+        with open(report_path, 'r', encoding='utf-8') as file:
+            report = json.load(file)
+        print(f"Last run: {report.get('wall_seconds')}s wall, peak RSS {report.get('peak_rss_mb')} MB")
+
+
+def list_interviews(workspaces_dir):
+    """
+    Lists the interview workspaces with the number of summaries each one has.
+    """
+    projects = [PROJECT_BASE_PATH]
+    if os.path.isdir(workspaces_dir):
+        projects += [os.path.join(workspaces_dir, name) for name in sorted(os.listdir(workspaces_dir))
+                     if os.path.isdir(os.path.join(workspaces_dir, name))]
+
+    for project in projects:
+        outputs_dir = os.path.join(project, 'outputs')
+        available = [name for name, filename in SUMMARY_FILES.items()
+                     if os.path.exists(os.path.join(outputs_dir, filename))]
+        label = 'default' if project == PROJECT_BASE_PATH else os.path.basename(project)
+        print(f"{label:<32}{len(available)}/{len(SUMMARY_FILES)} summaries  {project}")
+
+
+def show_summary(project_base_path, names):
+    """
+    Prints saved summaries without running any part of the pipeline.
+
+    Returns:
+    - bool: True if every requested summary exists.
+    """
+    found = True
+    for name in names:
+        path = os.path.join(project_base_path, 'outputs', SUMMARY_FILES[name])
+        if not os.path.exists(path):
+            print(f"Error: no {name} summary at '{path}'. Run the pipeline first.")
+            found = False
+            continue
+        with open(path, 'r', encoding='utf-8') as file:
+            print(f"== {name} ==\n{file.read().strip()}\n")
+    return found
+
+
+def search_transcript(project_base_path, query, index_name, top_k):
+    """
+    Finds sentences containing the query terms with the interview's BM25 index;
+    no embedding model is loaded.
+
+    Returns:
+    - bool: True if the interview has a lexical index.
+    """
+    import lexical_index
+
+    interview_id = interview_paths(project_base_path)['interview_id']
+    index = lexical_index.get_index(index_name, interview_id)
+    if index is None:
+        print(f"Error: no lexical index for '{interview_id}' in {index_name}. Run the pipeline first.")
+        return False
+    for match in index.search(query, top_k):
+        print(f"{match['score']:7.2f}  [{match['metadata']['position']}] {match['metadata']['sentence']}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect interview analyses without loading any model.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    status_parser = subparsers.add_parser('status', help="Show which pipeline stages are up to date.")
+    status_parser.add_argument('--project', default=PROJECT_BASE_PATH, help="Interview workspace directory.")
+
+    list_parser = subparsers.add_parser('list', help="List interview workspaces and their summaries.")
+    list_parser.add_argument('--workspaces', default=DEFAULT_WORKSPACES_DIR, help="Batch workspaces directory.")
+
+    subparsers.add_parser('validate-config', help="Check the environment settings.")
+
+    show_parser = subparsers.add_parser('show-summary', help="Print saved summaries.")
+    show_parser.add_argument('names', nargs='*',
+                             help=f"Summaries to print: {', '.join(SUMMARY_FILES)} (default: all).")
+    show_parser.add_argument('--project', default=PROJECT_BASE_PATH, help="Interview workspace directory.")
+
+    search_parser = subparsers.add_parser('search', help="Keyword search of a transcript (BM25, no model).")
+    search_parser.add_argument('query', help="Words to look for.")
+    search_parser.add_argument('--index', default='main-index',
+                               choices=['main-index', 'candidate-index', 'interviewer-index'],
+                               help="Transcript to search.")
+    search_parser.add_argument('--top-k', type=int, default=10, help="Number of sentences to show.")
+    search_parser.add_argument('--project', default=PROJECT_BASE_PATH, help="Interview workspace directory.")
+
+    args = parser.parse_args()
+    load_environment()
+
+    if args.command == 'status':
+        print_status(args.project)
+    elif args.command == 'list':
+        list_interviews(args.workspaces)
+    elif args.command == 'validate-config':
+        problems = validate_config()
+        for problem in problems:
+            print(f"Error: {problem}")
+        if problems:
+            sys.exit(1)
+        print("Configuration is valid.")
+    elif args.command == 'show-summary':
+        unknown = [name for name in args.names if name not in SUMMARY_FILES]
+        if unknown:
+            parser.error(f"unknown summaries: {', '.join(unknown)}")
+        if not show_summary(args.project, args.names or list(SUMMARY_FILES)):
+            sys.exit(1)
+    elif args.command == 'search':
+        if not search_transcript(args.project, args.query, args.index, args.top_k):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,15 @@
 import os
 import logging
 import warnings
-from datetime import datetime
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-import pinecone
-from pinecone import Pinecone, ServerlessSpec
-import google.generativeai as genai
-from google.generativeai import GenerativeModel
+
+import model_registry
+import retrieval
+import context_builder
+import interview_metrics
+import vector_store
+import summary_engine
+from summary_output import create_output_and_save_summary
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -16,97 +18,16 @@ logging.getLogger('pinecone').setLevel(logging.CRITICAL)
 # Load environment variables
 load_dotenv()
 
-import os
-
-def create_output_and_save_summary(base_path, summary_text):
-    """
-    Checks if the 'outputs' directory exists. If not, creates it. 
-    Then saves the communication analysis summary in a single file, overwriting previous content.
-    """
-    # Define the output directory path
-    output_dir = os.path.join(base_path, 'outputs')
+# Retrieval query used for this analysis
+COMMUNICATION_STYLE_QUERY = "Can you provide a detailed analysis of the candidate's communication style, focusing on their clarity and effectiveness in expression?"
 
-    # Check if the directory exists, if not, create it
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # Define the path for the communication analysis summary file
-    summary_file_path = os.path.join(output_dir, 'communication_analysis_summary.txt')
-
-    # Write the summary_text to the file, overwriting any previous content
-    try:
-        with open(summary_file_path, 'w', encoding='utf-8') as file:
-            file.write(summary_text)
-        print(f"Summary successfully saved at: {summary_file_path}")
-    except Exception as e:
-        print(f"Error saving the summary: {e}")
+# Measured timing metrics added to the prompt
+TIMING_METRICS = ['words_per_minute', 'pauses', 'long_pauses', 'fillers_per_100_words']
 
-    return summary_file_path  # Return the path in case it's needed later
+# Number of matches retrieved from each index
+RETRIEVAL_TOP_K = {vector_store.CANDIDATE_INDEX_NAME: 5}
 
-
-def generate_summary_filename():
-    """
-    Generate a unique filename for the summary based on timestamp.
-    """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"candidate_summary_{timestamp}.txt"
-
-def init_pinecone(PINECONE_API_KEY, index_dimension):
-    """
-    Initializes Pinecone and returns the candidate index.
-    """
-    # Create a Pinecone instance
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-
-    index_name = "candidate-index"
-
-    # Check if the index exists
-    if index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=index_name,
-            dimension=index_dimension,
-            metric='cosine',
-            spec=ServerlessSpec(
-                cloud='aws',
-                region='us-west-2'
-            )
-        )
-    else:
-        # Validate existing index dimension
-        index_info = pc.describe_index(index_name)
-        if index_info.dimension != index_dimension:
-            raise ValueError(f"Existing index dimension {index_info.dimension} does not match required dimension {index_dimension}")
-
-    # Return the initialized index
-    return pc.Index(index_name)
-
-def retrieve_relevant_segments(query, index, embedding_model, top_k=5):
-    """
-    Retrieves the top-k relevant segments from Pinecone based on the query.
-    """
-    try:
-        query_embedding = embedding_model.encode(query).tolist()
-
-        result = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-        return result['matches']
-    except Exception as e:
-        print(f"Retrieval error: {e}")
-        return []
-
-def prepare_context(retrieved_segments):
-    """
-    Prepares the context for the summary generation.
-    """
-    context = ""
-    for match in retrieved_segments:
-        context += match['metadata'].get('text', '') + "\n"
-    return context
-
-def construct_prompt(context, query):
+def construct_prompt(context, query, timing=""):
     """
     Constructs a prompt for the Gemini model.
     """
@@ -122,7 +43,7 @@ Your task is to evaluate the following candidate-related interview context and p
 
 4. **Clarity and Effectiveness**: Evaluate how clearly the candidate conveys their ideas. Is the message well-organized, or is it difficult to follow due to poor articulation or lack of clarity? Are they able to effectively communicate complex ideas in a manner that's understandable?
 
-**Candidate Context:**
+{timing}**Candidate Context:**
 {context}
 
 **Specific Query:** {query}
@@ -138,21 +59,34 @@ Please ensure that your response is detailed, specific, and addresses each of th
 """
     return prompt
 
-def generate_communication_style_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension):
+def prompt_from_matches(matches, query, metrics=None):
     """
-    Generate summary of Communication Style based on clarity and effectiveness and save to outputs/communication_style_summary.txt.
+    Builds the Communication Style prompt from the matches retrieved from each index
+    and, when available, the measured interview metrics.
     """
-    # Initialize Pinecone index for candidate data
-    candidate_index = init_pinecone(PINECONE_API_KEY, embedding_dimension)
+    # Prepare context: duplicate sentences removed, the rest packed in time order up to the token budget
+    context = context_builder.build_contexts([('context', matches[vector_store.CANDIDATE_INDEX_NAME])])['context']
 
-    # Retrieve relevant segments from the candidate index
-    relevant_candidate = retrieve_relevant_segments(query, candidate_index, embedding_model)
+    # Construct prompt
+    return construct_prompt(context, query, interview_metrics.prompt_section(metrics, TIMING_METRICS))
 
-    # Prepare context
-    context = prepare_context(relevant_candidate)
+def build_communication_style_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID, metrics=None):
+    """
+    Retrieves the candidate context and builds the Communication Style prompt, with the
+    measured interview metrics when given.
+    """
+    matches = retrieval.retrieve(
+        {'communication_style': {'query': query, 'top_k': RETRIEVAL_TOP_K}},
+        embedding_dimension, interview_id, PINECONE_API_KEY, embedding_model
+    )['communication_style']
+    return prompt_from_matches(matches, query, metrics)
 
-    # Construct prompt
-    prompt = construct_prompt(context, query)
+def generate_communication_style_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID):
+    """
+    Generate summary of Communication Style based on clarity and effectiveness and save to outputs/communication_style_summary.txt.
+    """
+    prompt = build_communication_style_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id,
+                                              summary_engine.load_measured_metrics(project_base_path))
 
     try:
         # Generate summary
@@ -160,11 +94,7 @@ def generate_communication_style_summary(query, PINECONE_API_KEY, project_base_p
         summary = response.text
 
         # Save summary to outputs/communication_style_summary.txt
-        output_dir = os.path.join(project_base_path, 'outputs')
-        os.makedirs(output_dir, exist_ok=True)
-        summary_file_path = os.path.join(output_dir, 'communication_style_summary.txt')
-        with open(summary_file_path, 'w', encoding='utf-8') as f:
-            f.write(summary)
+        summary_file_path = create_output_and_save_summary(project_base_path, summary, 'communication_style_summary.txt')
 
         print(f"Summary saved to: {summary_file_path}")
         return summary
@@ -180,15 +110,9 @@ def main():
     project_base_path = os.path.dirname(os.path.abspath(__file__))
     project_base_path = os.path.dirname(project_base_path)  # Go up one level to project root
 
-    # Configure Gemini API
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    genai.configure(api_key=GOOGLE_API_KEY)
-
-    # Initialize Gemini models
-    gemini_model = GenerativeModel("gemini-pro")
-
-    # Load SentenceTransformer model for embeddings
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    # Gemini and SentenceTransformer models are shared through the model registry
+    gemini_model = model_registry.get_gemini_model()
+    embedding_model = model_registry.get_sentence_transformer()
 
     # Define embedding dimension
     embedding_dimension = embedding_model.get_sentence_embedding_dimension()
@@ -197,7 +121,7 @@ def main():
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 
     # Example query
-    query = "Can you provide a detailed analysis of the candidate's communication style, focusing on their clarity and effectiveness in expression?"
+    query = COMMUNICATION_STYLE_QUERY
 
     # Generate and save communication style summary
     summary = generate_communication_style_summary(
@@ -0,0 +1,111 @@
+import os
+import re
+
+# Approximate prompt tokens available for retrieved context in one prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+# MMR trade-off: 1.0 ranks by relevance only, lower values favour matches unlike those already picked
+CONTEXT_MMR_LAMBDA = float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+# Matches whose word overlap (Jaccard) with a picked match reaches this are near-duplicates
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+
+# Rough characters per token of English text, used to estimate prompt size without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_WORD = re.compile(r"[\w']+")
+
+
+def match_text(match):
+    """
+    Returns the sentence stored with a match. Ingest stores it under "sentence";
+    "text" is read for vectors written by older versions.
+    """
+    metadata = match.get('metadata') or {}
+    return (metadata.get('sentence') or metadata.get('text') or '').strip()
+
+
+def estimate_tokens(text):
+    return max(1, -(-len(text) // CHARS_PER_TOKEN))
+
+
+def _similarity(words, other_words):
+    if not words or not other_words:
+        return 0.0
+    return len(words & other_words) / len(words | other_words)
+
+
+def _time_order(match):
+    metadata = match.get('metadata') or {}
+    return metadata.get('start', metadata.get('position', 0))
+
+
+def select_matches(sections, token_budget=CONTEXT_TOKEN_BUDGET, diversity=CONTEXT_MMR_LAMBDA,
+                   duplicate_threshold=CONTEXT_DUPLICATE_THRESHOLD):
+    """
+    Picks the matches that go into one prompt.
+
+    Exact and near-duplicate sentences are kept once, in the first section that has
+    them. The remaining matches are picked greedily by maximal marginal relevance
+    (vector score minus word overlap with the matches already picked) until the
+    token budget is used up.
+
+    Args:
+    - sections (list): (name, matches) pairs, most specific first (e.g. candidate, interviewer, main).
+    - token_budget (int): Approximate tokens available for all sections together.
+    - diversity (float): MMR lambda; 1.0 ranks by relevance only.
+    - duplicate_threshold (float): Jaccard word overlap at which two sentences count as the same.
+
+    Returns:
+    - dict: Section name -> picked matches, in time order.
+    """
+    candidates = []
+    seen = set()
+    for name, matches in sections:
+        for match in matches:
+            text = match_text(match)
+            key = ' '.join(_WORD.findall(text.lower()))
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            candidates.append({
+                'section': name,
+                'match': match,
+                'words': set(key.split()),
+                'tokens': estimate_tokens(text),
+                'score': float(match.get('score') or 0.0),
+            })
+
+    picked = []
+    remaining = token_budget
+    while candidates and remaining > 0:
+        best, best_value = None, None
+        for candidate in candidates:
+            overlap = max((_similarity(candidate['words'], chosen['words']) for chosen in picked), default=0.0)
+            candidate['overlap'] = overlap
+            value = diversity * candidate['score'] - (1 - diversity) * overlap
+            if best_value is None or value > best_value:
+                best, best_value = candidate, value
+        candidates.remove(best)
+        if best['overlap'] >= duplicate_threshold or best['tokens'] > remaining:
+            continue
+        picked.append(best)
+        remaining -= best['tokens']
+
+    selected = {name: [] for name, _ in sections}
+    for candidate in picked:
+        selected[candidate['section']].append(candidate['match'])
+    return {name: sorted(matches, key=_time_order) for name, matches in selected.items()}
+
+
+def build_contexts(sections, token_budget=CONTEXT_TOKEN_BUDGET):
+    """
+    Builds the context text of each section of a prompt from its retrieved matches.
+
+    Args:
+    - sections (list): (name, matches) pairs, most specific first.
+    - token_budget (int): Approximate tokens available for all sections together.
+
+    Returns:
+    - dict: Section name -> context text, one sentence per line in time order.
+    """
+    selected = select_matches(sections, token_budget)
+    return {name: "\n".join(match_text(match) for match in matches) for name, matches in selected.items()}
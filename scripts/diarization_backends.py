@@ -0,0 +1,398 @@
+import os
+import numpy as np
+
+from audio_io import SAMPLE_RATE
+
+# "pyaudioanalysis", or "embedding" (VAD-gated spectral speaker embeddings, NumPy only; compare
+# their accuracy on your recordings, e.g. with the separate_speakers benchmark, before switching)
+DIARIZATION_BACKEND = os.getenv("DIARIZATION_BACKEND", "pyaudioanalysis")
+# Number of speakers; 0 picks it from the audio, between 2 and DIARIZATION_MAX_SPEAKERS
+DIARIZATION_SPEAKERS = int(os.getenv("DIARIZATION_SPEAKERS", "0"))
+DIARIZATION_MAX_SPEAKERS = int(os.getenv("DIARIZATION_MAX_SPEAKERS", "6"))
+# Length of the audio window one speaker embedding is computed from (windows overlap by half)
+DIARIZATION_WINDOW_SECONDS = float(os.getenv("DIARIZATION_WINDOW_SECONDS", "1.5"))
+# Frames this many dB above the noise floor are speech
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "15"))
+
+# Analysis frames: 25 ms every 10 ms, as in usual speech front ends
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_FFT = 512
+N_MELS = 40
+N_MFCC = 20
+# Frames are turned into features this many at a time, so memory stays flat on long interviews
+FEATURE_BLOCK_FRAMES = 8192
+# Silences shorter than this inside speech are bridged; speech bursts shorter than this are dropped
+MAX_GAP_SECONDS = 0.3
+MIN_SPEECH_SECONDS = 0.25
+# Frames quieter than this (dB relative to full scale) are never speech
+SILENCE_DB = -60
+# Points the silhouette score is computed on when picking the number of speakers
+SILHOUETTE_SAMPLE = 1000
+
+# Diarization result: one row per contiguous single-speaker segment (times in seconds)
+DIARIZATION_DTYPE = np.dtype([('start', 'f8'), ('end', 'f8'), ('speaker', 'i4')])
+
+
+def labels_to_segments(labels, frame_duration):
+    """
+    Merges per-frame speaker labels into contiguous speaker segments.
+
+    Args:
+    - labels (array-like): Speaker label of each fixed-length diarization frame.
+    - frame_duration (float): Length of one frame in seconds.
+
+    Returns:
+    - numpy.ndarray: Structured array with DIARIZATION_DTYPE.
+    """
+    labels = np.asarray(labels).astype(np.int32)
+    if labels.size == 0:
+        return np.zeros(0, dtype=DIARIZATION_DTYPE)
+
+    # Frame indices where a new run of equal labels starts
+    run_starts = np.concatenate(([0], np.flatnonzero(np.diff(labels)) + 1))
+    run_ends = np.concatenate((run_starts[1:], [labels.size]))
+
+    segments = np.empty(run_starts.size, dtype=DIARIZATION_DTYPE)
+    segments['start'] = run_starts * frame_duration
+    segments['end'] = run_ends * frame_duration
+    segments['speaker'] = labels[run_starts]
+    return segments
+
+
+def _runs(values):
+    """
+    Returns the start, end and value of each run of equal values.
+    """
+    starts = np.concatenate(([0], np.flatnonzero(values[1:] != values[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [values.size]))
+    return starts, ends, values[starts]
+
+
+def _mel_filterbank(sr, n_fft=N_FFT, n_mels=N_MELS):
+    mel_max = 2595 * np.log10(1 + (sr / 2) / 700)
+    hz = 700 * (10 ** (np.linspace(0, mel_max, n_mels + 2) / 2595) - 1)
+    bins = np.fft.rfftfreq(n_fft, 1 / sr)
+    lower, center, upper = hz[:-2, None], hz[1:-1, None], hz[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+def _dct_matrix(n_mels=N_MELS, n_mfcc=N_MFCC):
+    # Orthonormal DCT-II, the usual log-mel to cepstrum transform
+    n = np.arange(n_mels)
+    matrix = np.cos(np.pi / n_mels * (n + 0.5)[:, None] * np.arange(n_mfcc)[None, :]) * np.sqrt(2 / n_mels)
+    matrix[:, 0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+def frame_features(audio, sr=SAMPLE_RATE):
+    """
+    Computes the energy and cepstral features of every 25 ms analysis frame.
+
+    Args:
+    - audio (numpy.ndarray): Mono samples.
+    - sr (int): Sampling rate.
+
+    Returns:
+    - tuple: (energy in dB per frame, MFCCs without c0 per frame as float32).
+    """
+    frame_length = int(FRAME_SECONDS * sr)
+    hop = int(HOP_SECONDS * sr)
+    audio = np.asarray(audio, dtype=np.float32)
+    if audio.size < frame_length:
+        return np.zeros(0), np.zeros((0, N_MFCC - 1), dtype=np.float32)
+
+    frames = np.lib.stride_tricks.sliding_window_view(audio, frame_length)[::hop]
+    window = np.hanning(frame_length).astype(np.float32)
+    mel = _mel_filterbank(sr)
+    dct = _dct_matrix()
+
+    energy = np.empty(len(frames))
+    mfcc = np.empty((len(frames), N_MFCC - 1), dtype=np.float32)
+    for start in range(0, len(frames), FEATURE_BLOCK_FRAMES):
+        block = frames[start:start + FEATURE_BLOCK_FRAMES]
+        energy[start:start + len(block)] = 10 * np.log10(np.mean(np.square(block), axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(block * window, n=N_FFT)) ** 2
+        log_mel = np.log(power.astype(np.float32) @ mel.T + 1e-10)
+        mfcc[start:start + len(block)] = (log_mel @ dct)[:, 1:]
+    return energy, mfcc
+
+
+def speech_frames(energy, threshold_db=VAD_THRESHOLD_DB):
+    """
+    Energy voice activity detection: frames well above the noise floor are speech.
+    Short silences inside speech are bridged and short bursts are dropped.
+
+    Returns:
+    - numpy.ndarray: Boolean speech flag per frame.
+    """
+    if energy.size == 0:
+        return np.zeros(0, dtype=bool)
+    floor, peak = np.percentile(energy, [10, 100])
+    # On recordings with hardly any silence the 10th percentile is speech, so the
+    # threshold is also kept below the loudest frames
+    speech = energy > max(min(floor + threshold_db, peak - threshold_db), SILENCE_DB)
+
+    for value, max_seconds in ((False, MAX_GAP_SECONDS), (True, MIN_SPEECH_SECONDS)):
+        starts, ends, values = _runs(speech)
+        short = (values == value) & (ends - starts < max_seconds / HOP_SECONDS)
+        if not value:
+            # Silence at the very start or end is not a gap inside speech
+            short &= (starts > 0) & (ends < speech.size)
+        speech = np.repeat(np.where(short, not value, values), ends - starts)
+    return speech
+
+
+def window_embeddings(mfcc, speech, window_seconds=DIARIZATION_WINDOW_SECONDS):
+    """
+    Computes one speaker embedding per half-overlapping window of speech: the mean and
+    standard deviation of the window's cepstra, from cumulative sums. Windows never
+    cross a silence, so fewer of them mix two speakers; stretches of speech shorter
+    than a window get one shorter window.
+
+    Returns:
+    - tuple: (embeddings, first frame of each window, frame after the last one).
+    """
+    window_frames = max(1, int(round(window_seconds / HOP_SECONDS)))
+    step = max(1, window_frames // 2)
+    run_starts, run_ends, values = _runs(speech)
+    region_starts, region_ends = run_starts[values], run_ends[values]
+    if region_starts.size == 0:
+        return np.zeros((0, 2 * mfcc.shape[1])), region_starts, region_ends
+
+    # Windows of every speech region, the last one ending at the region's end
+    lengths = region_ends - region_starts
+    counts = np.maximum(1, -(-(lengths - window_frames) // step) + 1)
+    region = np.repeat(np.arange(counts.size), counts)
+    index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    ends = np.minimum(region_starts[region] + index * step + window_frames, region_ends[region])
+    starts = np.maximum(ends - window_frames, region_starts[region])
+
+    zero = np.zeros((1, mfcc.shape[1]))
+    sums = np.concatenate((zero, np.cumsum(mfcc, axis=0, dtype=np.float64)))
+    squares = np.concatenate((zero, np.cumsum(np.square(mfcc, dtype=np.float64), axis=0)))
+    size = (ends - starts)[:, None]
+    mean = (sums[ends] - sums[starts]) / size
+    variance = (squares[ends] - squares[starts]) / size - np.square(mean)
+    embeddings = np.hstack((mean, np.sqrt(np.maximum(variance, 0))))
+
+    # Standardized per dimension, then unit length so dot products are cosine similarities
+    embeddings = (embeddings - embeddings.mean(axis=0)) / (embeddings.std(axis=0) + 1e-8)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+    return embeddings, starts, ends
+
+
+def cluster_embeddings(embeddings, n_clusters, iterations=30, n_init=3, seed=0):
+    """
+    Spherical k-means with k-means++ seeding, keeping the best of a few restarts.
+
+    Returns:
+    - numpy.ndarray: Cluster label of each embedding.
+    """
+    rng = np.random.default_rng(seed)
+    best_labels, best_fit = None, None
+    for _ in range(n_init):
+        centers = embeddings[[rng.integers(len(embeddings))]]
+        for _ in range(1, n_clusters):
+            distance = np.clip(1 - (embeddings @ centers.T).max(axis=1), 0, None)
+            probabilities = distance / distance.sum() if distance.sum() > 0 else None
+            centers = np.vstack((centers, embeddings[rng.choice(len(embeddings), p=probabilities)]))
+
+        labels = None
+        for _ in range(iterations):
+            similarity = embeddings @ centers.T
+            new_labels = similarity.argmax(axis=1)
+            if labels is not None and np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            centers = np.eye(n_clusters)[labels].T @ embeddings
+            empty = ~centers.any(axis=1)
+            if empty.any():
+                # An emptied cluster restarts at the points its neighbours fit worst
+                worst = np.argsort(similarity.max(axis=1))[:empty.sum()]
+                centers[empty] = embeddings[worst]
+            centers /= np.linalg.norm(centers, axis=1, keepdims=True) + 1e-8
+
+        fit = float((embeddings @ centers.T).max(axis=1).sum())
+        if best_fit is None or fit > best_fit:
+            best_labels, best_fit = labels, fit
+    return best_labels
+
+
+def silhouette_score(embeddings, labels, n_clusters, sample=SILHOUETTE_SAMPLE, seed=0):
+    """
+    Mean silhouette (cosine distance) of a sample of the points against all points.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(embeddings), size=min(sample, len(embeddings)), replace=False)
+    distance = 1 - embeddings[rows] @ embeddings.T
+    one_hot = np.eye(n_clusters)[labels]
+    sizes = one_hot.sum(axis=0)
+    totals = distance @ one_hot
+
+    own = labels[rows]
+    own_size = sizes[own] - 1
+    inner = np.where(own_size > 0, totals[np.arange(len(rows)), own] / np.maximum(own_size, 1), 0)
+    others = totals / np.maximum(sizes, 1)
+    others[np.arange(len(rows)), own] = np.inf
+    outer = others.min(axis=1)
+    scores = np.where(own_size > 0, (outer - inner) / np.maximum(np.maximum(inner, outer), 1e-8), 0)
+    return float(scores.mean())
+
+
+def smooth_labels(labels, n_clusters):
+    """
+    Majority vote of each window with its two neighbours, so single-window flips are removed.
+    """
+    if labels.size < 3:
+        return labels
+    votes = np.pad(np.eye(n_clusters)[labels], ((1, 1), (0, 0)), mode='edge')
+    # The window's own label outweighs either neighbour alone, but not both together
+    return (votes[:-2] + 1.5 * votes[1:-1] + votes[2:]).argmax(axis=1)
+
+
+class DiarizationBackend:
+    """
+    Speaker diarization engine. Every backend returns DIARIZATION_DTYPE segments in
+    seconds, so the rest of the pipeline does not depend on which one is used.
+    """
+
+    name = "base"
+
+    def diarize(self, audio, sr=SAMPLE_RATE, audio_path=None, n_speakers=None):
+        """
+        Finds who speaks when.
+
+        Args:
+        - audio (numpy.ndarray): Mono samples.
+        - sr (int): Sampling rate of `audio`.
+        - audio_path (str, optional): File the samples were decoded from.
+        - n_speakers (int, optional): Number of speakers; None or 0 estimates it.
+
+        Returns:
+        - numpy.ndarray: Segments (DIARIZATION_DTYPE) in time order.
+        """
+        raise NotImplementedError
+
+
+class EmbeddingBackend(DiarizationBackend):
+    """
+    Voice activity detection, one cepstral speaker embedding per window of speech and
+    spherical k-means, all vectorized NumPy. The number of speakers is the one with the
+    best silhouette score. Segments cover speech only, with real start and end times.
+    """
+
+    name = "embedding"
+
+    def __init__(self, window_seconds=DIARIZATION_WINDOW_SECONDS, vad_threshold_db=VAD_THRESHOLD_DB,
+                 max_speakers=DIARIZATION_MAX_SPEAKERS):
+        self.window_seconds = window_seconds
+        self.vad_threshold_db = vad_threshold_db
+        self.max_speakers = max_speakers
+
+    def count_speakers(self, embeddings):
+        """
+        Clusters the embeddings for every candidate number of speakers and keeps the best.
+        Interviews have at least two people, so the search starts at two.
+
+        Returns:
+        - numpy.ndarray: Cluster label of each embedding.
+        """
+        best_labels, best_score = None, None
+        for n_clusters in range(2, min(self.max_speakers, len(embeddings) - 1) + 1):
+            labels = cluster_embeddings(embeddings, n_clusters)
+            score = silhouette_score(embeddings, labels, n_clusters)
+            if best_score is None or score > best_score:
+                best_labels, best_score = labels, score
+        return best_labels if best_labels is not None else np.zeros(len(embeddings), dtype=np.int64)
+
+    def diarize(self, audio, sr=SAMPLE_RATE, audio_path=None, n_speakers=None):
+        energy, mfcc = frame_features(audio, sr)
+        speech = speech_frames(energy, self.vad_threshold_db)
+        if not speech.any():
+            return np.zeros(0, dtype=DIARIZATION_DTYPE)
+
+        embeddings, starts, ends = window_embeddings(mfcc, speech, self.window_seconds)
+        if len(embeddings) < 2:
+            labels = np.zeros(len(embeddings), dtype=np.int64)
+        elif n_speakers:
+            n_speakers = min(n_speakers, len(embeddings))
+            labels = cluster_embeddings(embeddings, n_speakers)
+        else:
+            labels = self.count_speakers(embeddings)
+        if len(labels):
+            labels = smooth_labels(labels, labels.max() + 1)
+
+        # Each speech frame takes the label of the window centred nearest to it
+        frame_labels = np.full(speech.size, -1, dtype=np.int64)
+        if len(labels):
+            centers = (starts + ends) / 2
+            frames = np.flatnonzero(speech)
+            following = np.clip(np.searchsorted(centers, frames), 0, len(centers) - 1)
+            previous = np.maximum(following - 1, 0)
+            nearest = np.where(np.abs(frames - centers[previous]) <= np.abs(centers[following] - frames),
+                               previous, following)
+            frame_labels[frames] = labels[nearest]
+        else:
+            frame_labels[speech] = 0
+
+        run_starts, run_ends, values = _runs(frame_labels)
+        spoken = values >= 0
+        # Speakers are numbered in order of first appearance
+        _, first = np.unique(values[spoken], return_index=True)
+        order = values[spoken][np.sort(first)]
+        renumber = np.zeros(order.max() + 1, dtype=np.int32)
+        renumber[order] = np.arange(order.size)
+
+        segments = np.empty(int(spoken.sum()), dtype=DIARIZATION_DTYPE)
+        segments['start'] = run_starts[spoken] * HOP_SECONDS
+        segments['end'] = run_ends[spoken] * HOP_SECONDS + (FRAME_SECONDS - HOP_SECONDS)
+        segments['speaker'] = renumber[values[spoken]]
+        return segments
+
+
+class PyAudioAnalysisBackend(DiarizationBackend):
+    """
+    pyAudioAnalysis' feature and clustering diarization. Slower, and its segments are
+    fixed-length frames covering the whole recording, silences included.
+    """
+
+    name = "pyaudioanalysis"
+
+    def diarize(self, audio, sr=SAMPLE_RATE, audio_path=None, n_speakers=None):
+        # Imported here: pyAudioAnalysis takes seconds to import
+        from pyAudioAnalysis import audioSegmentation as aS
+
+        if audio_path is None:
+            raise ValueError("The pyaudioanalysis diarization backend needs the audio file path.")
+        # pyAudioAnalysis only accepts a path; it reads the 16 kHz PCM WAV without resampling.
+        # A speaker count of 0 makes it estimate the count itself.
+        labels, _, _ = aS.speaker_diarization(audio_path, n_speakers or 0)
+        if len(labels) == 0:
+            return np.zeros(0, dtype=DIARIZATION_DTYPE)
+        # Merge consecutive equal frame labels into runs
+        return labels_to_segments(labels, len(audio) / sr / len(labels))
+
+
+BACKENDS = {
+    EmbeddingBackend.name: EmbeddingBackend,
+    PyAudioAnalysisBackend.name: PyAudioAnalysisBackend,
+}
+
+
+def get_backend(name=None):
+    """
+    Returns a diarization backend.
+
+    Args:
+    - name (str, optional): Backend name. Defaults to DIARIZATION_BACKEND.
+
+    Returns:
+    - DiarizationBackend: The backend.
+    """
+    name = name or DIARIZATION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown diarization backend '{name}'. Backends: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,218 @@
+import os
+import re
+import time
+import uuid
+import hashlib
+import threading
+import numpy as np
+
+import model_registry
+import metrics
+
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'embedding_cache')
+)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE", "1") != "0"
+
+# Keys are the first 16 bytes of the SHA-256 of the sentence
+KEY_DTYPE = np.dtype('V16')
+
+
+def sentence_key(sentence):
+    """
+    Returns the cache key of a sentence.
+    """
+    return hashlib.sha256(sentence.encode('utf-8')).digest()[:16]
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, on-disk cache of sentence embeddings for one model.
+
+    Entries are written in immutable shards: <shard>.npy holds a float32 matrix
+    of embeddings (memory-mapped on read) and <shard>.keys.npy the matching
+    sentence hashes. New shards never modify existing files, so several
+    processes can share the cache. When the cache grows past max_bytes, the
+    least recently used shards are deleted.
+    """
+
+    def __init__(self, model_name, cache_dir=EMBEDDING_CACHE_DIR, max_bytes=EMBEDDING_CACHE_MAX_BYTES):
+        self.model_name = model_name
+        self.model_dir = os.path.join(cache_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = {}
+        self._shards = {}
+        self._known_shards = set()
+
+    def _shard_names(self):
+        if not os.path.isdir(self.model_dir):
+            return set()
+        # A shard is complete once its keys file exists (it is written last)
+        return {name[:-len('.keys.npy')] for name in os.listdir(self.model_dir) if name.endswith('.keys.npy')}
+
+    def _refresh(self):
+        """
+        Indexes shards written since the last refresh, including by other processes.
+        """
+        shard_names = self._shard_names()
+        if shard_names == self._known_shards:
+            return
+        removed = self._known_shards - shard_names
+        if removed:
+            self._index = {key: entry for key, entry in self._index.items() if entry[0] not in removed}
+            for shard in removed:
+                self._shards.pop(shard, None)
+        for shard in sorted(shard_names - self._known_shards):
+            try:
+                keys = np.load(os.path.join(self.model_dir, f"{shard}.keys.npy"))
+            except FileNotFoundError:
+                shard_names.discard(shard)
+                continue
+            raw = keys.tobytes()
+            for row in range(len(keys)):
+                self._index[raw[row * 16:(row + 1) * 16]] = (shard, row)
+        self._known_shards = shard_names
+
+    def _vectors(self, shard):
+        if shard not in self._shards:
+            self._shards[shard] = np.load(os.path.join(self.model_dir, f"{shard}.npy"), mmap_mode='r')
+        return self._shards[shard]
+
+    def lookup(self, keys):
+        """
+        Returns a dict mapping the position of every cached key to its embedding.
+        """
+        found = {}
+        with self._lock:
+            self._refresh()
+            used_shards = set()
+            for position, key in enumerate(keys):
+                entry = self._index.get(key)
+                if entry is None:
+                    continue
+                shard, row = entry
+                try:
+                    found[position] = np.array(self._vectors(shard)[row])
+                except FileNotFoundError:
+                    # Evicted by another process since the last refresh
+                    continue
+                used_shards.add(shard)
+            # Touch the shards that served hits so eviction removes the least recently used
+            now = time.time()
+            for shard in used_shards:
+                try:
+                    os.utime(os.path.join(self.model_dir, f"{shard}.npy"), (now, now))
+                except FileNotFoundError:
+                    pass
+        return found
+
+    def store(self, keys, embeddings):
+        """
+        Writes new entries as one shard, then evicts old shards if the cache is too large.
+        """
+        if not keys:
+            return
+        with self._lock:
+            os.makedirs(self.model_dir, exist_ok=True)
+            shard = f"shard-{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+            vectors_path = os.path.join(self.model_dir, f"{shard}.npy")
+            keys_path = os.path.join(self.model_dir, f"{shard}.keys.npy")
+            np.save(vectors_path, np.asarray(embeddings, dtype=np.float32))
+            # Written to a temporary name and renamed so readers only ever see complete shards
+            tmp_keys_path = os.path.join(self.model_dir, f"{shard}.keys.tmp.npy")
+            np.save(tmp_keys_path, np.frombuffer(b''.join(keys), dtype=KEY_DTYPE))
+            os.replace(tmp_keys_path, keys_path)
+            self._evict()
+
+    def _evict(self):
+        shards = []
+        total = 0
+        for shard in self._shard_names():
+            try:
+                vectors_stat = os.stat(os.path.join(self.model_dir, f"{shard}.npy"))
+                keys_size = os.path.getsize(os.path.join(self.model_dir, f"{shard}.keys.npy"))
+            except FileNotFoundError:
+                continue
+            size = vectors_stat.st_size + keys_size
+            shards.append((vectors_stat.st_mtime, shard, size))
+            total += size
+
+        for _, shard, size in sorted(shards):
+            if total <= self.max_bytes:
+                break
+            # The keys file goes first so the shard stops being visible before its vectors disappear
+            for suffix in ('.keys.npy', '.npy'):
+                try:
+                    os.remove(os.path.join(self.model_dir, f"{shard}{suffix}"))
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name):
+    """
+    Returns the shared cache of a model.
+    """
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
+
+
+def encode_with_cache(sentences, model_name=model_registry.SENTENCE_TRANSFORMER_MODEL_NAME, model=None):
+    """
+    Embeds sentences, running the model only for sentences missing from the cache.
+
+    Args:
+    - sentences (list): Sentences to embed.
+    - model_name (str): SentenceTransformer model name, part of the cache key.
+    - model (SentenceTransformer, optional): Loaded model. Defaults to the shared registry model,
+      which is only loaded if there is at least one cache miss.
+
+    Returns:
+    - numpy.ndarray: float32 embeddings, one row per sentence.
+    """
+    if not sentences:
+        # Shaped like any other result, so dimension checks downstream still hold. The model
+        # is not loaded just for its dimension: without a loaded one, the pipeline's is used
+        from embeddings_and_pinecone_store import EMBEDDING_DIMENSION
+
+        model = model or model_registry.get_loaded_model("sentence-transformer", model_name)
+        dimension = model.get_sentence_embedding_dimension() if model is not None else EMBEDDING_DIMENSION
+        return np.zeros((0, dimension), dtype=np.float32)
+    if not EMBEDDING_CACHE_ENABLED:
+        model = model or model_registry.get_sentence_transformer(model_name)
+        return model.encode(sentences, convert_to_numpy=True)
+
+    cache = get_embedding_cache(model_name)
+    keys = [sentence_key(sentence) for sentence in sentences]
+    found = cache.lookup(keys)
+
+    # Repeated sentences within the call are encoded once
+    missing = {}
+    for position, key in enumerate(keys):
+        if position not in found:
+            missing.setdefault(key, []).append(position)
+
+    if missing:
+        model = model or model_registry.get_sentence_transformer(model_name)
+        first_positions = [positions[0] for positions in missing.values()]
+        with metrics.timed_call('embedding.encode', sentences=len(first_positions)):
+            new_embeddings = model.encode([sentences[i] for i in first_positions], convert_to_numpy=True)
+        cache.store(list(missing), new_embeddings)
+        for embedding, positions in zip(new_embeddings, missing.values()):
+            for position in positions:
+                found[position] = embedding
+
+    computed = sum(len(positions) for positions in missing.values())
+    metrics.increment('embeddings_cached', len(sentences) - computed)
+    metrics.increment('embeddings_computed', computed)
+    print(f"Embeddings: {len(sentences) - computed} cached, {computed} computed.")
+    return np.stack([found[i] for i in range(len(sentences))]).astype(np.float32, copy=False)
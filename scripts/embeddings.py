@@ -1,18 +1,17 @@
 import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from embedding_cache import encode_with_cache
+from transcript_store import TranscriptStore
 
 # Suppress TensorFlow warnings and logging
 # os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # Suppresses INFO and WARNING logs
 
 # Define the directory paths
-TRANSCRIPTS_DIR = os.path.join('..', 'data', 'transcripts')
 PROCESSED_DIR = os.path.join('..', 'data', 'processed')
 
-# Load the SentenceTransformer model
-print("Loading SentenceTransformer model...")
-embed = SentenceTransformer('all-MiniLM-L6-v2')  # You can choose other pre-trained models
-print("Model loaded successfully.")
+# Sentence files produced by text_preprocessing, without the _sentences.txt suffix
+SENTENCE_FILE_NAMES = ('main', 'speaker1', 'speaker2')
 
 def get_embeddings(sentences):
     """
@@ -24,35 +23,102 @@ def get_embeddings(sentences):
     Returns:
     - numpy.ndarray: Array of embeddings for each sentence.
     """
-    embeddings = embed.encode(sentences, convert_to_numpy=True)
+    # Only sentences missing from the on-disk embedding cache are run through the model
+    embeddings = encode_with_cache(sentences)
     return embeddings
 
-def process_transcripts_and_generate_embeddings():
+def read_sentences_with_offsets(file_path):
+    """
+    Reads a sentences file (one sentence per line) and records where each sentence sits in it.
+
+    Args:
+    - file_path (str): Path to a *_sentences.txt file.
+
+    Returns:
+    - tuple: (list of non-empty sentences, int64 array of [start, end) byte offsets per sentence).
+    """
+    with open(file_path, 'rb') as file:
+        data = file.read()
+
+    sentences = []
+    offsets = []
+    start = 0
+    for line in data.split(b'\n'):
+        end = start + len(line)
+        if line.strip():
+            sentences.append(line.decode('utf-8').strip())
+            offsets.append((start, end))
+        start = end + 1
+    return sentences, np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+
+def get_embedding_paths(processed_dir, name):
+    """
+    Returns the paths of the sentences, embeddings and offsets files of one transcript.
+    """
+    return (
+        os.path.join(processed_dir, f"{name}_sentences.txt"),
+        os.path.join(processed_dir, f"{name}_embeddings.npy"),
+        os.path.join(processed_dir, f"{name}_offsets.npy"),
+    )
+
+def process_sentences_and_generate_embeddings(processed_dir=PROCESSED_DIR, names=SENTENCE_FILE_NAMES):
     """
-    Process all transcript files in the transcripts directory, generate embeddings,
-    and save them in the processed directory.
+    Embed every sentence of the processed sentence files and save one embedding
+    matrix per file, row-aligned with the sentences, plus the sentence byte offsets.
+
+    Args:
+    - processed_dir (str): Directory holding the *_sentences.txt files.
+    - names (tuple): Sentence files to embed.
+    """
+    for name in names:
+        sentences_path, embeddings_path, offsets_path = get_embedding_paths(processed_dir, name)
+        if not os.path.exists(sentences_path):
+            print(f"Error: Sentences file '{sentences_path}' does not exist.")
+            continue
+
+        sentences, offsets = read_sentences_with_offsets(sentences_path)
+        embeddings = get_embeddings(sentences)
+
+        np.save(embeddings_path, np.asarray(embeddings, dtype=np.float32))
+        np.save(offsets_path, offsets)
+        print(f"Embeddings for {name} ({len(sentences)} sentences) saved successfully.")
+
+def load_sentence_embeddings(processed_dir, name):
     """
-    if not os.path.exists(PROCESSED_DIR):
-        os.makedirs(PROCESSED_DIR)
+    Loads the sentences of a transcript together with their precomputed embeddings.
 
-    # Loop through all transcript files and generate embeddings
-    for filename in os.listdir(TRANSCRIPTS_DIR):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(TRANSCRIPTS_DIR, filename)
+    The embedding matrix is memory-mapped, not read into memory.
 
-            # Read the content of the file
-            with open(file_path, 'r', encoding='utf-8') as file:
-                sentences = [line.strip() for line in file if line.strip()]
+    Returns:
+    - tuple: (sentences, embeddings), or None if the embeddings are missing or older than
+      the sentences file.
+    """
+    sentences_path, embeddings_path, offsets_path = get_embedding_paths(processed_dir, name)
+    if not (os.path.exists(embeddings_path) and os.path.exists(offsets_path)):
+        return None
+    if os.path.getmtime(embeddings_path) < os.path.getmtime(sentences_path):
+        return None
+
+    sentences, _ = read_sentences_with_offsets(sentences_path)
+    embeddings = np.load(embeddings_path, mmap_mode='r')
+    if embeddings.ndim != 2 or embeddings.shape[0] != len(sentences):
+        return None
+    return sentences, embeddings
 
-            # Generate embeddings for sentences
-            embeddings = get_embeddings(sentences)
+def embed_store_sentences(store_dir):
+    """
+    Embed every sentence of the transcript store once and save the matrix in the store.
 
-            # Save the embeddings to a corresponding processed file
-            processed_file_path = os.path.join(PROCESSED_DIR, f"{filename.replace('.txt', '')}_embeddings.npy")
-            with open(processed_file_path, 'wb') as emb_file:
-                np.save(emb_file, embeddings)
+    Each sentence is embedded a single time; the main and per-speaker views of the
+    transcript all point at the same rows.
 
-            print(f"Embeddings for {filename} saved successfully.")
+    Args:
+    - store_dir (str): Transcript store with sentences from text_preprocessing.
+    """
+    store = TranscriptStore(store_dir)
+    sentences = store.texts(store.sentences)
+    store.write_embeddings(get_embeddings(sentences) if sentences else np.zeros((0, 0), dtype=np.float32))
+    print(f"Embeddings for {len(sentences)} sentences saved in {store_dir}.")
 
 if __name__ == "__main__":
-    process_transcripts_and_generate_embeddings()
+    process_sentences_and_generate_embeddings()
@@ -1,51 +1,42 @@
 import os
-import pinecone
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 import warnings
-from pinecone import Pinecone, ServerlessSpec
+
+from embedding_cache import encode_with_cache
+from embeddings import load_sentence_embeddings, read_sentences_with_offsets
+from transcript_store import TranscriptStore
+import vector_store
+import lexical_index
+import metrics
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
 # Load environment variables from .env
 load_dotenv()
 
+# Dimension of the all-MiniLM-L6-v2 sentence embeddings
+EMBEDDING_DIMENSION = 384
+
+# Upserts are sent in bounded batches, several at a time, to stay under request-size limits
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "100"))
+UPSERT_WORKERS = int(os.getenv("UPSERT_WORKERS", "4"))
+
 def init_pinecone(api_key, environment):
     """
-    Initialize the Pinecone environment and create indexes for interviewer, candidate, and main if they don't exist.
+    Initialize the vector store and create indexes for interviewer, candidate, and main if they don't exist.
+
+    The backend (Pinecone or the embedded local store) is chosen by VECTOR_STORE_BACKEND.
 
     Args:
     - api_key (str): Pinecone API key.
     - environment (str): Pinecone environment name.
     """
-    # Initialize Pinecone
-    pc = Pinecone(api_key=api_key)
-
-    # Define index names
-    interviewer_index_name = "interviewer-index"
-    candidate_index_name = "candidate-index"
-    main_index_name = "main-index"
-    
-    # Define index spec (dimension and metric)
-    index_spec = ServerlessSpec(cloud="aws", region="us-east-1")
-    
-    # Check and create the indexes if they don't exist
-    if interviewer_index_name not in pc.list_indexes().names():
-        print(f"Creating index: {interviewer_index_name}")
-        pc.create_index(interviewer_index_name, dimension=384, spec=index_spec)  # Add spec here
-    
-    if candidate_index_name not in pc.list_indexes().names():
-        print(f"Creating index: {candidate_index_name}")
-        pc.create_index(candidate_index_name, dimension=384, spec=index_spec)
-    
-    if main_index_name not in pc.list_indexes().names():
-        print(f"Creating index: {main_index_name}")
-        pc.create_index(main_index_name, dimension=384, spec=index_spec)
-    
     # Return the index objects for all three
-    interviewer_index = pc.Index(interviewer_index_name)
-    candidate_index = pc.Index(candidate_index_name)
-    main_index = pc.Index(main_index_name)
+    interviewer_index = vector_store.get_index(vector_store.INTERVIEWER_INDEX_NAME, EMBEDDING_DIMENSION, api_key)
+    candidate_index = vector_store.get_index(vector_store.CANDIDATE_INDEX_NAME, EMBEDDING_DIMENSION, api_key)
+    main_index = vector_store.get_index(vector_store.MAIN_INDEX_NAME, EMBEDDING_DIMENSION, api_key)
     
     return interviewer_index, candidate_index, main_index
 
@@ -59,75 +50,174 @@ def get_embeddings(sentences):
     Returns:
     - numpy.ndarray: Array of embeddings for each sentence.
     """
-    embed = SentenceTransformer('all-MiniLM-L6-v2')
-    embeddings = embed.encode(sentences, convert_to_numpy=True)
+    # Only sentences missing from the on-disk embedding cache are run through the model
+    embeddings = encode_with_cache(sentences)
     return embeddings
 
-def store_embeddings_in_pinecone(index, sentences, embeddings):
+def load_or_compute_embeddings(processed_dir, name):
     """
-    Store the sentence embeddings in Pinecone.
+    Returns the sentences of a transcript with their embeddings, reusing the matrix saved by
+    the embeddings stage and only embedding from scratch when it is missing or stale.
 
     Args:
-    - index (pinecone.Index): The Pinecone index.
+    - processed_dir (str): Directory holding the *_sentences.txt and *_embeddings.npy files.
+    - name (str): Transcript name (main, speaker1 or speaker2).
+
+    Returns:
+    - tuple: (sentences, embeddings).
+    """
+    loaded = load_sentence_embeddings(processed_dir, name)
+    if loaded is not None:
+        return loaded
+
+    print(f"No up-to-date embeddings for {name}; computing them now.")
+    sentences, _ = read_sentences_with_offsets(os.path.join(processed_dir, f"{name}_sentences.txt"))
+    return sentences, get_embeddings(sentences)
+
+def make_vector_id(interview_id, position, sentence):
+    """
+    Builds a deterministic vector ID from the interview, the sentence position and the sentence text.
+    """
+    sentence_hash = hashlib.sha1(sentence.encode('utf-8')).hexdigest()[:12]
+    return f"{interview_id}-{position:06d}-{sentence_hash}"
+
+def store_embeddings_in_pinecone(index, sentences, embeddings, interview_id,
+                                 batch_size=UPSERT_BATCH_SIZE, max_workers=UPSERT_WORKERS, metadata=None):
+    """
+    Store the sentence embeddings in the interview's namespace, in bounded batches sent concurrently.
+
+    Vector IDs are deterministic, so re-running the ingest for the same interview overwrites
+    its own vectors instead of adding duplicates, and never touches other interviews.
+
+    Args:
+    - index (vector_store.VectorStore): The vector store index.
     - sentences (list): The list of sentences.
-    - embeddings (list): The list of sentence embeddings.
+    - embeddings (numpy.ndarray): The sentence embeddings, one row per sentence.
+    - interview_id (str): Interview identifier, used as the namespace and in the vector IDs.
+    - batch_size (int): Maximum number of vectors per upsert request.
+    - max_workers (int): Maximum number of upsert requests in flight.
+    - metadata (list, optional): Extra metadata of each sentence (e.g. its times and speaker).
     """
-    # Prepare data for upsert operation
-    upsert_data = [(str(i), embedding.tolist(), {"sentence": sentence}) 
-                   for i, (embedding, sentence) in enumerate(zip(embeddings, sentences))]
-    
-    # Perform the upsert operation (store embeddings)
-    print(f"Upserting {len(upsert_data)} vectors to Pinecone...")
-    index.upsert(vectors=upsert_data)
-    print("Upsert complete!")
+    def upsert_batch(start):
+        end = min(start + batch_size, len(sentences))
+        # One tolist() call per batch instead of one per vector
+        values = embeddings[start:end].tolist()
+        batch = [
+            (make_vector_id(interview_id, i, sentences[i]), values[i - start],
+             {"sentence": sentences[i], "position": i, **(metadata[i] if metadata else {})})
+            for i in range(start, end)
+        ]
+        with metrics.timed_call('vector_store.upsert', vectors=len(batch)):
+            index.upsert(vectors=batch, namespace=interview_id)
+        return len(batch)
+
+    print(f"Upserting {len(sentences)} vectors to {getattr(index, 'name', 'index')} (namespace '{interview_id}')...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        upserted = sum(executor.map(upsert_batch, range(0, len(sentences), batch_size)))
+    metrics.increment('vectors_upserted', upserted)
+    print(f"Upsert complete! {upserted} vectors stored.")
+    return upserted
+
+def replace_interview_vectors(index, sentences, embeddings, interview_id, metadata=None):
+    """
+    Replaces the interview's vectors in an index: the new ones are upserted first, then
+    only the vectors no longer part of the transcript are deleted. A failed upsert leaves
+    the previous vectors searchable instead of an empty or partial namespace.
 
-def process_transcripts_and_store_embeddings():
+    Returns:
+    - list: Vector ID of each sentence.
     """
-    Process the speaker1.txt and speaker2.txt to decide candidate and interviewer, generate embeddings,
-    and store them in Pinecone.
+    ids = [make_vector_id(interview_id, i, sentence) for i, sentence in enumerate(sentences)]
+    store_embeddings_in_pinecone(index, sentences, embeddings, interview_id, metadata=metadata)
+    current = set(ids)
+    stale = [vector_id for vector_id in index.list_ids(interview_id) if vector_id not in current]
+    if stale:
+        index.delete(stale, namespace=interview_id)
+        print(f"Deleted {len(stale)} stale vectors from {getattr(index, 'name', 'index')}.")
+    return ids
+
+def process_transcripts_and_store_embeddings(processed_dir=os.path.join('..', 'data', 'processed'),
+                                             interview_id=vector_store.DEFAULT_INTERVIEW_ID):
+    """
+    Process the speaker1.txt and speaker2.txt to decide candidate and interviewer, and store
+    the precomputed sentence embeddings in Pinecone.
+
+    Args:
+    - processed_dir (str): Directory holding the *_sentences.txt files.
+    - interview_id (str): Interview identifier; its vectors go to a namespace of the same name.
     """
     # Initialize Pinecone
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")  # Load API key from .env
     environment = "us-east-1"
     interviewer_index, candidate_index, main_index = init_pinecone(PINECONE_API_KEY, environment)
 
-    # Define the transcripts directory
-    PROCESSED_DIR = os.path.join('..', 'data', 'processed')
-
-    # Read the contents of speaker1.txt and speaker2.txt
-    with open(os.path.join(PROCESSED_DIR, 'speaker1_sentences.txt'), 'r', encoding='utf-8') as file:
-        speaker1_data = file.read()
-    
-    with open(os.path.join(PROCESSED_DIR, 'speaker2_sentences.txt'), 'r', encoding='utf-8') as file:
-        speaker2_data = file.read()
+    # Sentence-aligned embeddings written by the embeddings stage (memory-mapped)
+    speaker1_sentences, speaker1_embeddings = load_or_compute_embeddings(processed_dir, 'speaker1')
+    speaker2_sentences, speaker2_embeddings = load_or_compute_embeddings(processed_dir, 'speaker2')
+    main_sentences, main_speech_embeddings = load_or_compute_embeddings(processed_dir, 'main')
 
     # Assign the candidate and interviewer based on the length of the data
-    if len(speaker1_data) > len(speaker2_data):
-        candidate_data = speaker1_data
-        interviewer_data = speaker2_data
+    if sum(map(len, speaker1_sentences)) > sum(map(len, speaker2_sentences)):
+        candidate_sentences, candidate_embeddings = speaker1_sentences, speaker1_embeddings
+        interviewer_sentences, interviewer_embeddings = speaker2_sentences, speaker2_embeddings
+    else:
+        candidate_sentences, candidate_embeddings = speaker2_sentences, speaker2_embeddings
+        interviewer_sentences, interviewer_embeddings = speaker1_sentences, speaker1_embeddings
+
+    # Store the embeddings under respective indexes, replacing this interview's previous vectors,
+    # and build the matching BM25 index of each for hybrid retrieval
+    for index, sentences, embeddings in ((interviewer_index, interviewer_sentences, interviewer_embeddings),
+                                         (candidate_index, candidate_sentences, candidate_embeddings),
+                                         (main_index, main_sentences, main_speech_embeddings)):
+        ids = replace_interview_vectors(index, sentences, embeddings, interview_id)
+        lexical_index.build_index(index.name, interview_id, sentences, ids)
+
+def store_interview_embeddings(store_dir, interview_id=vector_store.DEFAULT_INTERVIEW_ID):
+    """
+    Stores the sentence embeddings of the transcript store in the main, candidate and
+    interviewer indexes, with each sentence's times and speaker as metadata.
+
+    The candidate is the speaker with the most talk time; every other speaker goes to
+    the interviewer index.
+
+    Args:
+    - store_dir (str): Transcript store with sentences and embeddings.
+    - interview_id (str): Interview identifier; its vectors go to a namespace of the same name.
+    """
+    PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+    interviewer_index, candidate_index, main_index = init_pinecone(PINECONE_API_KEY, "us-east-1")
+
+    store = TranscriptStore(store_dir)
+    embeddings = store.embeddings()
+    if embeddings is None:
+        raise FileNotFoundError(f"No sentence embeddings in '{store_dir}'. Run the embeddings stage first.")
+
+    talk_time = store.talk_time()
+    candidate = store.candidate_speaker()
+    if candidate is None:
+        print("No speakers in the transcript; only the main index gets sentences.")
+        # Speaker sentences of a previous run of this interview would otherwise stay searchable
+        for index in (interviewer_index, candidate_index):
+            index.delete_namespace(interview_id)
+            lexical_index.delete_index(index.name, interview_id)
+        targets = [(main_index, store.sentences)]
     else:
-        candidate_data = speaker2_data
-        interviewer_data = speaker1_data
-
-    # Read the content of the main.txt file for the whole conversation
-    with open(os.path.join(PROCESSED_DIR, 'main_sentences.txt'), 'r', encoding='utf-8') as file:
-        main_data = file.read()
-
-    # Generate embeddings for each group of sentences
-    # Split into sentences for better processing
-    interviewer_sentences = interviewer_data.split('\n')
-    candidate_sentences = candidate_data.split('\n')
-    main_sentences = main_data.split('\n')
-
-    # Generate embeddings for each group of sentences
-    interviewer_embeddings = get_embeddings(interviewer_sentences)
-    candidate_embeddings = get_embeddings(candidate_sentences)
-    main_speech_embeddings = get_embeddings(main_sentences)
-
-    # Store the embeddings in Pinecone under respective indexes
-    store_embeddings_in_pinecone(interviewer_index, interviewer_sentences, interviewer_embeddings)
-    store_embeddings_in_pinecone(candidate_index, candidate_sentences, candidate_embeddings)
-    store_embeddings_in_pinecone(main_index, main_sentences, main_speech_embeddings)
+        print("Talk time: " + ", ".join(f"speaker{speaker + 1} {seconds:.0f}s"
+                                        for speaker, seconds in talk_time.items())
+              + f"; speaker{candidate + 1} is the candidate.")
+        is_candidate = store.sentences['speaker'] == candidate
+        targets = [(interviewer_index, store.sentences[~is_candidate]),
+                   (candidate_index, store.sentences[is_candidate]),
+                   (main_index, store.sentences)]
+
+    for index, rows in targets:
+        sentences = store.texts(rows)
+        metadata = [{"start": float(start), "end": float(end), "speaker": int(speaker)}
+                    for start, end, speaker in zip(rows['start'], rows['end'], rows['speaker'])]
+        ids = replace_interview_vectors(index, sentences, embeddings[rows['embedding_row']], interview_id,
+                                        metadata=metadata)
+        lexical_index.build_index(index.name, interview_id, sentences, ids,
+                                  starts=rows['start'], ends=rows['end'], speakers=rows['speaker'])
 
 if __name__ == "__main__":
     process_transcripts_and_store_embeddings()
@@ -0,0 +1,190 @@
+import os
+import json
+import numpy as np
+
+from transcript_store import TranscriptStore
+
+# A silence between two words of the same turn longer than this counts as a pause
+PAUSE_SECONDS = float(os.getenv("PAUSE_SECONDS", "0.3"))
+# Pauses longer than this are reported separately as long pauses
+LONG_PAUSE_SECONDS = 2.0
+# A speaker who starts talking less than this after the other speaker stopped, before
+# that speaker finished a sentence, interrupted them. Overlapping speech is not measured:
+# the turns come from one transcript and the diarization never overlaps, so it cannot be seen.
+INTERRUPTION_GAP_SECONDS = float(os.getenv("INTERRUPTION_GAP_SECONDS", "0.2"))
+
+# Fillers counted as single words, and as word pairs
+FILLER_WORDS = {'um', 'umm', 'uh', 'uhh', 'er', 'erm', 'ah', 'hmm', 'mm'}
+FILLER_PHRASES = {('you', 'know'), ('i', 'mean'), ('sort', 'of'), ('kind', 'of')}
+
+
+def _distribution(values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {'count': 0}
+    p50, p90 = np.percentile(values, [50, 90])
+    return {'count': int(values.size), 'mean': round(float(values.mean()), 3),
+            'p50': round(float(p50), 3), 'p90': round(float(p90), 3), 'max': round(float(values.max()), 3)}
+
+
+def _normalized_words(store):
+    texts = store.texts(store.words)
+    return np.array([''.join(character for character in text.lower() if character.isalpha() or character == "'")
+                     for text in texts], dtype=str)
+
+
+def compute_interview_metrics(store, diarization=None):
+    """
+    Computes the timing and speech metrics of an interview from its word timestamps,
+    speaker turns and diarization, with vectorized NumPy operations.
+
+    Args:
+    - store (TranscriptStore): Transcript store with timed words and turns.
+    - diarization (numpy.ndarray, optional): Diarization segments; talk time comes from
+      them when given, otherwise from the speaker turns.
+
+    Returns:
+    - dict: Interview-level values and one entry per speaker, with the candidate marked.
+    """
+    words, turns = store.words, store.turns
+    speakers = list(store.speakers)
+    candidate = store.candidate_speaker()
+
+    if diarization is not None and len(diarization):
+        durations = diarization['end'] - diarization['start']
+        talk_labels = diarization['speaker']
+    else:
+        durations = turns['end'] - turns['start']
+        talk_labels = turns['speaker']
+    size = max(speakers, default=-1) + 1
+    talk_time = np.bincount(talk_labels, weights=durations, minlength=size)
+    total_talk = talk_time.sum()
+
+    # Pauses: silences between consecutive words of the same turn
+    same_turn = words['speaker'][1:] == words['speaker'][:-1]
+    if len(turns):
+        turn_of_word = np.repeat(np.arange(len(turns)), turns['word_end'] - turns['word_start'])
+        same_turn &= turn_of_word[1:] == turn_of_word[:-1]
+    gaps = words['start'][1:] - words['end'][:-1]
+    pause_mask = same_turn & (gaps >= PAUSE_SECONDS)
+    pause_speakers = words['speaker'][1:][pause_mask]
+    pauses = gaps[pause_mask]
+
+    # Turn changes: how quickly the next speaker answers, and whether they cut in
+    change = turns['speaker'][1:] != turns['speaker'][:-1]
+    latency = (turns['start'][1:] - turns['end'][:-1])[change]
+    responders = turns['speaker'][1:][change]
+    interrupted = turns['speaker'][:-1][change]
+    previous_texts = store.texts(turns[:-1][change]) if change.any() else []
+    unfinished = np.array([not text.rstrip().endswith(('.', '?', '!')) for text in previous_texts], dtype=bool)
+    interruptions = (latency < INTERRUPTION_GAP_SECONDS) & unfinished
+
+    # Fillers per word
+    normalized = _normalized_words(store)
+    filler = np.isin(normalized, list(FILLER_WORDS))
+    if normalized.size > 1:
+        pairs = np.array([(first, second) in FILLER_PHRASES for first, second in zip(normalized[:-1], normalized[1:])])
+        filler[1:] |= pairs & (words['speaker'][1:] == words['speaker'][:-1])
+    word_counts = np.bincount(words['speaker'], minlength=size)
+    filler_counts = np.bincount(words['speaker'][filler], minlength=size)
+
+    per_speaker = {}
+    for speaker in speakers:
+        speaker_turns = turns[turns['speaker'] == speaker]
+        speaking_minutes = float((speaker_turns['end'] - speaker_turns['start']).sum()) / 60
+        count = int(word_counts[speaker])
+        speaker_pauses = pauses[pause_speakers == speaker]
+        per_speaker[f"speaker{speaker + 1}"] = {
+            'role': 'candidate' if speaker == candidate else 'interviewer',
+            'talk_seconds': round(float(talk_time[speaker]), 2),
+            'talk_ratio': round(float(talk_time[speaker] / total_talk), 3) if total_talk else 0.0,
+            'turns': int(len(speaker_turns)),
+            'words': count,
+            'words_per_minute': round(count / speaking_minutes, 1) if speaking_minutes else 0.0,
+            'pauses': _distribution(speaker_pauses),
+            'long_pauses': int((speaker_pauses >= LONG_PAUSE_SECONDS).sum()),
+            'response_latency_seconds': _distribution(latency[responders == speaker]),
+            'interruptions_made': int((interruptions & (responders == speaker)).sum()),
+            'interruptions_received': int((interruptions & (interrupted == speaker)).sum()),
+            'fillers': int(filler_counts[speaker]),
+            'fillers_per_100_words': round(100.0 * filler_counts[speaker] / count, 2) if count else 0.0,
+        }
+
+    duration = float(max(words['end'].max(initial=0.0), turns['end'].max(initial=0.0)))
+    return {
+        'duration_seconds': round(duration, 2),
+        'speaker_changes': int(change.sum()),
+        'interruptions': int(interruptions.sum()),
+        'candidate': f"speaker{candidate + 1}" if candidate is not None else None,
+        'speakers': per_speaker,
+    }
+
+
+def save_interview_metrics(store_dir, output_path, diarization_path=None):
+    """
+    Computes the interview metrics from the transcript store (and diarization) and saves them as JSON.
+
+    Returns:
+    - dict: The metrics.
+    """
+    diarization = np.load(diarization_path) if diarization_path and os.path.exists(diarization_path) else None
+    interview_metrics = compute_interview_metrics(TranscriptStore(store_dir), diarization)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(interview_metrics, file, indent=2)
+    print(f"Interview metrics saved at: {output_path}")
+    return interview_metrics
+
+
+def load_interview_metrics(path):
+    """
+    Returns the saved interview metrics, or None if they were not computed.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def format_for_prompt(interview_metrics, fields):
+    """
+    Renders selected metrics as short lines of numbers for an LLM prompt.
+
+    Args:
+    - interview_metrics (dict): Metrics from compute_interview_metrics, or None.
+    - fields (list): Per-speaker fields to include.
+
+    Returns:
+    - str: One line per speaker, or "" if there are no metrics.
+    """
+    if not interview_metrics:
+        return ""
+    labels = {
+        'talk_ratio': lambda value: f"talk-time share {value:.0%}",
+        'words_per_minute': lambda value: f"{value:.0f} words/min",
+        'pauses': lambda value: (f"{value['count']} pauses (median {value['p50']}s, p90 {value['p90']}s)"
+                                 if value['count'] else "no pauses"),
+        'long_pauses': lambda value: f"{value} pauses over {LONG_PAUSE_SECONDS:g}s",
+        'fillers_per_100_words': lambda value: f"{value} fillers per 100 words",
+        'response_latency_seconds': lambda value: (f"median response latency {value['p50']}s" if value['count']
+                                                   else "no measured responses"),
+        'interruptions_made': lambda value: f"interrupted the other speaker {value} times",
+        'interruptions_received': lambda value: f"was interrupted {value} times",
+        'turns': lambda value: f"{value} turns",
+    }
+    lines = []
+    for name, speaker in interview_metrics['speakers'].items():
+        values = ", ".join(labels[field](speaker[field]) for field in fields)
+        lines.append(f"- {speaker['role'].capitalize()} ({name}): {values}")
+    return "\n".join(lines)
+
+
+def prompt_section(interview_metrics, fields):
+    """
+    Returns the prompt section with the measured metrics, ending in a blank line,
+    or "" when there are none.
+    """
+    lines = format_for_prompt(interview_metrics, fields) if fields else ""
+    if not lines:
+        return ""
+    return f"**Measured Timing (computed from the recording, more reliable than the text):**\n{lines}\n\n"
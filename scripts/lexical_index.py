@@ -0,0 +1,228 @@
+import os
+import re
+import threading
+import numpy as np
+
+# Where the BM25 indexes are stored: <dir>/<index name>/<namespace>.npz
+LEXICAL_INDEX_DIR = os.getenv(
+    "LEXICAL_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'lexical_index')
+)
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Words are kept as spoken: no stop words are removed, so fillers like "um" and "you know" can be found
+_TOKEN = re.compile(r"[\w']+")
+
+# Loaded indexes, keyed by path, with the modification time they were loaded at
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def index_path(index_name, namespace, base_dir=None):
+    return os.path.join(base_dir or LEXICAL_INDEX_DIR, index_name, f"{namespace}.npz")
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over the sentences of one interview.
+
+    The vocabulary is a sorted array looked up with a binary search, and the
+    postings are stored in CSR form (per term: a slice of sentence rows and term
+    counts), so loading an index is a handful of array reads and a query only
+    touches the postings of its own terms.
+
+    Sentence times and speakers are kept alongside when known, so lexical matches
+    carry the same metadata as vector matches.
+    """
+
+    def __init__(self, terms, indptr, rows, counts, lengths, ids, sentences, positions,
+                 starts=None, ends=None, speakers=None):
+        self.terms = terms
+        self.indptr = indptr
+        self.rows = rows
+        self.counts = counts
+        self.lengths = lengths
+        self.ids = ids
+        self.sentences = sentences
+        self.positions = positions
+        self.starts = starts
+        self.ends = ends
+        self.speakers = speakers
+        count = len(lengths)
+        document_frequency = np.diff(indptr).astype(np.float64)
+        self.idf = np.log1p((count - document_frequency + 0.5) / (document_frequency + 0.5))
+        self.average_length = float(lengths.mean()) if count else 0.0
+
+    @classmethod
+    def build(cls, sentences, ids, positions=None, starts=None, ends=None, speakers=None):
+        """
+        Builds the index of a list of sentences.
+
+        Args:
+        - sentences (list): Sentence texts.
+        - ids (list): Vector ID of each sentence, so lexical and vector matches can be fused.
+        - positions (list, optional): Position of each sentence in its transcript. Defaults to 0..n-1.
+        - starts, ends (list, optional): Start and end time of each sentence, in seconds.
+        - speakers (list, optional): Speaker label of each sentence.
+
+        Returns:
+        - LexicalIndex: The index.
+        """
+        tokens = [tokenize(sentence) for sentence in sentences]
+        lengths = np.array([len(sentence_tokens) for sentence_tokens in tokens], dtype=np.int32)
+        flat = [token for sentence_tokens in tokens for token in sentence_tokens]
+        flat_rows = np.repeat(np.arange(len(tokens), dtype=np.int32), lengths)
+
+        terms, term_ids = np.unique(np.array(flat, dtype=str), return_inverse=True)
+        term_ids = term_ids.reshape(-1).astype(np.int64)
+        # One entry per distinct (term, sentence) pair, sorted by term then sentence
+        pairs, counts = np.unique(term_ids * len(tokens) + flat_rows, return_counts=True)
+        pair_terms = pairs // max(1, len(tokens))
+        indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_terms, minlength=len(terms)), out=indptr[1:])
+
+        if positions is None:
+            positions = np.arange(len(sentences))
+        return cls(
+            terms=terms,
+            indptr=indptr,
+            rows=(pairs % max(1, len(tokens))).astype(np.int32),
+            counts=counts.astype(np.int32),
+            lengths=lengths,
+            ids=np.array(ids, dtype=str),
+            sentences=np.array(sentences, dtype=str),
+            positions=np.asarray(positions, dtype=np.int64),
+            starts=np.asarray(starts, dtype=np.float64) if starts is not None else None,
+            ends=np.asarray(ends, dtype=np.float64) if ends is not None else None,
+            speakers=np.asarray(speakers, dtype=np.int32) if speakers is not None else None,
+        )
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp.npz"
+        optional = {name: getattr(self, name) for name in ('starts', 'ends', 'speakers')
+                    if getattr(self, name) is not None}
+        np.savez(temp_path, terms=self.terms, indptr=self.indptr, rows=self.rows, counts=self.counts,
+                 lengths=self.lengths, ids=self.ids, sentences=self.sentences, positions=self.positions,
+                 **optional)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def scores(self, query):
+        """
+        Returns the BM25 score of every sentence for a query.
+        """
+        scores = np.zeros(len(self.lengths), dtype=np.float64)
+        query_terms = np.unique(np.array(tokenize(query), dtype=str))
+        if not len(query_terms) or not len(self.terms):
+            return scores
+        term_ids = np.searchsorted(self.terms, query_terms)
+        known = term_ids < len(self.terms)
+        known[known] = self.terms[term_ids[known]] == query_terms[known]
+
+        for term_id in term_ids[known]:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            rows = self.rows[start:end]
+            counts = self.counts[start:end]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[rows] / self.average_length)
+            scores[rows] += self.idf[term_id] * counts * (BM25_K1 + 1) / (counts + norm)
+        return scores
+
+    def search(self, query, top_k=5):
+        """
+        Returns the best-matching sentences for a query.
+
+        Returns:
+        - list: Matches shaped like vector store matches ({'id', 'score', 'metadata'}), best first;
+          sentences sharing no term with the query are left out.
+        """
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        if hits.size > top_k:
+            hits = hits[np.argpartition(-scores[hits], top_k - 1)[:top_k]]
+        hits = hits[np.argsort(-scores[hits], kind='stable')]
+        return [{'id': str(self.ids[row]), 'score': float(scores[row]), 'metadata': self.metadata(row)}
+                for row in hits]
+
+    def metadata(self, row):
+        """
+        Returns a sentence's metadata, with the same keys as its vector's.
+        """
+        metadata = {'sentence': str(self.sentences[row]), 'position': int(self.positions[row])}
+        if self.starts is not None:
+            metadata['start'] = float(self.starts[row])
+        if self.ends is not None:
+            metadata['end'] = float(self.ends[row])
+        if self.speakers is not None:
+            metadata['speaker'] = int(self.speakers[row])
+        return metadata
+
+
+def build_index(index_name, namespace, sentences, ids, base_dir=None, starts=None, ends=None, speakers=None):
+    """
+    Builds and saves the lexical index of one interview in one index.
+
+    Args:
+    - index_name (str): Vector index the sentences are stored in (e.g. candidate-index).
+    - namespace (str): Interview namespace.
+    - sentences (list): Sentence texts, in transcript order.
+    - ids (list): Vector ID of each sentence.
+    - base_dir (str, optional): Root directory. Defaults to LEXICAL_INDEX_DIR.
+    - starts, ends, speakers (list, optional): Times and speaker of each sentence, returned
+      with its matches like the vector metadata.
+
+    Returns:
+    - str: Path of the saved index.
+    """
+    path = index_path(index_name, namespace, base_dir)
+    LexicalIndex.build(sentences, ids, starts=starts, ends=ends, speakers=speakers).save(path)
+    return path
+
+
+def delete_index(index_name, namespace, base_dir=None):
+    """
+    Removes the lexical index of an interview, if any.
+    """
+    path = index_path(index_name, namespace, base_dir)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def get_index(index_name, namespace, base_dir=None):
+    """
+    Returns the lexical index of an interview, loaded once per process and reloaded
+    when the file changes, or None if it was never built.
+    """
+    path = index_path(index_name, namespace, base_dir)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, LexicalIndex.load(path))
+            _indexes[path] = cached
+        return cached[1]
+
+
+def search(index_name, namespace, query, top_k=5, base_dir=None):
+    """
+    Lexical-only search: no embedding model is loaded.
+
+    Returns:
+    - list: Matches, best first; empty if the index was never built.
+    """
+    index = get_index(index_name, namespace, base_dir)
+    return index.search(query, top_k) if index is not None else []
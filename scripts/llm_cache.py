@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import threading
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+LLM_CACHE_DIR = os.getenv(
+    "LLM_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'llm_cache')
+)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Entries older than this are ignored and removed; 0 keeps them until evicted for space
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Eviction frees space down to this share of LLM_CACHE_MAX_BYTES, so a full cache is not walked on every write
+LLM_CACHE_EVICT_TO = 0.9
+# Simulated latency of the stub model, for load tests
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))
+
+
+class TextResponse:
+    """
+    Minimal stand-in for a GenerativeModel response: only `.text` is used by the pipeline.
+    """
+
+    def __init__(self, text, cached=False):
+        self.text = text
+        self.cached = cached
+
+
+def _canonical(value):
+    """
+    Returns a JSON-serialisable, order-independent form of prompts and generation parameters.
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'to_dict'):
+        return _canonical(value.to_dict())
+    if hasattr(value, '__dict__'):
+        return _canonical(vars(value))
+    return str(value)
+
+
+def response_key(model_name, prompt, generation_params=None):
+    """
+    Returns the cache key of a request: model name, prompt hash and generation parameters.
+    """
+    prompt_hash = hashlib.sha256(
+        json.dumps(_canonical(prompt), ensure_ascii=False, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    payload = json.dumps(
+        {'model': model_name, 'prompt': prompt_hash, 'params': _canonical(generation_params or {})},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk cache of LLM responses, one small JSON file per request.
+
+    Files are written under a temporary name and renamed, so concurrent
+    processes never read partial entries. A hit touches the file, and when the
+    cache grows past max_bytes the least recently used entries are deleted.
+    Entries older than ttl_seconds count as misses.
+
+    The cache size is counted once and then tracked as entries are written, so the
+    directory is only walked again when the tracked size goes over max_bytes.
+    Writes by other processes are picked up by that walk.
+    """
+
+    def __init__(self, cache_dir=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl_seconds=LLM_CACHE_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # Total size of the entries, counted on the first write
+        self._size = None
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """
+        Returns the cached response text, or None on a miss or an expired entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        now = time.time()
+        if self.ttl_seconds > 0 and now - entry.get('created', 0) > self.ttl_seconds:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+        return entry['text']
+
+    def put(self, key, text, model_name):
+        """
+        Stores a response, then evicts the least recently used entries if the cache is too large.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'model': model_name, 'created': time.time(), 'text': text}, file, ensure_ascii=False)
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += size - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        """
+        Returns every entry as (mtime, path, size), and their total size.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, os.path.join(root, name), stat.st_size))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self):
+        entries, total = self._scan()
+        if total <= self.max_bytes:
+            self._size = total
+            return
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes * LLM_CACHE_EVICT_TO:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+
+class CachedGenerativeModel:
+    """
+    Wraps a model exposing generate_content so identical requests are answered
+    from the on-disk cache instead of calling the model again.
+    """
+
+    def __init__(self, model, model_name, cache=None, generation_config=None):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache or LLMResponseCache()
+        self.generation_config = generation_config
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, prompt, kwargs):
+        params = dict(kwargs)
+        if self.generation_config is not None:
+            params.setdefault('generation_config', self.generation_config)
+        return response_key(self.model_name, prompt, params)
+
+    def generate_content(self, prompt, **kwargs):
+        key = self._key(prompt, kwargs)
+        text = self.cache.get(key)
+        if text is not None:
+            self.hits += 1
+            return TextResponse(text, cached=True)
+
+        self.misses += 1
+        response = self.model.generate_content(prompt, **kwargs)
+        self.cache.put(key, response.text, self.model_name)
+        return response
+
+    async def generate_content_async(self, prompt, **kwargs):
+        key = self._key(prompt, kwargs)
+        text = await asyncio.to_thread(self.cache.get, key)
+        if text is not None:
+            self.hits += 1
+            return TextResponse(text, cached=True)
+
+        self.misses += 1
+        if hasattr(self.model, 'generate_content_async'):
+            response = await self.model.generate_content_async(prompt, **kwargs)
+        else:
+            response = await asyncio.to_thread(self.model.generate_content, prompt, **kwargs)
+        await asyncio.to_thread(self.cache.put, key, response.text, self.model_name)
+        return response
+
+
+class StubGenerativeModel:
+    """
+    Deterministic offline model for tests and benchmarks.
+
+    The same prompt always yields the same text, derived from its hash, and no
+    network access is needed. `latency` seconds are waited per call to imitate
+    a remote model under load.
+    """
+
+    def __init__(self, model_name="stub", latency=LLM_STUB_LATENCY):
+        self.model_name = model_name
+        self.latency = latency
+        self.calls = 0
+
+    def _respond(self, prompt):
+        self.calls += 1
+        text = json.dumps(_canonical(prompt), ensure_ascii=False)
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]
+        return TextResponse(
+            f"[{self.model_name} {digest}] Summary of a {len(text)}-character prompt "
+            f"({len(text.split())} words)."
+        )
+
+    def generate_content(self, prompt, **kwargs):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._respond(prompt)
@@ -1,42 +1,274 @@
 import os
-import subprocess
 import sys
+import argparse
+import warnings
 
-def run_script(script_name):
-    try:
-        base_path = os.path.dirname(__file__)
-        # scripts_path = os.path.join(base_path, 'scripts')
-        script_path = os.path.join(base_path, f'{script_name}.py')
-
-        print(f"Running {script_name}.py...")
-        result = subprocess.run([sys.executable, script_path], check=True)
-        if result.returncode == 0:
-            print(f"{script_name}.py executed successfully.")
-        else:
-            print(f"Error: {script_name}.py execution failed.")
-            sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        print(f"An error occurred while executing {script_name}.py: {e}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"An unexpected error occurred while executing {script_name}.py: {e}")
+import model_registry
+from video_processing import extract_audio
+from audio_processing import separate_speakers, load_diarization
+from transcription import transcribe_with_speakers
+from text_preprocessing import process_store
+from embeddings import embed_store_sentences
+from embeddings_and_pinecone_store import store_interview_embeddings, EMBEDDING_DIMENSION
+import transcript_store
+from interview_metrics import save_interview_metrics
+import summary_engine
+import retrieval
+import pipeline_dag
+import metrics
+
+# Whisper falls back to FP32 on CPU; the warning is expected
+warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
+
+
+def get_paths(project_base_path, video_path=None, interview_id=None):
+    """
+    Builds the input and output paths used by every pipeline stage.
+
+    Args:
+    - project_base_path (str): Root directory of the interview workspace.
+    - video_path (str, optional): Interview video. Defaults to data/raw/interview_video.mp4.
+    - interview_id (str, optional): Identifier of the interview. Defaults to the video file name.
+
+    Returns:
+    - dict: Mapping of path names to absolute paths.
+    """
+    data_dir = os.path.join(project_base_path, 'data')
+    audio_dir = os.path.join(data_dir, 'audio')
+    transcripts_dir = os.path.join(data_dir, 'transcripts')
+    processed_dir = os.path.join(data_dir, 'processed')
+    if video_path is None:
+        video_path = os.path.join(data_dir, 'raw', 'interview_video.mp4')
+    if interview_id is None:
+        interview_id = os.path.splitext(os.path.basename(video_path))[0]
+    return {
+        'interview_id': interview_id,
+        'project_base_path': project_base_path,
+        'video': video_path,
+        'audio_dir': audio_dir,
+        'transcripts_dir': transcripts_dir,
+        'processed_dir': processed_dir,
+        'main_audio': os.path.join(audio_dir, 'main.wav'),
+        'audio_buffer': os.path.join(audio_dir, 'main.f32'),
+        'speaker1_audio': os.path.join(audio_dir, 'speaker1.wav'),
+        'speaker2_audio': os.path.join(audio_dir, 'speaker2.wav'),
+        'diarization': os.path.join(audio_dir, 'diarization.npy'),
+        'transcript_store': os.path.join(data_dir, 'transcript_store'),
+        'outputs_dir': os.path.join(project_base_path, 'outputs'),
+        'pipeline_state': os.path.join(data_dir, '.pipeline_state.json'),
+        'run_report': os.path.join(project_base_path, 'outputs', 'run_report.json'),
+        'interview_metrics': os.path.join(project_base_path, 'outputs', summary_engine.INTERVIEW_METRICS_FILENAME),
+    }
+
+
+def preprocess_all(paths):
+    """
+    Splits every speaker turn into sentences in one batched pass of the shared sentence segmenter.
+    """
+    process_store(paths['transcript_store'], paths['processed_dir'])
+
+
+def generate_all_summaries(paths, index_fallback=None):
+    """
+    Runs every summary analysis concurrently with one Gemini model and one embedding model.
+    Lexical-only retrieval encodes no queries, so the embedding model is not loaded then.
+    index_fallback redirects retrieval from indexes that are not filled (see retrieval.retrieve).
+    """
+    gemini_model = model_registry.get_gemini_model()
+    if retrieval.RETRIEVAL_MODE != 'lexical':
+        embedding_model = model_registry.get_sentence_transformer()
+        embedding_dimension = embedding_model.get_sentence_embedding_dimension()
+    else:
+        embedding_model, embedding_dimension = None, EMBEDDING_DIMENSION
+    results = summary_engine.generate_all_summaries(
+        gemini_model=gemini_model,
+        project_base_path=paths['project_base_path'],
+        PINECONE_API_KEY=os.getenv("PINECONE_API_KEY"),
+        embedding_model=embedding_model,
+        embedding_dimension=embedding_dimension,
+        interview_id=paths['interview_id'],
+        index_fallback=index_fallback
+    )
+    failed = [result['name'] for result in results if result['status'] != 'ok']
+    if failed:
+        # Raised so the stage is not recorded as up to date and runs again next time
+        raise RuntimeError(f"summary generation failed for: {', '.join(failed)}")
+
+
+def transcript_paths(paths, suffix='.txt', directory='transcripts_dir'):
+    """
+    Returns the main, speaker1 and speaker2 files of one kind.
+    """
+    return [os.path.join(paths[directory], f'{name}{suffix}') for name in ('main', 'speaker1', 'speaker2')]
+
+
+def store_paths(paths, *filenames):
+    """
+    Returns files of the interview's transcript store.
+    """
+    return [os.path.join(paths['transcript_store'], filename) for filename in filenames]
+
+
+def run_video_processing(paths, context):
+    # The audio is decoded once; every later audio stage reads the same buffer
+    context['audio'] = extract_audio(paths['video'], paths['main_audio'],
+                                     paths['audio_buffer'] if os.getenv("AUDIO_MMAP") == "1" else None)
+
+
+def run_audio_processing(paths, context):
+    diarization = separate_speakers(paths['main_audio'], [paths['speaker1_audio'], paths['speaker2_audio']],
+                                    paths['diarization'], audio=context.get('audio'))
+    if diarization is None:
+        raise RuntimeError("Speaker diarization failed.")
+    context['diarization'] = diarization
+
+
+def run_transcription(paths, context):
+    # One Whisper pass over main.wav; per-speaker transcripts come from the diarization
+    diarization = context['diarization'] if 'diarization' in context else load_diarization(paths['diarization'])
+    turns = transcribe_with_speakers(paths['main_audio'], diarization, paths['transcripts_dir'],
+                                     audio=context.get('audio'), store_dir=paths['transcript_store'])
+    if turns is None:
+        raise RuntimeError("Transcription failed.")
+
+
+SUMMARY_FILES = ('communication_style_summary.txt', 'active_listening_summary.txt',
+                 'engagement_summary.txt', 'summary.txt')
+
+# Pipeline stages in dependency order. Each stage re-runs only when the content of
+# its inputs, its code, its configuration or its models changed.
+STAGES = [
+    {
+        'name': 'video_processing',
+        'deps': [],
+        'inputs': lambda paths: [paths['video']],
+        'outputs': lambda paths: [paths['main_audio']],
+        'modules': ['video_processing', 'audio_io'],
+        'run': run_video_processing,
+    },
+    {
+        'name': 'audio_processing',
+        'deps': ['video_processing'],
+        'inputs': lambda paths: [paths['main_audio']],
+        'outputs': lambda paths: [paths['speaker1_audio'], paths['speaker2_audio'], paths['diarization']],
+        'modules': ['audio_processing', 'diarization_backends'],
+        'config': ['DIARIZATION_BACKEND', 'DIARIZATION_SPEAKERS', 'DIARIZATION_MAX_SPEAKERS',
+                   'DIARIZATION_WINDOW_SECONDS', 'VAD_THRESHOLD_DB'],
+        'run': run_audio_processing,
+    },
+    {
+        'name': 'transcription',
+        'deps': ['audio_processing'],
+        'inputs': lambda paths: [paths['main_audio'], paths['diarization']],
+        'outputs': lambda paths: (transcript_paths(paths) + [os.path.join(paths['transcripts_dir'], 'segments.json')]
+                                  + store_paths(paths, transcript_store.TEXT_FILE, transcript_store.WORDS_FILE,
+                                                transcript_store.TURNS_FILE, transcript_store.META_FILE)),
+        'modules': ['transcription', 'chunked_transcription', 'transcription_backends', 'transcript_store'],
+        'config': ['LONG_AUDIO_SECONDS', 'TRANSCRIPTION_CHUNK_SECONDS', 'TRANSCRIPTION_CHUNK_OVERLAP',
+                   'TRANSCRIPTION_BACKEND', 'TRANSCRIPTION_PRESET', 'FASTER_WHISPER_COMPUTE_TYPE'],
+        'models': [model_registry.WHISPER_MODEL_NAME],
+        'run': run_transcription,
+    },
+    {
+        'name': 'interview_metrics',
+        'deps': ['transcription'],
+        'inputs': lambda paths: store_paths(paths, transcript_store.TEXT_FILE, transcript_store.WORDS_FILE,
+                                            transcript_store.TURNS_FILE, transcript_store.META_FILE)
+                                + [paths['diarization']],
+        'outputs': lambda paths: [paths['interview_metrics']],
+        'modules': ['interview_metrics', 'transcript_store'],
+        'config': ['PAUSE_SECONDS', 'INTERRUPTION_GAP_SECONDS'],
+        'run': lambda paths, context: save_interview_metrics(paths['transcript_store'], paths['interview_metrics'],
+                                                             paths['diarization']),
+    },
+    {
+        'name': 'text_preprocessing',
+        'deps': ['transcription'],
+        'inputs': lambda paths: store_paths(paths, transcript_store.TEXT_FILE, transcript_store.WORDS_FILE,
+                                            transcript_store.TURNS_FILE, transcript_store.META_FILE),
+        'outputs': lambda paths: (transcript_paths(paths, '_sentences.txt', 'processed_dir')
+                                  + store_paths(paths, transcript_store.SENTENCES_FILE)),
+        'modules': ['text_preprocessing', 'transcript_store'],
+        'config': ['SENTENCE_SEGMENTER', 'SEGMENTATION_CHUNK_CHARS'],
+        'models': [model_registry.SPACY_MODEL_NAME],
+        'run': lambda paths, context: preprocess_all(paths),
+    },
+    {
+        'name': 'embeddings',
+        'deps': ['text_preprocessing'],
+        'inputs': lambda paths: store_paths(paths, transcript_store.TEXT_FILE, transcript_store.SENTENCES_FILE),
+        'outputs': lambda paths: store_paths(paths, transcript_store.EMBEDDINGS_FILE),
+        'modules': ['embeddings', 'embedding_cache', 'transcript_store'],
+        'models': [model_registry.SENTENCE_TRANSFORMER_MODEL_NAME],
+        'run': lambda paths, context: embed_store_sentences(paths['transcript_store']),
+    },
+    {
+        # Writes to the vector store, so it has no output files of its own
+        'name': 'embeddings_and_pinecone_store',
+        'deps': ['embeddings'],
+        'inputs': lambda paths: store_paths(paths, transcript_store.TEXT_FILE, transcript_store.TURNS_FILE,
+                                            transcript_store.SENTENCES_FILE, transcript_store.EMBEDDINGS_FILE),
+        'outputs': lambda paths: [],
+        'modules': ['embeddings_and_pinecone_store', 'vector_store', 'lexical_index', 'transcript_store'],
+        'config': ['VECTOR_STORE_BACKEND', 'VECTOR_STORE_DIR', 'LEXICAL_INDEX_DIR'],
+        'params': lambda paths: {'interview_id': paths['interview_id']},
+        'run': lambda paths, context: store_interview_embeddings(paths['transcript_store'], paths['interview_id']),
+    },
+    {
+        'name': 'summaries',
+        'deps': ['embeddings_and_pinecone_store', 'interview_metrics'],
+        'inputs': lambda paths: [paths['interview_metrics']],
+        'outputs': lambda paths: [os.path.join(paths['outputs_dir'], name) for name in SUMMARY_FILES],
+        'modules': ['summary_engine', 'retrieval', 'lexical_index', 'context_builder', 'interview_metrics',
+                    'communication_style_summary', 'active_listening_summary', 'engagement_summary',
+                    'rag_summary_generating', 'summary_output'],
+        'config': ['LLM_BACKEND', 'RETRIEVAL_MODE', 'RRF_K', 'CONTEXT_TOKEN_BUDGET', 'CONTEXT_MMR_LAMBDA',
+                   'CONTEXT_DUPLICATE_THRESHOLD'],
+        'models': [model_registry.GEMINI_MODEL_NAME, model_registry.SENTENCE_TRANSFORMER_MODEL_NAME],
+        'run': lambda paths, context: generate_all_summaries(paths),
+    },
+]
+
+
+def run_pipeline(paths, target=None, force=False):
+    """
+    Runs the interview analysis pipeline in a single process so that each model
+    is loaded once and shared through the model registry.
+
+    Stages whose inputs, code, configuration and models are unchanged since their
+    last run are skipped, so e.g. editing a summary prompt only re-runs the summaries.
+
+    Args:
+    - paths (dict): Paths from get_paths.
+    - target (str, optional): Only bring this stage and the stages it depends on up to date.
+    - force (bool): Re-run the target stage (or every stage) even if it is up to date.
+
+    Timing, memory and external-call metrics of the run are written to outputs/run_report.json,
+    also when a stage fails.
+
+    Returns:
+    - list: Names of the stages that were executed.
+    """
+    if not os.path.exists(paths['video']):
+        print(f"Error: Video file '{paths['video']}' does not exist.")
         sys.exit(1)
+    metrics.reset()
+    try:
+        return pipeline_dag.run_dag(STAGES, paths, paths['pipeline_state'], target=target, force=force)
+    finally:
+        metrics.save_report(paths['run_report'], interview_id=paths['interview_id'])
+
 
 def main():
-    script_files = [
-        'video_processing',
-        'audio_processing',
-        'transcription',
-        'text_preprocessing',
-        'embeddings_and_pinecone_store',
-        'communication_style_summary',
-        'active_listening_summary',
-        'engagement_summary',
-        'rag_summary_generating'
-    ]
-    
-    for script in script_files:
-        run_script(script)
+    parser = argparse.ArgumentParser(description="Run the interview analysis pipeline.")
+    parser.add_argument('--stage', choices=[stage['name'] for stage in STAGES],
+                        help="Only run this stage (and any out-of-date stages it depends on).")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-run the selected stage, or every stage, even if it is up to date.")
+    args = parser.parse_args()
+
+    project_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    run_pipeline(get_paths(project_base_path), target=args.stage, force=args.force)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Everything recorded since the last reset, for the current process
+_lock = threading.Lock()
+_state = {}
+
+
+def reset():
+    """
+    Starts a new run: drops every recorded stage, counter, call and model load.
+    """
+    with _lock:
+        _state.clear()
+        _state.update({
+            'started_at': time.time(),
+            'start_perf': time.perf_counter(),
+            'start_cpu': time.process_time(),
+            'stages': [],
+            'counters': {},
+            'calls': {},
+            'model_loads': [],
+        })
+
+
+reset()
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process so far, in MB, or None if unknown.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+@contextmanager
+def stage(name):
+    """
+    Times a pipeline stage: wall time, CPU time and the peak RSS reached by its end.
+    """
+    start_perf = time.perf_counter()
+    start_cpu = time.process_time()
+    status = 'ok'
+    try:
+        yield
+    except BaseException:
+        status = 'failed'
+        raise
+    finally:
+        entry = {
+            'name': name,
+            'status': status,
+            'wall_seconds': round(time.perf_counter() - start_perf, 3),
+            'cpu_seconds': round(time.process_time() - start_cpu, 3),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        with _lock:
+            _state['stages'].append(entry)
+
+
+def record_skipped_stage(name):
+    """
+    Records a stage that was up to date and did not run.
+    """
+    with _lock:
+        _state['stages'].append({'name': name, 'status': 'skipped'})
+
+
+def increment(name, value=1):
+    """
+    Adds `value` to a counter such as audio seconds processed or vectors upserted.
+    """
+    with _lock:
+        _state['counters'][name] = _state['counters'].get(name, 0) + value
+
+
+def record_call(kind, seconds, **sizes):
+    """
+    Records the latency of one external call (LLM request, vector store round trip,
+    embedding batch) together with its sizes, e.g. prompt and response characters.
+    """
+    with _lock:
+        calls = _state['calls'].setdefault(kind, {'latencies_ms': [], 'sizes': {}})
+        calls['latencies_ms'].append(round(seconds * 1000, 2))
+        for size_name, size in sizes.items():
+            calls['sizes'][size_name] = calls['sizes'].get(size_name, 0) + size
+
+
+@contextmanager
+def timed_call(kind, **sizes):
+    """
+    Records the latency of the wrapped call under `kind`. Sizes known only after the
+    call can be added to the yielded dict.
+    """
+    start = time.perf_counter()
+    sizes = dict(sizes)
+    try:
+        yield sizes
+    finally:
+        record_call(kind, time.perf_counter() - start, **sizes)
+
+
+def record_model_load(kind, name, seconds):
+    """
+    Records how long loading a model took.
+    """
+    with _lock:
+        _state['model_loads'].append({'kind': kind, 'name': name, 'seconds': round(seconds, 3)})
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a list of numbers, or None if it is empty.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize_calls(calls):
+    """
+    Adds count, total and latency percentiles to every call kind.
+    """
+    summary = {}
+    for kind, entry in calls.items():
+        latencies = entry['latencies_ms']
+        summary[kind] = {
+            'count': len(latencies),
+            'total_ms': round(sum(latencies), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'p50_ms': percentile(latencies, 0.5),
+            'p95_ms': percentile(latencies, 0.95),
+            'max_ms': max(latencies) if latencies else None,
+            'sizes': dict(entry['sizes']),
+            'latencies_ms': list(latencies),
+        }
+    return summary
+
+
+def build_report(**extra):
+    """
+    Returns everything recorded since the last reset as a JSON-serialisable dict.
+
+    Args:
+    - extra: Additional top-level fields, such as the interview ID.
+    """
+    with _lock:
+        report = {
+            **extra,
+            'started_at': _state['started_at'],
+            'wall_seconds': round(time.perf_counter() - _state['start_perf'], 3),
+            'cpu_seconds': round(time.process_time() - _state['start_cpu'], 3),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': [dict(entry) for entry in _state['stages']],
+            'counters': dict(_state['counters']),
+            'calls': summarize_calls(_state['calls']),
+            'model_loads': [dict(entry) for entry in _state['model_loads']],
+        }
+    return report
+
+
+def save_report(output_path, **extra):
+    """
+    Writes the run report as JSON and returns it.
+    """
+    report = build_report(**extra)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Run report saved at: {output_path}")
+    return report
+
+
+def aggregate_reports(reports):
+    """
+    Combines the run reports of several interviews into one view for capacity planning.
+
+    Args:
+    - reports (list): Report dicts as written by save_report.
+
+    Returns:
+    - dict: Totals and per-interview means of stage times, counters, call latencies and model loads.
+    """
+    count = len(reports)
+    stages = {}
+    counters = {}
+    calls = {}
+    for report in reports:
+        for entry in report.get('stages', []):
+            totals = stages.setdefault(entry['name'], {'runs': 0, 'skipped': 0, 'failed': 0,
+                                                       'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                       'max_peak_rss_mb': None})
+            if entry['status'] == 'skipped':
+                totals['skipped'] += 1
+                continue
+            totals['runs'] += 1
+            totals['failed'] += entry['status'] == 'failed'
+            totals['wall_seconds'] += entry['wall_seconds']
+            totals['cpu_seconds'] += entry['cpu_seconds']
+            if entry.get('peak_rss_mb') is not None:
+                totals['max_peak_rss_mb'] = max(totals['max_peak_rss_mb'] or 0, entry['peak_rss_mb'])
+        for name, value in report.get('counters', {}).items():
+            counters[name] = counters.get(name, 0) + value
+        for kind, entry in report.get('calls', {}).items():
+            merged = calls.setdefault(kind, {'latencies_ms': [], 'sizes': {}})
+            merged['latencies_ms'].extend(entry.get('latencies_ms', []))
+            for size_name, size in entry.get('sizes', {}).items():
+                merged['sizes'][size_name] = merged['sizes'].get(size_name, 0) + size
+
+    for totals in stages.values():
+        totals['mean_wall_seconds'] = round(totals['wall_seconds'] / totals['runs'], 3) if totals['runs'] else None
+        totals['wall_seconds'] = round(totals['wall_seconds'], 3)
+        totals['cpu_seconds'] = round(totals['cpu_seconds'], 3)
+
+    call_summary = summarize_calls(calls)
+    for entry in call_summary.values():
+        del entry['latencies_ms']
+
+    return {
+        'interviews': count,
+        'total_wall_seconds': round(sum(report.get('wall_seconds', 0) for report in reports), 3),
+        'total_cpu_seconds': round(sum(report.get('cpu_seconds', 0) for report in reports), 3),
+        'max_peak_rss_mb': max((report['peak_rss_mb'] for report in reports
+                                if report.get('peak_rss_mb') is not None), default=None),
+        'stages': stages,
+        'counters': counters,
+        'counters_per_interview': {name: round(value / count, 3) for name, value in counters.items()} if count else {},
+        'calls': call_summary,
+        'model_load_seconds': round(sum(entry['seconds'] for report in reports
+                                        for entry in report.get('model_loads', [])), 3),
+    }
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import metrics
+
+# Default model names used across the pipeline stages
+WHISPER_MODEL_NAME = "base"
+SPACY_MODEL_NAME = "en_core_web_sm"
+SENTENCE_TRANSFORMER_MODEL_NAME = "all-MiniLM-L6-v2"
+GEMINI_MODEL_NAME = "gemini-pro"
+
+# Loaded models, keyed by (kind, name)
+_models = {}
+_lock = threading.Lock()
+
+
+def _get_or_load(key, loader):
+    """
+    Returns the model stored under `key`, loading it with `loader` on first use.
+
+    Args:
+    - key (tuple): (kind, name) identifying the model.
+    - loader (callable): Zero-argument function that loads the model.
+
+    Returns:
+    - object: The loaded model.
+    """
+    with _lock:
+        if key not in _models:
+            kind, name = key
+            print(f"Loading {kind} model '{name}'...")
+            start = time.perf_counter()
+            _models[key] = loader()
+            elapsed = time.perf_counter() - start
+            metrics.record_model_load(kind, name, elapsed)
+            print(f"{kind} model '{name}' loaded in {elapsed:.2f}s.")
+        return _models[key]
+
+
+def get_whisper_model(name=WHISPER_MODEL_NAME):
+    """
+    Returns the shared Whisper model.
+    """
+    def load():
+        import whisper
+        return whisper.load_model(name)
+    return _get_or_load(("whisper", name), load)
+
+
+def get_faster_whisper_model(name=WHISPER_MODEL_NAME, compute_type="int8"):
+    """
+    Returns the shared faster-whisper (CTranslate2) model, quantized to `compute_type`.
+    """
+    def load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(name, device="cpu", compute_type=compute_type)
+    return _get_or_load(("faster-whisper", f"{name}-{compute_type}"), load)
+
+
+def get_spacy_model(name=SPACY_MODEL_NAME):
+    """
+    Returns the shared spaCy pipeline.
+    """
+    def load():
+        import spacy
+        return spacy.load(name)
+    return _get_or_load(("spacy", name), load)
+
+
+# Components of the trained pipelines that sentence segmentation never uses
+_SEGMENTATION_UNUSED = ["tagger", "attribute_ruler", "lemmatizer", "ner"]
+
+
+def get_sentence_segmenter(mode="senter", name=SPACY_MODEL_NAME):
+    """
+    Returns a spaCy pipeline that only segments sentences.
+
+    Args:
+    - mode (str): "senter" (the trained pipeline's small sentence recognizer),
+      "parser" (dependency-parse boundaries, the slowest) or "rule" (punctuation rules, no model).
+    - name (str): Trained pipeline used by the "senter" and "parser" modes.
+
+    Returns:
+    - spacy.Language: Pipeline whose docs have `sents` set.
+    """
+    def load():
+        import spacy
+        if mode == "rule":
+            nlp = spacy.blank("en")
+            nlp.add_pipe("sentencizer")
+            return nlp
+        if mode == "senter":
+            # The senter has its own embedding layer, so the shared tok2vec and the parser go too
+            nlp = spacy.load(name, exclude=_SEGMENTATION_UNUSED + ["tok2vec", "parser"])
+            nlp.enable_pipe("senter")
+            return nlp
+        if mode == "parser":
+            return spacy.load(name, exclude=_SEGMENTATION_UNUSED + ["senter"])
+        raise ValueError(f"Unknown sentence segmenter '{mode}'. Segmenters: senter, parser, rule")
+    return _get_or_load((f"spacy-{mode}", name), load)
+
+
+def get_sentence_transformer(name=SENTENCE_TRANSFORMER_MODEL_NAME):
+    """
+    Returns the shared SentenceTransformer embedding model.
+    """
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(name)
+    return _get_or_load(("sentence-transformer", name), load)
+
+
+def get_gemini_model(name=GEMINI_MODEL_NAME):
+    """
+    Returns the shared Gemini model, configuring the API key on first use.
+
+    With LLM_BACKEND=stub a deterministic offline model is returned instead.
+    Unless LLM_CACHE=0, the model is wrapped so repeated prompts are answered
+    from the on-disk response cache.
+    """
+    import llm_cache
+
+    def load():
+        if llm_cache.LLM_BACKEND == "stub":
+            model = llm_cache.StubGenerativeModel(f"stub-{name}")
+        else:
+            import google.generativeai as genai
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            model = genai.GenerativeModel(name)
+        if llm_cache.LLM_CACHE_ENABLED:
+            model = llm_cache.CachedGenerativeModel(model, getattr(model, 'model_name', name))
+        return model
+    return _get_or_load((f"llm-{llm_cache.LLM_BACKEND}", name), load)
+
+
+def get_loaded_model(kind, name):
+    """
+    Returns the model stored under (kind, name) if it is already loaded, else None; never loads it.
+    """
+    with _lock:
+        return _models.get((kind, name))
+
+
+def loaded_models():
+    """
+    Returns the keys of all models loaded so far.
+    """
+    with _lock:
+        return list(_models)
+
+
+def clear():
+    """
+    Drops every loaded model so the memory can be reclaimed.
+    """
+    with _lock:
+        _models.clear()
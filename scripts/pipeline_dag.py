@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import hashlib
+import importlib.util
+
+import metrics
+
+# Bumped when the fingerprint format changes, invalidating every recorded stage
+STATE_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_source_hashes = {}
+
+
+def file_hash(path, known_hashes=None):
+    """
+    Returns the SHA-256 of a file's content.
+
+    Args:
+    - path (str): File to hash.
+    - known_hashes (dict, optional): Previous results keyed by path, each holding
+      'size', 'mtime_ns' and 'sha256'. Files whose size and mtime did not change are not re-read.
+
+    Returns:
+    - str: Hex digest, or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    known = (known_hashes or {}).get(path)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['sha256']
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    if known_hashes is not None:
+        known_hashes[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
+
+
+def source_hash(module_name):
+    """
+    Returns the SHA-256 of a module's source file, so editing a stage's code invalidates it.
+    """
+    if module_name not in _source_hashes:
+        spec = importlib.util.find_spec(module_name)
+        origin = spec.origin if spec else None
+        if origin and os.path.isfile(origin):
+            with open(origin, 'rb') as file:
+                _source_hashes[module_name] = hashlib.sha256(file.read()).hexdigest()
+        else:
+            _source_hashes[module_name] = None
+    return _source_hashes[module_name]
+
+
+def load_state(state_path):
+    """
+    Reads the recorded stage fingerprints, or returns an empty state.
+    """
+    try:
+        with open(state_path, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+    if state.get('version') != STATE_VERSION:
+        return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+    return state
+
+
+def save_state(state_path, state):
+    """
+    Writes the stage fingerprints atomically.
+    """
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def stage_fingerprint(stage, paths, fingerprints, known_hashes):
+    """
+    Fingerprints a stage from everything that determines its outputs: the content
+    of its input files, the fingerprints of the stages it depends on, the source of
+    its modules, its configuration and the versions of the models it uses.
+    """
+    payload = {
+        'inputs': {path: file_hash(path, known_hashes) for path in stage['inputs'](paths)},
+        'deps': {dep: fingerprints[dep] for dep in stage['deps']},
+        'code': {module: source_hash(module) for module in stage['modules']},
+        'config': {name: os.getenv(name) for name in stage.get('config', ())},
+        'params': stage['params'](paths) if 'params' in stage else {},
+        'models': list(stage.get('models', ())),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def stages_needed(stages, target=None):
+    """
+    Returns the names of the stages to consider, in order: all of them, or the
+    target and everything it depends on.
+    """
+    if target is None:
+        return [stage['name'] for stage in stages]
+    by_name = {stage['name']: stage for stage in stages}
+    if target not in by_name:
+        raise ValueError(f"Unknown stage '{target}'. Stages: {', '.join(by_name)}")
+
+    needed = set()
+    pending = [target]
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(by_name[name]['deps'])
+    return [stage['name'] for stage in stages if stage['name'] in needed]
+
+
+def run_dag(stages, paths, state_path, target=None, force=False):
+    """
+    Runs the stages whose fingerprints changed since their last successful run.
+
+    A stage is up to date when its recorded fingerprint matches the current one
+    and all of its declared outputs exist. Stages must be listed in dependency
+    order. A stage that fails stops the run; the stages completed before it stay
+    recorded.
+
+    Args:
+    - stages (list): Stage dicts with 'name', 'deps', 'inputs' and 'outputs' (callables
+      taking the paths dict), 'modules', optional 'config', 'models' and 'params', and 'run'
+      (callable taking the paths dict and a context dict shared between stages).
+    - paths (dict): Paths of the interview workspace.
+    - state_path (str): JSON file holding the fingerprints of completed stages.
+    - target (str, optional): Only bring this stage and its dependencies up to date.
+    - force (bool): Re-run the target (or every stage) even if it is up to date.
+
+    Returns:
+    - list: Names of the stages that were executed.
+    """
+    state = load_state(state_path)
+    # Kept so status commands can fingerprint the stages without being told the paths
+    state['paths'] = {key: value for key, value in paths.items() if isinstance(value, str)}
+    needed = stages_needed(stages, target)
+    fingerprints = {}
+    context = {}
+    executed = []
+
+    for stage in stages:
+        name = stage['name']
+        if name not in needed:
+            continue
+        fingerprint = stage_fingerprint(stage, paths, fingerprints, state['files'])
+        outputs_exist = all(os.path.exists(path) for path in stage['outputs'](paths))
+        forced = force and (target is None or name == target)
+        if not forced and outputs_exist and state['stages'].get(name) == fingerprint:
+            print(f"{name} is up to date; skipping.")
+            metrics.record_skipped_stage(name)
+            fingerprints[name] = fingerprint
+            continue
+
+        print(f"Running {name}...")
+        try:
+            with metrics.stage(name):
+                stage['run'](paths, context)
+        except Exception as e:
+            print(f"An unexpected error occurred while executing {name}: {e}")
+            save_state(state_path, state)
+            sys.exit(1)
+        print(f"{name} executed successfully.")
+
+        # Outputs were rewritten, so their cached content hashes are stale
+        for path in stage['outputs'](paths):
+            state['files'].pop(path, None)
+        fingerprints[name] = fingerprint
+        state['stages'][name] = fingerprint
+        save_state(state_path, state)
+        executed.append(name)
+
+    return executed
+
+
+def stage_status(stages, paths, state_path):
+    """
+    Reports, without running anything, whether each stage is up to date.
+
+    Returns:
+    - list: (stage name, status) pairs, where status is 'up to date', 'out of date',
+      'outputs missing' or 'never run'.
+    """
+    state = load_state(state_path)
+    fingerprints = {}
+    statuses = []
+    for stage in stages:
+        name = stage['name']
+        fingerprints[name] = stage_fingerprint(stage, paths, fingerprints, dict(state['files']))
+        recorded = state['stages'].get(name)
+        if recorded is None:
+            status = 'never run'
+        elif recorded != fingerprints[name]:
+            status = 'out of date'
+        elif not all(os.path.exists(path) for path in stage['outputs'](paths)):
+            status = 'outputs missing'
+        else:
+            status = 'up to date'
+        statuses.append((name, status))
+    return statuses
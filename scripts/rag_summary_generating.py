@@ -1,13 +1,15 @@
 import os
 import logging
 import warnings
-from datetime import datetime
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-import pinecone
-from pinecone import Pinecone, ServerlessSpec
-import google.generativeai as genai
-from google.generativeai import GenerativeModel
+
+import model_registry
+import retrieval
+import context_builder
+import interview_metrics
+import vector_store
+import summary_engine
+from summary_output import create_output_and_save_summary
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -15,84 +17,23 @@ logging.getLogger('pinecone').setLevel(logging.CRITICAL)
 
 load_dotenv()
 
-def create_output_directory(base_path):
-    """
-    Create outputs directory if it doesn't exist.
-    """
-    output_dir = os.path.join(base_path, 'outputs')
-    os.makedirs(output_dir, exist_ok=True)
-    return output_dir
-
-def generate_summary_filename():
-    """
-    Generate a unique filename for the summary based on timestamp.
-    """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"candidate_summary_{timestamp}.txt"
+# Retrieval query used for this analysis
+INTERVIEW_SUMMARY_QUERY = "Can you provide a detailed summary of the candidate's performance during the interview?"
 
-def init_pinecone(PINECONE_API_KEY, index_dimension):
-    """
-    Initializes Pinecone and returns the candidate index.
-    """
-    # Create a Pinecone instance
-    pc = Pinecone(api_key=PINECONE_API_KEY)
-
-    index_name = "candidate-index"
-
-    # Check if the index exists
-    if index_name not in pc.list_indexes().names():
-        pc.create_index(
-            name=index_name,
-            dimension=index_dimension,
-            metric='cosine',
-            spec=ServerlessSpec(
-                cloud='aws',
-                region='us-west-2'
-            )
-        )
-    else:
-        # Validate existing index dimension
-        index_info = pc.describe_index(index_name)
-        if index_info.dimension != index_dimension:
-            raise ValueError(f"Existing index dimension {index_info.dimension} does not match required dimension {index_dimension}")
-
-    # Return the initialized index
-    return pc.Index(index_name)
-
-def retrieve_relevant_segments(query, index, embedding_model, top_k=5):
-    """
-    Retrieves the top-k relevant segments from Pinecone based on the query.
-    """
-    try:
-        query_embedding = embedding_model.encode(query).tolist()
-
-        result = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-        return result['matches']
-    except Exception as e:
-        print(f"Retrieval error: {e}")
-        return []
+# Measured timing metrics added to the prompt
+TIMING_METRICS = ['talk_ratio', 'words_per_minute']
 
-def prepare_context(retrieved_segments):
-    """
-    Prepares the context for the summary generation.
-    """
-    context = ""
-    for match in retrieved_segments:
-        context += match['metadata'].get('text', '') + "\n"
-    return context
+# Number of matches retrieved from each index
+RETRIEVAL_TOP_K = {vector_store.CANDIDATE_INDEX_NAME: 5}
 
-def construct_prompt(context, query):
+def construct_prompt(context, query, timing=""):
     """
     Constructs a prompt for the Gemini model.
     """
     prompt = f"""You are an AI assistant specialized in analyzing candidate performance.
     Analyze the following candidate-related interview context and provide a detailed, structured summary.
 
-    Candidate Context:
+    {timing}Candidate Context:
     {context}
     
     Specific Query: {query}
@@ -106,21 +47,34 @@ def construct_prompt(context, query):
     """
     return prompt
 
-def generate_interview_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension):
+def prompt_from_matches(matches, query, metrics=None):
     """
-    Generate interview summary and save to outputs/summary.txt.
+    Builds the interview summary prompt from the matches retrieved from each index
+    and, when available, the measured interview metrics.
     """
-    # Initialize Pinecone index for candidate data
-    candidate_index = init_pinecone(PINECONE_API_KEY, embedding_dimension)
+    # Prepare context: duplicate sentences removed, the rest packed in time order up to the token budget
+    context = context_builder.build_contexts([('context', matches[vector_store.CANDIDATE_INDEX_NAME])])['context']
 
-    # Retrieve relevant segments from the candidate index
-    relevant_candidate = retrieve_relevant_segments(query, candidate_index, embedding_model)
+    # Construct prompt
+    return construct_prompt(context, query, interview_metrics.prompt_section(metrics, TIMING_METRICS))
 
-    # Prepare context
-    context = prepare_context(relevant_candidate)
+def build_interview_summary_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID, metrics=None):
+    """
+    Retrieves the candidate context and builds the interview summary prompt, with the
+    measured interview metrics when given.
+    """
+    matches = retrieval.retrieve(
+        {'interview_summary': {'query': query, 'top_k': RETRIEVAL_TOP_K}},
+        embedding_dimension, interview_id, PINECONE_API_KEY, embedding_model
+    )['interview_summary']
+    return prompt_from_matches(matches, query, metrics)
 
-    # Construct prompt
-    prompt = construct_prompt(context, query)
+def generate_interview_summary(query, PINECONE_API_KEY, project_base_path, gemini_model, embedding_model, embedding_dimension, interview_id=vector_store.DEFAULT_INTERVIEW_ID):
+    """
+    Generate interview summary and save to outputs/summary.txt.
+    """
+    prompt = build_interview_summary_prompt(query, PINECONE_API_KEY, embedding_model, embedding_dimension, interview_id,
+                                            summary_engine.load_measured_metrics(project_base_path))
 
     try:
         # Generate summary
@@ -128,11 +82,7 @@ def generate_interview_summary(query, PINECONE_API_KEY, project_base_path, gemin
         summary = response.text
 
         # Save summary to outputs/summary.txt
-        output_dir = os.path.join(project_base_path, 'outputs')
-        os.makedirs(output_dir, exist_ok=True)
-        summary_file_path = os.path.join(output_dir, 'summary.pdf')
-        with open(summary_file_path, 'w', encoding='utf-8') as f:
-            f.write(summary)
+        summary_file_path = create_output_and_save_summary(project_base_path, summary, 'summary.txt')
 
         print(f"Summary saved to: {summary_file_path}")
         return summary
@@ -148,15 +98,9 @@ def main():
     project_base_path = os.path.dirname(os.path.abspath(__file__))
     project_base_path = os.path.dirname(project_base_path)  # Go up one level to project root
 
-    # Configure Gemini API
-    GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-    genai.configure(api_key=GOOGLE_API_KEY)
-
-    # Initialize Gemini models
-    gemini_model = GenerativeModel("gemini-pro")
-
-    # Load SentenceTransformer model for embeddings
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    # Gemini and SentenceTransformer models are shared through the model registry
+    gemini_model = model_registry.get_gemini_model()
+    embedding_model = model_registry.get_sentence_transformer()
 
     # Define embedding dimension
     embedding_dimension = embedding_model.get_sentence_embedding_dimension()
@@ -165,7 +109,7 @@ def main():
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 
     # Example query
-    query = "Can you provide a detailed summary of the candidate's performance during the interview?"
+    query = INTERVIEW_SUMMARY_QUERY
     
     # Generate and save interview summary
     summary = generate_interview_summary(
@@ -0,0 +1,151 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import vector_store
+import lexical_index
+import metrics
+from embedding_cache import encode_with_cache
+
+# "hybrid" fuses BM25 and vector rankings, "dense" is vector search only, "lexical" is BM25 only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+# Reciprocal rank fusion constant: larger values flatten the advantage of the top ranks
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Query vectors already encoded in this process, keyed by query text
+_query_vectors = {}
+_query_vectors_lock = threading.Lock()
+
+
+def encode_queries(queries, embedding_model=None):
+    """
+    Encodes retrieval queries in one batch, reusing vectors encoded earlier in the
+    process or stored in the on-disk embedding cache.
+
+    Args:
+    - queries (list): Query strings.
+    - embedding_model (SentenceTransformer, optional): Loaded model, used only for queries never seen before.
+
+    Returns:
+    - numpy.ndarray: One float32 row per query.
+    """
+    with _query_vectors_lock:
+        missing = [query for query in dict.fromkeys(queries) if query not in _query_vectors]
+    if missing:
+        vectors = encode_with_cache(missing, model=embedding_model)
+        with _query_vectors_lock:
+            _query_vectors.update(zip(missing, vectors))
+    return np.stack([_query_vectors[query] for query in queries])
+
+
+def fuse_rankings(rankings, top_k, k=RRF_K):
+    """
+    Merges ranked match lists with reciprocal rank fusion: a match scores the sum of
+    1 / (k + rank) over the lists it appears in.
+
+    Args:
+    - rankings (list): Match lists, each best first.
+    - top_k (int): Number of matches to keep.
+    - k (int): RRF constant.
+
+    Returns:
+    - list: Fused matches, best first. Each keeps the fields of its first occurrence,
+      with 'score' set to its fused score relative to the best one (1.0).
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, match in enumerate(ranking, start=1):
+            entry = fused.setdefault(match['id'], [0.0, match])
+            entry[0] += 1.0 / (k + rank)
+    ranked = sorted(fused.values(), key=lambda entry: entry[0], reverse=True)[:top_k]
+    if not ranked:
+        return []
+    best = ranked[0][0]
+    return [{**match, 'score': score / best} for score, match in ranked]
+
+
+def retrieve(plans, embedding_dimension, namespace, PINECONE_API_KEY=None, embedding_model=None,
+             mode=RETRIEVAL_MODE, index_fallback=None):
+    """
+    Retrieves the context of several analyses with one batched query per index.
+
+    All queries are encoded together, every index receives the queries that
+    target it in a single query_many call, and the indexes are queried in parallel.
+    In hybrid mode each ranking is fused with the BM25 ranking of the interview's
+    lexical index (when it was built), so exact terms are found even when the
+    embedding misses them. Lexical mode never loads the embedding model.
+    Indexes listed in index_fallback are not queried; their matches come from the
+    index they map to.
+
+    Args:
+    - plans (dict): Analysis name -> {'query': str, 'top_k': {index name: top_k}}.
+    - embedding_dimension (int): Embedding dimension of the indexes.
+    - namespace (str): Interview namespace to search.
+    - PINECONE_API_KEY (str, optional): Pinecone API key.
+    - embedding_model (SentenceTransformer, optional): Loaded embedding model.
+    - mode (str): "hybrid", "dense" or "lexical".
+    - index_fallback (dict, optional): Index name -> index searched in its place, e.g. the
+      speaker indexes -> main index while speakers are not separated yet.
+
+    Returns:
+    - dict: Analysis name -> {index name: list of matches}.
+    """
+    if mode not in ('hybrid', 'dense', 'lexical'):
+        raise ValueError(f"Unknown retrieval mode '{mode}'. Modes: hybrid, dense, lexical")
+    queries = list(dict.fromkeys(plan['query'] for plan in plans.values()))
+    query_rows = {query: row for row, query in enumerate(queries)}
+    query_vectors = encode_queries(queries, embedding_model) if mode != 'lexical' else None
+    index_fallback = index_fallback or {}
+
+    # Per index: the distinct query rows it must answer and the largest top_k asked for
+    requests = {}
+    for plan in plans.values():
+        for index_name, top_k in plan['top_k'].items():
+            request = requests.setdefault(index_fallback.get(index_name, index_name), {'rows': [], 'top_k': 0})
+            row = query_rows[plan['query']]
+            if row not in request['rows']:
+                request['rows'].append(row)
+            request['top_k'] = max(request['top_k'], top_k)
+
+    def query_dense(index_name, request):
+        index = vector_store.get_index(index_name, embedding_dimension, PINECONE_API_KEY)
+        try:
+            with metrics.timed_call('vector_store.query_many', queries=len(request['rows'])):
+                return index.query_many(query_vectors[request['rows']], top_k=request['top_k'],
+                                        include_metadata=True, namespace=namespace)
+        except Exception as e:
+            print(f"Retrieval error ({index_name}): {e}")
+            return [[] for _ in request['rows']]
+
+    def query_index(index_name):
+        request = requests[index_name]
+        dense = query_dense(index_name, request) if mode != 'lexical' else None
+        lexical = None
+        if mode != 'dense':
+            index = lexical_index.get_index(index_name, namespace)
+            if index is not None:
+                with metrics.timed_call('lexical_index.search', queries=len(request['rows'])):
+                    lexical = [index.search(queries[row], request['top_k']) for row in request['rows']]
+        if dense is not None and lexical is not None:
+            results = [fuse_rankings([list(dense_matches), lexical_matches], request['top_k'])
+                       for dense_matches, lexical_matches in zip(dense, lexical)]
+        elif dense is not None:
+            results = dense
+        elif lexical is not None:
+            # Rescaled like fused scores, so BM25 scores stay comparable with vector scores
+            results = [fuse_rankings([lexical_matches], request['top_k']) for lexical_matches in lexical]
+        else:
+            results = [[] for _ in request['rows']]
+        return index_name, dict(zip(request['rows'], results))
+
+    with ThreadPoolExecutor(max_workers=max(1, len(requests))) as executor:
+        results = dict(executor.map(query_index, requests))
+
+    return {
+        name: {
+            index_name: list(results[index_fallback.get(index_name, index_name)][query_rows[plan['query']]])[:top_k]
+            for index_name, top_k in plan['top_k'].items()
+        }
+        for name, plan in plans.items()
+    }
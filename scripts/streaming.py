@@ -0,0 +1,393 @@
+import os
+import time
+import argparse
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+import metrics
+import vector_store
+import lexical_index
+import transcription_backends
+from audio_io import SAMPLE_RATE
+from text_preprocessing import split_into_sentences
+from embedding_cache import encode_with_cache
+from embeddings_and_pinecone_store import EMBEDDING_DIMENSION, make_vector_id
+
+# Load environment variables from .env
+load_dotenv()
+
+# Seconds of audio read from the source before each transcription pass
+STREAM_WINDOW_SECONDS = float(os.getenv("STREAM_WINDOW_SECONDS", "3"))
+# Words ending this close to the live edge may still change, so they wait for the next window
+STREAM_HOLDBACK_SECONDS = float(os.getenv("STREAM_HOLDBACK_SECONDS", "1.0"))
+# Longest stretch of audio re-transcribed at once; everything older is committed
+STREAM_MAX_BUFFER_SECONDS = float(os.getenv("STREAM_MAX_BUFFER_SECONDS", "20"))
+# A file being written is considered finished after this long without new data
+STREAM_IDLE_TIMEOUT = float(os.getenv("STREAM_IDLE_TIMEOUT", "10"))
+# Live transcription favours latency, so it decodes greedily unless told otherwise
+STREAM_PRESET = os.getenv("STREAM_PRESET", "fast")
+# Speakers are not separated live: summaries retrieve the speaker indexes' matches from the main index
+LIVE_INDEX_FALLBACK = {
+    vector_store.CANDIDATE_INDEX_NAME: vector_store.MAIN_INDEX_NAME,
+    vector_store.INTERVIEWER_INDEX_NAME: vector_store.MAIN_INDEX_NAME,
+}
+
+
+def open_audio_stream(source, sr=SAMPLE_RATE, follow=True, idle_timeout=STREAM_IDLE_TIMEOUT):
+    """
+    Starts ffmpeg decoding a live source to 16 kHz mono float32 PCM on its stdout.
+
+    Args:
+    - source (str): "-" for standard input, or the path of a file that may still be written
+      (a WAV, MKV or MPEG-TS recording; MP4 cannot be read before it is finalized).
+    - sr (int): Target sampling rate.
+    - follow (bool): Keep reading at the end of the file until no data arrived for `idle_timeout`.
+    - idle_timeout (float): Seconds without new data after which a followed file is finished.
+
+    Returns:
+    - subprocess.Popen: The ffmpeg process.
+    """
+    import ffmpeg
+
+    if source == '-':
+        # ffmpeg inherits our stdin, so no -nostdin here
+        stream = ffmpeg.input('pipe:')
+        global_args = ('-loglevel', 'error')
+    else:
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Audio source not found: {source}")
+        options = {'follow': 1, 'rw_timeout': int(idle_timeout * 1e6)} if follow else {}
+        stream = ffmpeg.input(source, **options)
+        global_args = ('-nostdin', '-loglevel', 'error')
+
+    return (
+        stream
+        .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=sr)
+        .global_args(*global_args)
+        .run_async(pipe_stdout=True)
+    )
+
+
+def iter_windows(stream, window_seconds=STREAM_WINDOW_SECONDS, sr=SAMPLE_RATE):
+    """
+    Reads fixed windows of float32 samples from a byte stream as they become available.
+
+    Yields:
+    - numpy.ndarray: A window of samples; the last one may be shorter.
+    """
+    window_bytes = int(window_seconds * sr) * 4
+    pending = b''
+    while True:
+        data = stream.read(window_bytes - len(pending))
+        if not data:
+            break
+        pending += data
+        if len(pending) >= window_bytes:
+            yield np.frombuffer(pending, dtype=np.float32)
+            pending = b''
+    usable = len(pending) - len(pending) % 4
+    if usable:
+        yield np.frombuffer(pending[:usable], dtype=np.float32)
+
+
+class StreamingTranscriber:
+    """
+    Rolling-window transcriber: the uncommitted tail of the audio is re-transcribed
+    with every new window, and words are committed once they are far enough from the
+    live edge (or the tail gets too long) that more audio would not change them.
+    """
+
+    def __init__(self, backend, sr=SAMPLE_RATE, holdback_seconds=STREAM_HOLDBACK_SECONDS,
+                 max_buffer_seconds=STREAM_MAX_BUFFER_SECONDS):
+        self.backend = backend
+        self.sr = sr
+        self.holdback_seconds = holdback_seconds
+        self.max_buffer_seconds = max_buffer_seconds
+        self.buffer = np.zeros(0, dtype=np.float32)
+        # Position of buffer[0] in the whole recording, in seconds
+        self.offset = 0.0
+
+    def feed(self, samples, final=False):
+        """
+        Adds a window of audio and returns the words that became final.
+
+        Args:
+        - samples (numpy.ndarray): New float32 samples.
+        - final (bool): The stream ended; commit everything still pending.
+
+        Returns:
+        - list: Committed words as {'word', 'start', 'end'} with times in the whole recording.
+        """
+        self.buffer = np.concatenate((self.buffer, np.asarray(samples, dtype=np.float32)))
+        buffer_seconds = len(self.buffer) / self.sr
+        if not buffer_seconds:
+            return []
+
+        with metrics.timed_call('stream.transcribe', audio_seconds=round(buffer_seconds, 3)):
+            result = self.backend.transcribe(self.buffer, word_timestamps=True)
+        words = [word for segment in result.get('segments', []) for word in segment.get('words') or []]
+
+        if final or buffer_seconds >= self.max_buffer_seconds:
+            cutoff = buffer_seconds
+        else:
+            cutoff = buffer_seconds - self.holdback_seconds
+        committed = [word for word in words if float(word['end']) <= cutoff]
+
+        if committed:
+            trim = float(committed[-1]['end'])
+        elif not words:
+            # Silence: nothing to wait for before the holdback
+            trim = max(0.0, cutoff)
+        else:
+            trim = 0.0
+        if final:
+            trim = buffer_seconds
+
+        committed = [
+            {'word': word['word'], 'start': float(word['start']) + self.offset, 'end': float(word['end']) + self.offset}
+            for word in committed
+        ]
+        self.buffer = self.buffer[int(trim * self.sr):]
+        self.offset += trim
+        return committed
+
+
+class IncrementalSentenceSplitter:
+    """
+    Splits a growing transcript into sentences with split_into_sentences. The last
+    sentence may still be unfinished, so it is held back until more text arrives.
+    """
+
+    def __init__(self, nlp=None):
+        self.nlp = nlp
+        self.pending = ''
+
+    def feed(self, text, final=False):
+        """
+        Adds transcribed text and returns the sentences that are complete.
+
+        Args:
+        - text (str): New text, as Whisper words with their leading spaces.
+        - final (bool): The stream ended; the pending sentence is complete too.
+
+        Returns:
+        - list: Finalized sentences, in order.
+        """
+        self.pending += text
+        if not self.pending.strip():
+            return []
+        sentences = split_into_sentences(self.pending.strip(), self.nlp)
+        if final:
+            self.pending = ''
+            return sentences
+        if len(sentences) < 2:
+            return []
+        self.pending = sentences[-1]
+        return sentences[:-1]
+
+
+class StreamingSession:
+    """
+    Live interview: transcribes windows as they arrive, and embeds and upserts each
+    sentence into the main index as soon as it is final, so it is searchable
+    (and summaries can be requested) while the interview is still going on.
+    """
+
+    def __init__(self, paths, backend=None, window_seconds=STREAM_WINDOW_SECONDS, api_key=None):
+        self.paths = paths
+        self.interview_id = paths['interview_id']
+        self.window_seconds = window_seconds
+        self.transcriber = StreamingTranscriber(
+            backend or transcription_backends.get_backend(preset=STREAM_PRESET))
+        self.splitter = IncrementalSentenceSplitter()
+        api_key = api_key or os.getenv("PINECONE_API_KEY")
+        self.index = vector_store.get_index(vector_store.MAIN_INDEX_NAME, EMBEDDING_DIMENSION, api_key)
+        self.position = 0
+        self.sentence_times = []
+        self.latencies = []
+        self._words = []
+
+        self.transcript_path = os.path.join(paths['transcripts_dir'], 'main.txt')
+        self.sentences_path = os.path.join(paths['processed_dir'], 'main_sentences.txt')
+        for path in (self.transcript_path, self.sentences_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w', encoding='utf-8').close()
+        # A live session starts the interview from scratch; retrieval is vector-only until
+        # the finished recording is ingested and its lexical index built. Speakers are not
+        # separated live, so the speaker indexes and timing metrics of a previous run are
+        # cleared too, or mid-interview summaries would mix them in.
+        self.index.delete_namespace(self.interview_id)
+        for index_name in (vector_store.CANDIDATE_INDEX_NAME, vector_store.INTERVIEWER_INDEX_NAME):
+            vector_store.get_index(index_name, EMBEDDING_DIMENSION, api_key).delete_namespace(self.interview_id)
+        for index_name in (vector_store.MAIN_INDEX_NAME, vector_store.CANDIDATE_INDEX_NAME,
+                           vector_store.INTERVIEWER_INDEX_NAME):
+            lexical_index.delete_index(index_name, self.interview_id)
+        if os.path.exists(paths['interview_metrics']):
+            os.remove(paths['interview_metrics'])
+
+    def _sentence_span(self, sentence):
+        """
+        Returns (start, end) of a finalized sentence from the committed words it consumed.
+        """
+        length = len(sentence.replace(' ', ''))
+        consumed = 0
+        start = self._words[0]['start'] if self._words else 0.0
+        end = start
+        while self._words and consumed < length:
+            word = self._words.pop(0)
+            consumed += len(word['word'].replace(' ', ''))
+            end = word['end']
+        return start, end
+
+    def store_sentences(self, sentences):
+        """
+        Embeds finalized sentences, upserts them to the main index and appends them to main_sentences.txt.
+        """
+        if not sentences:
+            return
+        embeddings = encode_with_cache(sentences)
+        values = embeddings.tolist()
+        batch = []
+        for i, sentence in enumerate(sentences):
+            start, end = self._sentence_span(sentence)
+            self.sentence_times.append((start, end))
+            print(f"[{start:7.1f}s] {sentence}")
+            metadata = {"sentence": sentence, "position": self.position, "start": start, "end": end}
+            batch.append((make_vector_id(self.interview_id, self.position, sentence), values[i], metadata))
+            self.position += 1
+        with metrics.timed_call('vector_store.upsert', vectors=len(batch)):
+            self.index.upsert(vectors=batch, namespace=self.interview_id)
+        metrics.increment('vectors_upserted', len(batch))
+
+        with open(self.sentences_path, 'a', encoding='utf-8') as file:
+            for sentence in sentences:
+                file.write(sentence + "\n")
+
+    def process_window(self, samples, final=False):
+        """
+        Transcribes one window and stores the sentences it completed.
+
+        Returns:
+        - list: The sentences made searchable by this window.
+        """
+        arrived = time.perf_counter()
+        words = self.transcriber.feed(samples, final=final)
+        self._words.extend(words)
+        text = ''.join(word['word'] for word in words)
+        if text:
+            with open(self.transcript_path, 'a', encoding='utf-8') as file:
+                file.write(text)
+        sentences = self.splitter.feed(text, final=final)
+        self.store_sentences(sentences)
+        if sentences:
+            self.latencies.append(time.perf_counter() - arrived)
+        metrics.increment('audio_seconds_streamed', len(samples) / self.transcriber.sr)
+        return sentences
+
+    def run(self, windows, summary_interval=None):
+        """
+        Processes windows until the source ends.
+
+        Args:
+        - windows (iterable): Windows of float32 samples, e.g. from iter_windows.
+        - summary_interval (float, optional): Regenerate the summaries in the background
+          every this many seconds of audio.
+
+        Returns:
+        - int: Number of sentences stored.
+        """
+        summary_thread = None
+        next_summary = summary_interval
+        streamed = 0.0
+        # Each window is processed as soon as it arrives; the end of the source flushes
+        # the words and sentence still held back
+        for window in windows:
+            self.process_window(window)
+            streamed += len(window) / self.transcriber.sr
+            if summary_interval and streamed >= next_summary and self.position:
+                if summary_thread is None or not summary_thread.is_alive():
+                    summary_thread = threading.Thread(target=request_summaries, args=(self.paths,), daemon=True)
+                    summary_thread.start()
+                next_summary += summary_interval
+        self.process_window(np.zeros(0, dtype=np.float32), final=True)
+
+        if summary_thread is not None:
+            summary_thread.join()
+        return self.position
+
+
+def request_summaries(paths):
+    """
+    Generates the summaries from what has been stored so far in the interview.
+    The speaker indexes are empty during a live session, so their matches come from the main index.
+    """
+    from main import generate_all_summaries
+
+    print("Generating summaries from the interview so far...")
+    try:
+        generate_all_summaries(paths, index_fallback=LIVE_INDEX_FALLBACK)
+    except RuntimeError as e:
+        print(f"Error while generating summaries: {e}")
+
+
+def stream_interview(source, paths, window_seconds=STREAM_WINDOW_SECONDS, follow=True,
+                     summary_interval=None, summarize_at_end=False):
+    """
+    Runs a live session on an audio source until it ends.
+
+    Args:
+    - source (str): "-" for standard input, or a file that may still be written.
+    - paths (dict): Paths from main.get_paths.
+    - window_seconds (float): Seconds of audio per transcription pass.
+    - follow (bool): Wait for a file to grow instead of stopping at its current end.
+    - summary_interval (float, optional): Regenerate summaries every this many seconds of audio.
+    - summarize_at_end (bool): Generate the summaries once the stream ends.
+
+    Returns:
+    - int: Number of sentences stored.
+    """
+    metrics.reset()
+    session = StreamingSession(paths, window_seconds=window_seconds)
+    process = open_audio_stream(source, follow=follow)
+    print(f"Streaming '{source}' in {window_seconds:g}s windows (interview '{paths['interview_id']}')...")
+    try:
+        with metrics.stage('streaming'):
+            stored = session.run(iter_windows(process.stdout, window_seconds), summary_interval)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    if session.latencies:
+        latencies = np.array(session.latencies)
+        print(f"Stored {stored} sentences. Window-to-searchable latency: "
+              f"median {np.median(latencies):.2f}s, max {latencies.max():.2f}s "
+              f"(plus up to {window_seconds + STREAM_HOLDBACK_SECONDS:g}s of buffering).")
+    if summarize_at_end and stored:
+        request_summaries(paths)
+    metrics.save_report(paths['run_report'], interview_id=paths['interview_id'], mode='streaming')
+    return stored
+
+
+def main():
+    from main import get_paths
+
+    parser = argparse.ArgumentParser(description="Transcribe and index an interview while it is being recorded.")
+    parser.add_argument('source', help="Audio file being written (WAV, MKV, MPEG-TS) or '-' for standard input.")
+    parser.add_argument('--interview-id', default='live', help="Interview identifier (vector store namespace).")
+    parser.add_argument('--window-seconds', type=float, default=STREAM_WINDOW_SECONDS,
+                        help="Seconds of audio per transcription pass.")
+    parser.add_argument('--no-follow', action='store_true',
+                        help="Stop at the current end of the file instead of waiting for more audio.")
+    parser.add_argument('--summary-interval', type=float,
+                        help="Regenerate the summaries every this many seconds of audio.")
+    parser.add_argument('--summarize', action='store_true', help="Generate the summaries when the stream ends.")
+    args = parser.parse_args()
+
+    project_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paths = get_paths(project_base_path, interview_id=args.interview_id)
+    stream_interview(args.source, paths, args.window_seconds, follow=not args.no_follow,
+                     summary_interval=args.summary_interval, summarize_at_end=args.summarize)
+
+if __name__ == "__main__":
+    main()
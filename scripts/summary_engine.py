@@ -0,0 +1,239 @@
+import os
+import time
+import random
+import asyncio
+
+import retrieval
+import metrics
+import interview_metrics
+from summary_output import create_output_and_save_summary
+
+# Written by the interview metrics stage
+INTERVIEW_METRICS_FILENAME = 'interview_metrics.json'
+
+# Maximum number of LLM calls in flight
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "5"))
+# Token bucket: sustained request rate and burst size
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+# Exponential backoff for transient errors
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30.0"))
+
+# google.api_core exception names (and HTTP codes) worth retrying
+TRANSIENT_ERROR_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'ServiceUnavailable',
+    'DeadlineExceeded', 'InternalServerError', 'Aborted', 'GatewayTimeout',
+}
+TRANSIENT_ERROR_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; each
+    request takes one token and waits when none are left.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_transient_error(error):
+    """
+    Returns True for errors that are worth retrying (rate limits, timeouts, server errors).
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    if type(error).__name__ in TRANSIENT_ERROR_NAMES:
+        return True
+    code = getattr(error, 'code', None)
+    code = getattr(code, 'value', code)
+    return code in TRANSIENT_ERROR_CODES
+
+
+async def generate_text(gemini_model, prompt):
+    """
+    Calls the model without blocking the event loop, recording the call latency
+    and the prompt and response sizes.
+    """
+    with metrics.timed_call('llm.generate', prompt_chars=len(prompt)) as sizes:
+        if hasattr(gemini_model, 'generate_content_async'):
+            response = await gemini_model.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(gemini_model.generate_content, prompt)
+        sizes['response_chars'] = len(response.text)
+        sizes['cache_hits'] = int(getattr(response, 'cached', False))
+    return response.text
+
+
+async def generate_with_retries(gemini_model, prompt, semaphore, rate_limiter,
+                                max_retries=LLM_MAX_RETRIES, base_delay=LLM_RETRY_BASE_DELAY,
+                                max_delay=LLM_RETRY_MAX_DELAY):
+    """
+    Generates text under the concurrency limit and rate limit, retrying transient
+    errors with exponential backoff and jitter.
+    """
+    for attempt in range(max_retries + 1):
+        async with semaphore:
+            await rate_limiter.acquire()
+            try:
+                return await generate_text(gemini_model, prompt)
+            except Exception as e:
+                if attempt == max_retries or not is_transient_error(e):
+                    raise
+                error = e
+        delay = min(max_delay, base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+        print(f"Transient LLM error ({error}); retrying in {delay:.1f}s...")
+        await asyncio.sleep(delay)
+
+
+def build_analyses():
+    """
+    Describes every summary analysis: its retrieval query, the matches it needs
+    from each index, how to turn them into a prompt, and its output file.
+
+    Returns:
+    - list: Dicts with 'name', 'query', 'top_k', 'make_prompt' (callable taking the matches and the
+      interview metrics, which may be None) and 'filename'.
+    """
+    import communication_style_summary
+    import active_listening_summary
+    import engagement_summary
+    import rag_summary_generating
+
+    return [
+        {
+            'name': 'communication_style',
+            'query': communication_style_summary.COMMUNICATION_STYLE_QUERY,
+            'top_k': communication_style_summary.RETRIEVAL_TOP_K,
+            'make_prompt': lambda matches, metrics: communication_style_summary.prompt_from_matches(
+                matches, communication_style_summary.COMMUNICATION_STYLE_QUERY, metrics),
+            'filename': 'communication_style_summary.txt',
+        },
+        {
+            'name': 'active_listening',
+            'query': active_listening_summary.ACTIVE_LISTENING_QUERY,
+            'top_k': active_listening_summary.RETRIEVAL_TOP_K,
+            'make_prompt': active_listening_summary.prompt_from_matches,
+            'filename': 'active_listening_summary.txt',
+        },
+        {
+            'name': 'engagement',
+            'query': engagement_summary.ENGAGEMENT_QUERY,
+            'top_k': engagement_summary.RETRIEVAL_TOP_K,
+            'make_prompt': lambda matches, metrics: engagement_summary.prompt_from_matches(
+                matches, "engagement", metrics),
+            'filename': 'engagement_summary.txt',
+        },
+        {
+            'name': 'interview_summary',
+            'query': rag_summary_generating.INTERVIEW_SUMMARY_QUERY,
+            'top_k': rag_summary_generating.RETRIEVAL_TOP_K,
+            'make_prompt': lambda matches, metrics: rag_summary_generating.prompt_from_matches(
+                matches, rag_summary_generating.INTERVIEW_SUMMARY_QUERY, metrics),
+            'filename': 'summary.txt',
+        },
+    ]
+
+
+async def run_analysis(analysis, matches, gemini_model, project_base_path, semaphore, rate_limiter,
+                       interview_metrics=None):
+    """
+    Builds one analysis prompt from its retrieved matches (and the measured interview
+    metrics, if any), generates its summary and saves it.
+    """
+    start = time.perf_counter()
+    try:
+        prompt = analysis['make_prompt'](matches, interview_metrics)
+        summary = await generate_with_retries(gemini_model, prompt, semaphore, rate_limiter)
+        create_output_and_save_summary(project_base_path, summary, analysis['filename'])
+        status = 'ok'
+    except Exception as e:
+        print(f"Summary generation error ({analysis['name']}): {e}")
+        summary = "Unable to generate summary."
+        status = 'failed'
+    elapsed = time.perf_counter() - start
+    print(f"{analysis['name']} summary finished in {elapsed:.2f}s ({status}).")
+    return {'name': analysis['name'], 'status': status, 'summary': summary, 'elapsed_seconds': elapsed}
+
+
+async def run_analyses(analyses, retrieval_settings, gemini_model, project_base_path,
+                       concurrency=SUMMARY_CONCURRENCY, requests_per_minute=LLM_REQUESTS_PER_MINUTE, burst=LLM_BURST,
+                       interview_metrics=None):
+    """
+    Retrieves the context of every analysis in one shared pass, then runs all
+    LLM calls concurrently under one concurrency limit and one rate limit.
+
+    Args:
+    - analyses (list): Analyses from build_analyses.
+    - retrieval_settings (dict): embedding_dimension, namespace, PINECONE_API_KEY, embedding_model
+      and index_fallback for retrieval.retrieve.
+    - interview_metrics (dict, optional): Measured timing metrics added to the prompts.
+
+    Returns:
+    - list: One result dict per analysis, in input order.
+    """
+    plans = {analysis['name']: {'query': analysis['query'], 'top_k': analysis['top_k']} for analysis in analyses}
+    # Retrieval is blocking I/O, so it runs in a worker thread
+    matches = await asyncio.to_thread(retrieval.retrieve, plans, **retrieval_settings)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = TokenBucket(requests_per_minute / 60.0, burst)
+    return await asyncio.gather(*(
+        run_analysis(analysis, matches[analysis['name']], gemini_model, project_base_path, semaphore, rate_limiter,
+                     interview_metrics)
+        for analysis in analyses
+    ))
+
+
+def load_measured_metrics(project_base_path):
+    """
+    Returns the interview metrics saved in outputs/interview_metrics.json, or None if they were not computed.
+    """
+    return interview_metrics.load_interview_metrics(
+        os.path.join(project_base_path, 'outputs', INTERVIEW_METRICS_FILENAME))
+
+
+def generate_all_summaries(gemini_model, project_base_path, PINECONE_API_KEY, embedding_model,
+                           embedding_dimension, interview_id, index_fallback=None):
+    """
+    Generates every summary analysis concurrently and saves them to the outputs directory.
+
+    The interview metrics in outputs/interview_metrics.json, when present, are added
+    to the prompts as measured numbers. index_fallback (see retrieval.retrieve) redirects
+    the retrieval of indexes that are not filled yet, e.g. during a live session.
+
+    Returns:
+    - list: One result dict per analysis.
+    """
+    retrieval_settings = {
+        'embedding_dimension': embedding_dimension,
+        'namespace': interview_id,
+        'PINECONE_API_KEY': PINECONE_API_KEY,
+        'embedding_model': embedding_model,
+        'index_fallback': index_fallback,
+    }
+    measured = load_measured_metrics(project_base_path)
+    results = asyncio.run(run_analyses(build_analyses(), retrieval_settings, gemini_model, project_base_path,
+                                       interview_metrics=measured))
+    if hasattr(gemini_model, 'hits'):
+        print(f"LLM response cache: {gemini_model.hits} hits, {gemini_model.misses} model calls.")
+    return results
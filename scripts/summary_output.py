@@ -0,0 +1,29 @@
+import os
+
+
+def create_output_and_save_summary(base_path, summary_text, filename):
+    """
+    Creates the 'outputs' directory if it doesn't exist and saves the summary to the specified file.
+    This file will be overwritten each time the function is called.
+
+    Args:
+    - base_path (str): Project base path; the summary goes to <base_path>/outputs.
+    - summary_text (str): The summary.
+    - filename (str): Name of the summary file.
+
+    Returns:
+    - str: Path of the summary file.
+    """
+    output_dir = os.path.join(base_path, 'outputs')
+    os.makedirs(output_dir, exist_ok=True)
+    summary_file_path = os.path.join(output_dir, filename)
+
+    # Write the summary_text to the file (overwrites the file each time)
+    try:
+        with open(summary_file_path, 'w', encoding='utf-8') as file:
+            file.write(summary_text)
+        print(f"Summary successfully saved at: {summary_file_path}")
+    except Exception as e:
+        print(f"Error saving the summary: {e}")
+
+    return summary_file_path
@@ -1,28 +1,94 @@
 # src/preprocessing.py
 
-import spacy
 import os
+import re
 
-# Load the spaCy model for sentence tokenization
-nlp = spacy.load("en_core_web_sm")
+import model_registry
+from transcript_store import TranscriptStore
 
-def split_into_sentences(text):
+# "senter" (trained sentence recognizer only), "parser" (full dependency parse) or "rule" (punctuation)
+SENTENCE_SEGMENTER = os.getenv("SENTENCE_SEGMENTER", "senter")
+# Processes used by nlp.pipe; 1 segments in this process
+SEGMENTATION_PROCESSES = int(os.getenv("SEGMENTATION_PROCESSES", "1"))
+SEGMENTATION_BATCH_SIZE = int(os.getenv("SEGMENTATION_BATCH_SIZE", "16"))
+# Texts are cut into pieces of at most this many characters, which bounds spaCy's
+# memory use and keeps every piece under nlp.max_length
+SEGMENTATION_CHUNK_CHARS = int(os.getenv("SEGMENTATION_CHUNK_CHARS", "100000"))
+
+# End of a sentence followed by whitespace: the preferred place to cut a long text
+_SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+
+
+def chunk_text(text, max_chars=SEGMENTATION_CHUNK_CHARS):
+    """
+    Cuts a text into pieces of at most `max_chars` characters, at the last sentence
+    end (or failing that, the last whitespace) before the limit.
+
+    Args:
+    - text (str): Text to cut.
+    - max_chars (int): Maximum piece length.
+
+    Returns:
+    - list: The pieces, in order; joined they give back the text.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        window = text[start:end]
+        cut = None
+        for match in _SENTENCE_END.finditer(window, len(window) // 2):
+            cut = start + match.end()
+        if cut is None:
+            space = window.rfind(' ', len(window) // 2)
+            cut = start + space + 1 if space != -1 else end
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def split_texts(texts, nlp=None, batch_size=SEGMENTATION_BATCH_SIZE, n_process=SEGMENTATION_PROCESSES,
+                max_chars=SEGMENTATION_CHUNK_CHARS):
+    """
+    Splits several texts into sentences in one batched nlp.pipe pass.
+
+    Args:
+    - texts (list): Raw texts.
+    - nlp (spacy.Language, optional): Pipeline that sets sentence boundaries.
+      Defaults to the shared segmenter selected by SENTENCE_SEGMENTER.
+    - batch_size (int): Pieces per nlp.pipe batch.
+    - n_process (int): Processes used by nlp.pipe.
+    - max_chars (int): Long texts are segmented in pieces of at most this many characters.
+
+    Returns:
+    - list: For each text, its list of sentences.
+    """
+    if nlp is None:
+        nlp = model_registry.get_sentence_segmenter(SENTENCE_SEGMENTER)
+    max_chars = min(max_chars, nlp.max_length)
+
+    pieces = [(position, chunk) for position, text in enumerate(texts) for chunk in chunk_text(text, max_chars)]
+    results = [[] for _ in texts]
+    # Only the sentence strings are kept; each Doc is dropped as soon as it is read
+    docs = nlp.pipe((chunk for _, chunk in pieces), batch_size=batch_size, n_process=n_process)
+    for (position, _), doc in zip(pieces, docs):
+        results[position].extend(sent.text.strip() for sent in doc.sents if sent.text.strip())
+    return results
+
+
+def split_into_sentences(text, nlp=None):
     """
     This function splits the raw text into sentences using spaCy.
 
     Args:
     - text (str): Raw text input.
+    - nlp (spacy.Language, optional): Loaded spaCy pipeline. Defaults to the shared sentence segmenter.
 
     Returns:
     - list: List of sentences.
     """
-    # Process the text using spaCy
-    doc = nlp(text)
-    
-    # Extract sentences from the processed text
-    sentences = [sent.text.strip() for sent in doc.sents]
-    
-    return sentences
+    return split_texts([text], nlp, n_process=1)[0]
 
 def read_text_from_file(file_path):
     """
@@ -69,6 +135,42 @@ def process_and_save(input_file_path, output_file_path):
     # Save the sentences to the output file
     save_sentences_to_file(sentences, output_file_path)
 
+def process_and_save_all(input_file_paths, output_file_paths):
+    """
+    This function splits several text files into sentences in one batched pass
+    and saves each file's sentences to its output file.
+
+    Args:
+    - input_file_paths (list): Paths to the input text files.
+    - output_file_paths (list): Paths to the output files, one per input file.
+    """
+    texts = [read_text_from_file(path) for path in input_file_paths]
+    for sentences, output_file_path in zip(split_texts(texts), output_file_paths):
+        save_sentences_to_file(sentences, output_file_path)
+
+def process_store(store_dir, processed_dir):
+    """
+    This function splits every speaker turn of the transcript store into sentences
+    in one batched pass, records them (with their times and speaker) in the store,
+    and saves the main and per-speaker sentence files derived from them.
+
+    Args:
+    - store_dir (str): Transcript store written by the transcription stage.
+    - processed_dir (str): Directory for the *_sentences.txt files.
+
+    Returns:
+    - int: Number of sentences.
+    """
+    store = TranscriptStore(store_dir)
+    # A sentence never spans two speakers, so each turn is segmented on its own
+    sentences = store.write_sentences(split_texts(store.texts(store.turns)))
+
+    save_sentences_to_file(store.texts(sentences), os.path.join(processed_dir, 'main_sentences.txt'))
+    for speaker in store.speakers:
+        save_sentences_to_file(store.texts(store.speaker_sentences(speaker)),
+                               os.path.join(processed_dir, f'speaker{speaker + 1}_sentences.txt'))
+    return len(sentences)
+
 # Example usage
 if __name__ == "__main__":
     # Define file paths
@@ -80,12 +182,9 @@ if __name__ == "__main__":
     output_file_path_1 = "../data/processed/speaker1_sentences.txt"
     output_file_path_2 = "../data/processed/speaker2_sentences.txt"
     
-    # Process and save the sentences
-    process_and_save(main_input_file_path, main_output_file_path)
+    # Process and save the sentences of all three transcripts in one batched pass
+    process_and_save_all([main_input_file_path, input_file_path_1, input_file_path_2],
+                         [main_output_file_path, output_file_path_1, output_file_path_2])
     print(f"For main file: Sentences have been saved to {main_output_file_path}")
-
-    process_and_save(input_file_path_1, output_file_path_1)
     print(f"For speaker-1: Sentences have been saved to {output_file_path_1}")
-
-    process_and_save(input_file_path_2, output_file_path_2)
     print(f"For speaker-2: Sentences have been saved to {output_file_path_2}")
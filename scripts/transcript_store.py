@@ -0,0 +1,208 @@
+import os
+import json
+import numpy as np
+
+# Columnar transcript of one interview, in <store dir>:
+#   text.bin       UTF-8 text of every speaker turn, one turn per line
+#   words.npy      one row per word: times, speaker and byte span in text.bin
+#   turns.npy      one row per speaker turn: times, speaker, byte span and word rows
+#   sentences.npy  one row per sentence: times, speaker, byte span and embedding row
+#   embeddings.npy one float32 row per sentence
+# Every array is memory-mapped on load, so stages read only the columns and rows they use.
+WORD_DTYPE = np.dtype([('start', 'f8'), ('end', 'f8'), ('speaker', 'i4'), ('text_start', 'i8'), ('text_end', 'i8')])
+TURN_DTYPE = np.dtype([('start', 'f8'), ('end', 'f8'), ('speaker', 'i4'), ('text_start', 'i8'), ('text_end', 'i8'),
+                       ('word_start', 'i8'), ('word_end', 'i8')])
+SENTENCE_DTYPE = np.dtype([('start', 'f8'), ('end', 'f8'), ('speaker', 'i4'), ('text_start', 'i8'),
+                           ('text_end', 'i8'), ('embedding_row', 'i8')])
+
+TEXT_FILE = 'text.bin'
+WORDS_FILE = 'words.npy'
+TURNS_FILE = 'turns.npy'
+SENTENCES_FILE = 'sentences.npy'
+EMBEDDINGS_FILE = 'embeddings.npy'
+META_FILE = 'meta.json'
+
+
+def _save_array(store_dir, filename, array):
+    # Written to a temporary file first so readers never map a half-written array
+    path = os.path.join(store_dir, filename)
+    with open(f"{path}.tmp", 'wb') as file:
+        np.save(file, array)
+    os.replace(f"{path}.tmp", path)
+
+
+def write_transcript(store_dir, words, speakers):
+    """
+    Saves timed words and their speaker turns.
+
+    Args:
+    - store_dir (str): Store directory of the interview.
+    - words (list): Dicts with 'word', 'start', 'end' and 'speaker', in time order.
+    - speakers (list): Every diarized speaker label, including those who said nothing.
+
+    Returns:
+    - TranscriptStore: The store, loaded back.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    word_rows = np.zeros(len(words), dtype=WORD_DTYPE)
+    turn_rows = []
+    blob = bytearray()
+
+    for i, word in enumerate(words):
+        new_turn = not turn_rows or turn_rows[-1]['speaker'] != word['speaker']
+        if new_turn:
+            if turn_rows:
+                blob += b'\n'
+            turn_rows.append({'start': word['start'], 'speaker': word['speaker'], 'text_start': len(blob),
+                              'word_start': i})
+        # Whisper words carry their leading space; a turn's first word does not need it
+        encoded = (word['word'].lstrip() if new_turn else word['word']).encode('utf-8')
+        word_rows[i] = (word['start'], word['end'], word['speaker'], len(blob), len(blob) + len(encoded))
+        blob += encoded
+        turn = turn_rows[-1]
+        turn['end'], turn['text_end'], turn['word_end'] = word['end'], len(blob), i + 1
+
+    turns = np.zeros(len(turn_rows), dtype=TURN_DTYPE)
+    for i, turn in enumerate(turn_rows):
+        turns[i] = tuple(turn[name] for name in TURN_DTYPE.names)
+
+    with open(os.path.join(store_dir, f"{TEXT_FILE}.tmp"), 'wb') as file:
+        file.write(blob)
+    os.replace(os.path.join(store_dir, f"{TEXT_FILE}.tmp"), os.path.join(store_dir, TEXT_FILE))
+    _save_array(store_dir, WORDS_FILE, word_rows)
+    _save_array(store_dir, TURNS_FILE, turns)
+    # Sentences and embeddings of a previous transcript no longer line up with the text
+    for filename in (SENTENCES_FILE, EMBEDDINGS_FILE):
+        if os.path.exists(os.path.join(store_dir, filename)):
+            os.remove(os.path.join(store_dir, filename))
+    with open(os.path.join(store_dir, META_FILE), 'w', encoding='utf-8') as file:
+        json.dump({'speakers': sorted(int(speaker) for speaker in speakers)}, file)
+    return TranscriptStore(store_dir)
+
+
+class TranscriptStore:
+    """
+    Read-only view of an interview's columnar transcript. Arrays are memory maps
+    and texts are decoded from byte spans of text.bin only when asked for.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        if not os.path.exists(os.path.join(store_dir, TURNS_FILE)):
+            raise FileNotFoundError(f"No transcript store in '{store_dir}'. Run the transcription stage first.")
+        self.words = self._load(WORDS_FILE, WORD_DTYPE)
+        self.turns = self._load(TURNS_FILE, TURN_DTYPE)
+        self.sentences = self._load(SENTENCES_FILE, SENTENCE_DTYPE)
+        text_path = os.path.join(store_dir, TEXT_FILE)
+        self._text = np.memmap(text_path, dtype=np.uint8, mode='r') if os.path.getsize(text_path) else b''
+        with open(os.path.join(store_dir, META_FILE), 'r', encoding='utf-8') as file:
+            self.speakers = json.load(file)['speakers']
+
+    def _load(self, filename, dtype):
+        path = os.path.join(self.store_dir, filename)
+        if not os.path.exists(path):
+            return np.zeros(0, dtype=dtype)
+        try:
+            return np.load(path, mmap_mode='r')
+        except ValueError:
+            # An empty array cannot be memory-mapped
+            return np.load(path)
+
+    def text(self, start, end):
+        return bytes(self._text[start:end]).decode('utf-8')
+
+    def texts(self, rows):
+        """
+        Returns the text of each row of a words, turns or sentences array.
+        """
+        return [self.text(start, end) for start, end in zip(rows['text_start'], rows['text_end'])]
+
+    def full_text(self):
+        return ' '.join(self.texts(self.turns))
+
+    def embeddings(self):
+        """
+        Returns the sentence embeddings, memory-mapped, or None if they were not computed.
+        """
+        path = os.path.join(self.store_dir, EMBEDDINGS_FILE)
+        return np.load(path, mmap_mode='r') if os.path.exists(path) else None
+
+    def talk_time(self):
+        """
+        Returns each speaker's total speaking time in seconds (speakers who said nothing get 0).
+        """
+        totals = np.bincount(self.turns['speaker'], weights=self.turns['end'] - self.turns['start'],
+                             minlength=max(self.speakers, default=-1) + 1)
+        return {speaker: float(totals[speaker]) for speaker in self.speakers}
+
+    def candidate_speaker(self):
+        """
+        Returns the candidate's speaker label: the speaker with the most talk time,
+        or None if the transcript has no speakers.
+        """
+        talk_time = self.talk_time()
+        return max(talk_time, key=talk_time.get) if talk_time else None
+
+    def speaker_sentences(self, speaker=None):
+        """
+        Returns the sentence rows of one speaker, or all of them in time order.
+        """
+        if speaker is None:
+            return self.sentences
+        return self.sentences[self.sentences['speaker'] == speaker]
+
+    def write_sentences(self, turn_sentences):
+        """
+        Saves the sentences of every turn, locating each one in the turn's text to
+        record its byte span and the times of the words it covers.
+
+        Args:
+        - turn_sentences (list): For each turn, its sentences as found in the turn's text.
+
+        Returns:
+        - numpy.ndarray: The sentence rows.
+        """
+        rows = []
+        for turn, sentences in zip(self.turns, turn_sentences):
+            turn_text = self.text(turn['text_start'], turn['text_end'])
+            cursor = 0
+            byte_cursor = int(turn['text_start'])
+            for sentence in sentences:
+                found = turn_text.find(sentence, cursor)
+                if found == -1:
+                    continue
+                byte_cursor += len(turn_text[cursor:found].encode('utf-8'))
+                start = byte_cursor
+                byte_cursor += len(sentence.encode('utf-8'))
+                cursor = found + len(sentence)
+                rows.append((start, byte_cursor, int(turn['speaker'])))
+
+        sentences = np.zeros(len(rows), dtype=SENTENCE_DTYPE)
+        if rows:
+            spans = np.array(rows, dtype=np.int64)
+            sentences['text_start'], sentences['text_end'], sentences['speaker'] = spans[:, 0], spans[:, 1], spans[:, 2]
+            # The first and last words overlapping each sentence's byte span give its times
+            first = np.searchsorted(self.words['text_end'], sentences['text_start'], side='right')
+            last = np.searchsorted(self.words['text_start'], sentences['text_end'], side='left') - 1
+            first = np.clip(first, 0, len(self.words) - 1)
+            last = np.clip(np.maximum(last, first), 0, len(self.words) - 1)
+            sentences['start'] = self.words['start'][first]
+            sentences['end'] = self.words['end'][last]
+        # Embeddings are saved in sentence order, one row each
+        sentences['embedding_row'] = np.arange(len(sentences))
+        # The old memory map is dropped before its file is replaced (required on Windows)
+        self.sentences = sentences
+        _save_array(self.store_dir, SENTENCES_FILE, sentences)
+        if os.path.exists(os.path.join(self.store_dir, EMBEDDINGS_FILE)):
+            os.remove(os.path.join(self.store_dir, EMBEDDINGS_FILE))
+        self.sentences = self._load(SENTENCES_FILE, SENTENCE_DTYPE)
+        return self.sentences
+
+    def write_embeddings(self, embeddings):
+        """
+        Saves the sentence embeddings, one row per sentence in sentence order.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape[0] != len(self.sentences):
+            raise ValueError(f"{embeddings.shape[0]} embeddings for {len(self.sentences)} sentences")
+        _save_array(self.store_dir, EMBEDDINGS_FILE, embeddings)
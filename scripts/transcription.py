@@ -1,24 +1,77 @@
-import whisper
 import os
+import json
 import warnings
+import numpy as np
 
+import metrics
+from audio_processing import load_diarization
+import chunked_transcription
+import transcription_backends
+import transcript_store
 
-def transcribe_audio(audio_path, output_path):
+
+def use_chunked_transcription(audio, sr=chunked_transcription.SAMPLE_RATE):
+    """
+    Returns True when the audio is long enough, and enough workers are available,
+    for chunked parallel transcription to pay off.
+    """
+    if len(audio) / sr <= chunked_transcription.LONG_AUDIO_SECONDS:
+        return False
+    workers = chunked_transcription.TRANSCRIPTION_WORKERS or chunked_transcription.default_worker_count()
+    return workers > 1
+
+
+def audio_duration(audio_path):
+    """
+    Returns the duration of an audio file in seconds from its header, or 0 if it cannot be read.
+    """
+    try:
+        import soundfile as sf
+        return sf.info(audio_path).duration
+    except Exception:
+        return 0.0
+
+
+def run_whisper(model, audio_path, audio=None, diarization=None):
+    """
+    Transcribes with word timestamps: in one pass, or in parallel chunks for long audio.
+
+    The engine and decoding preset come from TRANSCRIPTION_BACKEND and TRANSCRIPTION_PRESET.
+    A loaded Whisper `model` is used as is for a single pass; chunk workers load their own.
+
+    Returns:
+    - dict: Whisper-style result with 'text' and 'segments'.
+    """
+    if audio is None and audio_duration(audio_path) > chunked_transcription.LONG_AUDIO_SECONDS:
+        # Long audio is decoded here so the chunks can be sliced from one buffer
+        from audio_io import decode_audio
+        audio = decode_audio(audio_path)
+    if audio is not None and use_chunked_transcription(audio):
+        return chunked_transcription.transcribe_chunked(audio, diarization=diarization)
+    if model is None:
+        backend = transcription_backends.get_backend()
+    else:
+        backend = transcription_backends.WhisperBackend(model=model)
+    return backend.transcribe(audio_path if audio is None else audio, word_timestamps=True)
+
+
+def transcribe_audio(audio_path, output_path, model=None):
     """
     Transcribes an audio file and saves the transcription to a text file.
+
+    Audio longer than LONG_AUDIO_SECONDS is split at silences and transcribed in parallel.
     
     Parameters:
         audio_path (str): Path to the audio file.
         output_path (str): Path to save the transcription.
+        model (whisper.Whisper, optional): Loaded Whisper model. Defaults to the shared registry model.
     """
     try:
         if not os.path.isfile(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
-        print(f"Loading Whisper model...")
-        model = whisper.load_model("base")
         print(f"Transcribing audio file: {audio_path}...")
-        result = model.transcribe(audio_path)
+        result = run_whisper(model, audio_path)
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -34,39 +87,169 @@ def transcribe_audio(audio_path, output_path):
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
 
+def assign_speakers(starts, ends, diarization):
+    """
+    Assigns each timed item to the diarization speaker at its midpoint.
+
+    Items whose midpoint falls between diarization segments go to the nearest segment.
+
+    Args:
+    - starts (numpy.ndarray): Start times in seconds.
+    - ends (numpy.ndarray): End times in seconds.
+    - diarization (numpy.ndarray): Segments with 'start', 'end' and 'speaker' fields, sorted by start.
+
+    Returns:
+    - numpy.ndarray: Speaker label of each item.
+    """
+    midpoints = (np.asarray(starts, dtype=np.float64) + np.asarray(ends, dtype=np.float64)) / 2
+    if len(diarization) == 0:
+        return np.zeros(midpoints.size, dtype=np.int32)
+
+    last = len(diarization) - 1
+    previous = np.clip(np.searchsorted(diarization['start'], midpoints, side='right') - 1, 0, last)
+    following = np.clip(previous + 1, 0, last)
+
+    inside = midpoints < diarization['end'][previous]
+    closer_to_previous = (midpoints - diarization['end'][previous]) <= (diarization['start'][following] - midpoints)
+    nearest = np.where(inside | closer_to_previous, previous, following)
+    return diarization['speaker'][nearest]
+
+
+def extract_words(result):
+    """
+    Flattens a Whisper result into timed words.
+
+    Falls back to whole segments when word timestamps are not available.
+
+    Returns:
+    - list: Dicts with 'word', 'start' and 'end'.
+    """
+    words = []
+    for segment in result.get('segments', []):
+        if segment.get('words'):
+            words.extend(
+                {'word': word['word'], 'start': float(word['start']), 'end': float(word['end'])}
+                for word in segment['words']
+            )
+        else:
+            words.append({'word': segment['text'], 'start': float(segment['start']), 'end': float(segment['end'])})
+    return words
+
+
+def group_into_turns(words):
+    """
+    Groups consecutive words of the same speaker into speaker turns.
+
+    Returns:
+    - list: Dicts with 'speaker', 'start', 'end', 'text' and 'words'.
+    """
+    turns = []
+    for word in words:
+        if turns and turns[-1]['speaker'] == word['speaker']:
+            turn = turns[-1]
+            turn['end'] = word['end']
+            turn['text'] += word['word']
+            turn['words'].append(word)
+        else:
+            turns.append({
+                'speaker': word['speaker'],
+                'start': word['start'],
+                'end': word['end'],
+                'text': word['word'],
+                'words': [word],
+            })
+    for turn in turns:
+        turn['text'] = turn['text'].strip()
+    return turns
+
+
+def save_transcript_text(text, output_path):
+    """
+    Saves a transcript as a single line of text.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def transcribe_with_speakers(audio_path, diarization, transcripts_dir, model=None, audio=None, store_dir=None):
+    """
+    Transcribes the interview once and derives the per-speaker transcripts from
+    the word timestamps and the diarization segments.
+
+    Writes main.txt, speaker<N>.txt for every diarized speaker, and segments.json
+    with the timed speaker turns.
+
+    Parameters:
+        audio_path (str): Path to the interview audio.
+        diarization (numpy.ndarray): Diarization segments from audio_processing.separate_speakers.
+        transcripts_dir (str): Directory for the transcript files.
+        model (whisper.Whisper, optional): Loaded Whisper model. Defaults to the shared registry model.
+        audio (numpy.ndarray, optional): Already decoded 16 kHz float32 samples of `audio_path`.
+            When given, Whisper reads the buffer instead of spawning ffmpeg again.
+            Audio longer than LONG_AUDIO_SECONDS is cut at speaker changes and transcribed in parallel.
+        store_dir (str, optional): If given, the timed words and speaker turns are also saved
+            to this columnar transcript store, which the later stages read.
+
+    Returns:
+        list: Timed speaker turns, or None on failure.
+    """
+    try:
+        if not os.path.isfile(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        print(f"Transcribing audio file: {audio_path}...")
+        result = run_whisper(model, audio_path, audio, diarization)
+
+        words = extract_words(result)
+        if words:
+            metrics.increment('audio_seconds_transcribed', words[-1]['end'])
+        metrics.increment('words_transcribed', len(words))
+        speakers = assign_speakers(
+            [word['start'] for word in words], [word['end'] for word in words], diarization
+        )
+        for word, speaker in zip(words, speakers):
+            word['speaker'] = int(speaker)
+
+        save_transcript_text(result['text'], os.path.join(transcripts_dir, 'main.txt'))
+
+        # speaker1.txt and speaker2.txt are always written since later stages expect both
+        speaker_labels = sorted(set(int(label) for label in diarization['speaker']) | {0, 1})
+        for label in speaker_labels:
+            speaker_text = "".join(word['word'] for word in words if word['speaker'] == label).strip()
+            save_transcript_text(speaker_text, os.path.join(transcripts_dir, f'speaker{label + 1}.txt'))
+
+        if store_dir:
+            transcript_store.write_transcript(store_dir, words, speaker_labels)
+
+        turns = group_into_turns(words)
+        with open(os.path.join(transcripts_dir, 'segments.json'), 'w', encoding='utf-8') as f:
+            json.dump(turns, f)
+
+        print(f"Transcription completed and saved to: {transcripts_dir}")
+        return turns
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+
 if __name__ == "__main__":
-    
+
     # Suppress all warnings (optional)
     warnings.filterwarnings("ignore")
 
     # Suppress specific warnings, e.g., FP16 warnings
     warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
 
+    audio_dir = os.path.join('..', 'data', 'audio')
+    transcripts_dir = os.path.join('..', 'data', 'transcripts')
+    main_audio_path = os.path.join(audio_dir, 'main.wav')
+    diarization_path = os.path.join(audio_dir, 'diarization.npy')
 
-    # Paths for Speaker 1 and Speaker 2 audio files
-    main_audio_path = '..\data\\audio\\main.wav'
-    speaker1_audio_path = '..\data\\audio\\speaker1.wav'
-    speaker2_audio_path = '..\data\\audio\\speaker2.wav'
-    
-    # Paths for transcription output files
-    main_transcription_path = '..\data\\transcripts\\main.txt'
-    speaker1_transcription_path = '..\data\\transcripts\\speaker1.txt'
-    speaker2_transcription_path = '..\data\\transcripts\\speaker2.txt'
-    
-    # Transcribe Main
-    if os.path.exists(main_audio_path):
-        transcribe_audio(main_audio_path, main_transcription_path)
-    else:
+    if not os.path.exists(main_audio_path):
         print(f"Error: Audio file '{main_audio_path}' does not exist.")
-
-    # Transcribe Speaker 1
-    if os.path.exists(speaker1_audio_path):
-        transcribe_audio(speaker1_audio_path, speaker1_transcription_path)
-    else:
-        print(f"Error: Audio file '{speaker1_audio_path}' does not exist.")
-    
-    # Transcribe Speaker 2
-    if os.path.exists(speaker2_audio_path):
-        transcribe_audio(speaker2_audio_path, speaker2_transcription_path)
+    elif not os.path.exists(diarization_path):
+        print(f"Error: Diarization file '{diarization_path}' does not exist. Run audio_processing.py first.")
     else:
-        print(f"Error: Audio file '{speaker2_audio_path}' does not exist.")
+        transcribe_with_speakers(main_audio_path, load_diarization(diarization_path), transcripts_dir)
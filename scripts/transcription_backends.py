@@ -0,0 +1,151 @@
+import os
+
+import model_registry
+
+# "whisper" (reference PyTorch model) or "faster-whisper" (CTranslate2, int8 on CPU)
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "whisper")
+# Decoding preset, see PRESETS
+TRANSCRIPTION_PRESET = os.getenv("TRANSCRIPTION_PRESET", "balanced")
+# CTranslate2 weight type for faster-whisper on CPU
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+
+# Decoding options per preset, in whisper's transcribe() vocabulary
+PRESETS = {
+    # Greedy decoding, no temperature fallback, every window decoded on its own
+    'fast': {
+        'beam_size': None,
+        'best_of': None,
+        'temperature': 0.0,
+        'condition_on_previous_text': False,
+    },
+    # whisper's transcribe() defaults: greedy with temperature fallback on failed windows
+    'balanced': {
+        'beam_size': None,
+        'best_of': None,
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'condition_on_previous_text': True,
+    },
+    # Beam search with temperature fallback, as whisper's command line uses
+    'accurate': {
+        'beam_size': 5,
+        'best_of': 5,
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'condition_on_previous_text': True,
+    },
+}
+
+
+class TranscriptionBackend:
+    """
+    Speech-to-text engine. Every backend returns whisper-style results, so the
+    rest of the pipeline does not depend on which one is used.
+    """
+
+    name = "base"
+
+    def __init__(self, model_name=model_registry.WHISPER_MODEL_NAME, preset=TRANSCRIPTION_PRESET):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown transcription preset '{preset}'. Presets: {', '.join(PRESETS)}")
+        self.model_name = model_name
+        self.preset = preset
+        self.options = PRESETS[preset]
+
+    def transcribe(self, audio, word_timestamps=True):
+        """
+        Transcribes a file path or 16 kHz mono float32 samples.
+
+        Returns:
+        - dict: {'text': str, 'segments': [{'start', 'end', 'text', 'words': [{'word', 'start', 'end'}]}]}
+        """
+        raise NotImplementedError
+
+
+class WhisperBackend(TranscriptionBackend):
+    """
+    Reference openai-whisper model.
+    """
+
+    name = "whisper"
+
+    def __init__(self, model_name=model_registry.WHISPER_MODEL_NAME, preset=TRANSCRIPTION_PRESET, model=None):
+        super().__init__(model_name, preset)
+        self._model = model
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = model_registry.get_whisper_model(self.model_name)
+        return self._model
+
+    def transcribe(self, audio, word_timestamps=True):
+        options = {key: value for key, value in self.options.items() if value is not None}
+        # FP16 only exists on GPU; asking for FP32 explicitly avoids the fallback warning on CPU
+        fp16 = getattr(self.model, 'device', None) is not None and self.model.device.type == 'cuda'
+        return self.model.transcribe(audio, word_timestamps=word_timestamps, fp16=fp16, **options)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """
+    CTranslate2 port of Whisper (faster-whisper), quantized to int8 on CPU.
+    """
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name=model_registry.WHISPER_MODEL_NAME, preset=TRANSCRIPTION_PRESET,
+                 compute_type=FASTER_WHISPER_COMPUTE_TYPE):
+        super().__init__(model_name, preset)
+        self.compute_type = compute_type
+
+    @property
+    def model(self):
+        return model_registry.get_faster_whisper_model(self.model_name, self.compute_type)
+
+    def transcribe(self, audio, word_timestamps=True):
+        options = self.options
+        temperature = options['temperature']
+        segments, _ = self.model.transcribe(
+            audio,
+            beam_size=options['beam_size'] or 1,
+            best_of=options['best_of'] or 1,
+            temperature=list(temperature) if isinstance(temperature, tuple) else temperature,
+            condition_on_previous_text=options['condition_on_previous_text'],
+            word_timestamps=word_timestamps,
+        )
+
+        result_segments = []
+        # Segments are decoded lazily while iterating
+        for segment in segments:
+            result_segments.append({
+                'start': float(segment.start),
+                'end': float(segment.end),
+                'text': segment.text,
+                'words': [
+                    {'word': word.word, 'start': float(word.start), 'end': float(word.end)}
+                    for word in (segment.words or [])
+                ],
+            })
+        return {'text': ''.join(segment['text'] for segment in result_segments), 'segments': result_segments}
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def get_backend(name=None, preset=None, model_name=None):
+    """
+    Returns a transcription backend.
+
+    Args:
+    - name (str, optional): Backend name. Defaults to TRANSCRIPTION_BACKEND.
+    - preset (str, optional): Decoding preset. Defaults to TRANSCRIPTION_PRESET.
+    - model_name (str, optional): Model size. Defaults to the registry's Whisper model.
+
+    Returns:
+    - TranscriptionBackend: The backend; its model is loaded on first use.
+    """
+    name = name or TRANSCRIPTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend '{name}'. Backends: {', '.join(BACKENDS)}")
+    return BACKENDS[name](model_name or model_registry.WHISPER_MODEL_NAME, preset or TRANSCRIPTION_PRESET)
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import time
+import argparse
+import numpy as np
+
+import model_registry
+import transcription_backends
+from audio_io import SAMPLE_RATE
+
+PROJECT_BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_AUDIO = os.path.join(PROJECT_BASE_PATH, 'data', 'audio', 'main.wav')
+
+
+def normalize_words(text):
+    """
+    Lowercases a transcript and splits it into words without punctuation.
+    """
+    return re.sub(r"[^\w\s']", ' ', text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Computes the word error rate (substitutions + deletions + insertions over reference words).
+
+    The edit distance is computed one row at a time with NumPy, so hour-long
+    transcripts stay fast.
+
+    Args:
+    - reference (str): Reference transcript.
+    - hypothesis (str): Transcript to score.
+
+    Returns:
+    - float: Word error rate, 0.0 for a perfect match.
+    """
+    reference_words = normalize_words(reference)
+    hypothesis_words = normalize_words(hypothesis)
+    if not reference_words:
+        return float(len(hypothesis_words) > 0)
+
+    vocabulary = {word: index for index, word in enumerate(set(reference_words) | set(hypothesis_words))}
+    hypothesis_ids = np.array([vocabulary[word] for word in hypothesis_words], dtype=np.int64)
+    columns = np.arange(len(hypothesis_words) + 1)
+
+    previous = columns.copy()
+    for row, word in enumerate(reference_words, start=1):
+        current = np.empty_like(previous)
+        current[0] = row
+        # Deletions and substitutions come from the previous row...
+        current[1:] = np.minimum(previous[1:] + 1, previous[:-1] + (hypothesis_ids != vocabulary[word]))
+        # ...and insertions chain along the row: current[j] = min(current[j], current[j - 1] + 1)
+        current = np.minimum.accumulate(current - columns) + columns
+        previous = current
+    return float(previous[-1]) / len(reference_words)
+
+
+def benchmark_backend(backend_name, preset, model_name, audio, reference):
+    """
+    Transcribes the audio with one backend and preset and scores it against the reference.
+
+    Returns:
+    - dict: Model load time, transcription time, real-time factor and word error rate.
+    """
+    backend = transcription_backends.get_backend(backend_name, preset, model_name)
+    start = time.perf_counter()
+    backend.model
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = backend.transcribe(audio, word_timestamps=False)
+    transcribe_seconds = time.perf_counter() - start
+
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        'backend': backend_name,
+        'preset': preset,
+        'model': model_name,
+        'status': 'ok',
+        'load_seconds': round(load_seconds, 3),
+        'transcribe_seconds': round(transcribe_seconds, 3),
+        'real_time_factor': round(transcribe_seconds / duration, 4) if duration else None,
+        'wer': round(word_error_rate(reference, result['text']), 4),
+    }
+
+
+def run_comparison(audio_path, reference_path, backends, presets, model_name):
+    """
+    Compares the accuracy and speed of every backend and preset on one recording.
+
+    Args:
+    - audio_path (str): Interview audio.
+    - reference_path (str): Reference transcript of the same audio.
+    - backends (list): Backend names.
+    - presets (list): Preset names.
+    - model_name (str): Model size used by every backend.
+
+    Returns:
+    - list: One result dict per backend and preset; unavailable backends are marked skipped.
+    """
+    from audio_io import decode_audio
+
+    audio = decode_audio(audio_path)
+    with open(reference_path, 'r', encoding='utf-8') as file:
+        reference = file.read()
+
+    results = []
+    for backend_name in backends:
+        for preset in presets:
+            print(f"Transcribing with {backend_name} ({preset})...")
+            try:
+                results.append(benchmark_backend(backend_name, preset, model_name, audio, reference))
+            except ImportError as e:
+                results.append({'backend': backend_name, 'preset': preset, 'model': model_name,
+                                'status': 'skipped', 'reason': f"missing dependency: {e}"})
+        # Free the model before loading the next backend's
+        model_registry.clear()
+    return results
+
+
+def print_results(results):
+    print(f"{'backend':<16}{'preset':<10}{'WER':>8}{'RTF':>10}{'load s':>10}")
+    for result in results:
+        if result['status'] != 'ok':
+            print(f"{result['backend']:<16}{result['preset']:<10}  {result['status']} ({result['reason']})")
+            continue
+        print(f"{result['backend']:<16}{result['preset']:<10}{result['wer']:>8.3f}"
+              f"{result['real_time_factor']:>10.3f}{result['load_seconds']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transcription backends and presets: accuracy vs speed.")
+    parser.add_argument('--audio', default=DEFAULT_AUDIO, help="Audio (or video) to transcribe.")
+    # No default: data/transcripts/main.txt is Whisper's own output, and scoring against it would
+    # measure agreement with one preset instead of accuracy
+    parser.add_argument('--reference', required=True,
+                        help="Human-made reference transcript of the audio (not a Whisper transcript).")
+    parser.add_argument('--backends', default=','.join(transcription_backends.BACKENDS),
+                        help="Comma-separated backends to compare.")
+    parser.add_argument('--presets', default=','.join(transcription_backends.PRESETS),
+                        help="Comma-separated presets to compare.")
+    parser.add_argument('--model', default=model_registry.WHISPER_MODEL_NAME, help="Model size.")
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    for path in (args.audio, args.reference):
+        if not os.path.exists(path):
+            parser.error(f"file not found: {path}")
+
+    results = run_comparison(args.audio, args.reference, args.backends.split(','), args.presets.split(','),
+                             args.model)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results saved at: {args.output}")
+
+if __name__ == "__main__":
+    main()
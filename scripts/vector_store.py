@@ -0,0 +1,486 @@
+import os
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Names of the three indexes used by the pipeline
+INTERVIEWER_INDEX_NAME = "interviewer-index"
+CANDIDATE_INDEX_NAME = "candidate-index"
+MAIN_INDEX_NAME = "main-index"
+
+# Backend selection: "pinecone" (default) or "local"
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+VECTOR_STORE_DIR = os.getenv(
+    "VECTOR_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'vector_store')
+)
+
+# Approximate (IVF) search for large local collections
+LOCAL_ANN_ENABLED = os.getenv("VECTOR_STORE_ANN", "0") == "1"
+LOCAL_ANN_MIN_VECTORS = int(os.getenv("VECTOR_STORE_ANN_MIN_VECTORS", "50000"))
+LOCAL_ANN_NPROBE = int(os.getenv("VECTOR_STORE_ANN_NPROBE", "8"))
+
+PINECONE_CLOUD = "aws"
+PINECONE_REGION = "us-east-1"
+PINECONE_QUERY_WORKERS = int(os.getenv("PINECONE_QUERY_WORKERS", "8"))
+# Most ids Pinecone accepts in one delete request
+PINECONE_DELETE_BATCH_SIZE = 1000
+
+DEFAULT_NAMESPACE = "__default__"
+
+# Interview (and namespace) used when the scripts are run on their own
+DEFAULT_INTERVIEW_ID = os.getenv("INTERVIEW_ID", "interview_video")
+
+
+def _normalize_vectors(vectors):
+    """
+    Returns float32 copies of the vectors scaled to unit length.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _parse_records(vectors):
+    """
+    Accepts Pinecone-style upsert records, either (id, values, metadata) tuples or
+    dicts with 'id', 'values' and 'metadata', and returns ids, values and metadata lists.
+    """
+    ids, values, metadata = [], [], []
+    for record in vectors:
+        if isinstance(record, dict):
+            ids.append(str(record['id']))
+            values.append(record['values'])
+            metadata.append(record.get('metadata') or {})
+        else:
+            ids.append(str(record[0]))
+            values.append(record[1])
+            metadata.append(record[2] if len(record) > 2 else {})
+    return ids, values, metadata
+
+
+class VectorStore:
+    """
+    Interface shared by every vector store backend.
+
+    Mirrors the subset of the Pinecone Index API the pipeline uses, so the
+    backends are interchangeable.
+    """
+
+    def upsert(self, vectors, namespace=""):
+        """
+        Inserts or replaces vectors given as (id, values, metadata) records.
+        """
+        raise NotImplementedError
+
+    def query(self, vector, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        """
+        Returns {'matches': [...]} with the top_k most similar vectors by cosine similarity.
+        """
+        raise NotImplementedError
+
+    def query_many(self, vectors, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        """
+        Runs several queries against the index and returns one list of matches per query vector.
+        """
+        return [
+            self.query(vector, top_k=top_k, include_metadata=include_metadata,
+                       include_values=include_values, namespace=namespace)['matches']
+            for vector in vectors
+        ]
+
+    def list_ids(self, namespace=""):
+        """
+        Returns the ids of every vector in a namespace.
+        """
+        raise NotImplementedError
+
+    def delete(self, ids, namespace=""):
+        """
+        Deletes vectors by id. Unknown ids are ignored.
+        """
+        raise NotImplementedError
+
+    def delete_namespace(self, namespace):
+        """
+        Deletes every vector in a namespace. Deleting a missing namespace is not an error.
+        """
+        raise NotImplementedError
+
+
+class PineconeVectorStore(VectorStore):
+    """
+    Vector store backed by a Pinecone serverless index.
+    """
+
+    def __init__(self, index_name, dimension, api_key=None):
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=api_key or os.getenv("PINECONE_API_KEY"))
+        if index_name not in pc.list_indexes().names():
+            print(f"Creating index: {index_name}")
+            pc.create_index(
+                name=index_name,
+                dimension=dimension,
+                metric='cosine',
+                spec=ServerlessSpec(cloud=PINECONE_CLOUD, region=PINECONE_REGION)
+            )
+        else:
+            # Validate existing index dimension
+            index_info = pc.describe_index(index_name)
+            if index_info.dimension != dimension:
+                raise ValueError(f"Existing index dimension {index_info.dimension} does not match required dimension {dimension}")
+
+        self.name = index_name
+        self.index = pc.Index(index_name)
+
+    def upsert(self, vectors, namespace=""):
+        return self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def query(self, vector, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        return self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=include_metadata,
+            include_values=include_values,
+            namespace=namespace
+        )
+
+    def query_many(self, vectors, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        # The serverless query API takes one vector per request, so the requests are sent in parallel
+        def query_one(vector):
+            return self.query(np.asarray(vector).tolist(), top_k=top_k, include_metadata=include_metadata,
+                              include_values=include_values, namespace=namespace)['matches']
+
+        with ThreadPoolExecutor(max_workers=max(1, min(PINECONE_QUERY_WORKERS, len(vectors)))) as executor:
+            return list(executor.map(query_one, vectors))
+
+    def list_ids(self, namespace=""):
+        # Paginated; each page is a list of ids
+        return [vector_id for page in self.index.list(namespace=namespace) for vector_id in page]
+
+    def delete(self, ids, namespace=""):
+        for start in range(0, len(ids), PINECONE_DELETE_BATCH_SIZE):
+            self.index.delete(ids=ids[start:start + PINECONE_DELETE_BATCH_SIZE], namespace=namespace)
+
+    def delete_namespace(self, namespace):
+        try:
+            self.index.delete(delete_all=True, namespace=namespace)
+        except Exception as e:
+            # Pinecone reports a missing namespace as a 404
+            if getattr(e, 'status', None) != 404:
+                raise
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Embedded vector store kept on local disk.
+
+    Each namespace is a directory holding a memory-mapped float32 matrix of
+    unit-length vectors (vectors.bin, one row per vector) and an append-only log
+    of ids and metadata (records.jsonl, one line per upserted vector with its row).
+    An upsert writes only its own rows and log lines, so ingest cost grows with the
+    batch, not with the namespace. Queries are an exact cosine search done as one
+    matrix product; large namespaces can optionally use an approximate IVF index.
+    """
+
+    VECTORS_FILE = 'vectors.bin'
+    RECORDS_FILE = 'records.jsonl'
+
+    def __init__(self, index_name, dimension, base_dir=VECTOR_STORE_DIR,
+                 ann_enabled=LOCAL_ANN_ENABLED, ann_min_vectors=LOCAL_ANN_MIN_VECTORS, ann_nprobe=LOCAL_ANN_NPROBE):
+        self.name = index_name
+        self.dimension = dimension
+        self.index_dir = os.path.join(base_dir, index_name)
+        self.ann_enabled = ann_enabled
+        self.ann_min_vectors = ann_min_vectors
+        self.ann_nprobe = ann_nprobe
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _namespace_dir(self, namespace):
+        return os.path.join(self.index_dir, namespace or DEFAULT_NAMESPACE)
+
+    def _map_vectors(self, namespace_dir, count):
+        if count == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.memmap(os.path.join(namespace_dir, self.VECTORS_FILE), dtype=np.float32, mode='r',
+                         shape=(count, self.dimension))
+
+    def _write_namespace(self, namespace_dir, vectors, ids, metadata):
+        """
+        Writes a whole namespace from scratch, through temporary files swapped in.
+        """
+        os.makedirs(namespace_dir, exist_ok=True)
+        vectors_path = os.path.join(namespace_dir, self.VECTORS_FILE)
+        records_path = os.path.join(namespace_dir, self.RECORDS_FILE)
+        with open(f"{vectors_path}.tmp", 'wb') as file:
+            file.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(f"{records_path}.tmp", 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps({'id': vector_id, 'row': row, 'metadata': meta}) + '\n'
+                            for row, (vector_id, meta) in enumerate(zip(ids, metadata)))
+        os.replace(f"{vectors_path}.tmp", vectors_path)
+        os.replace(f"{records_path}.tmp", records_path)
+        ivf_path = os.path.join(namespace_dir, 'ivf.npz')
+        if os.path.exists(ivf_path):
+            os.remove(ivf_path)
+
+    def _migrate(self, namespace_dir):
+        """
+        Converts a namespace saved by older versions (vectors.npy and records.json).
+        """
+        with open(os.path.join(namespace_dir, 'records.json'), 'r', encoding='utf-8') as file:
+            records = json.load(file)
+        self._write_namespace(namespace_dir, np.load(os.path.join(namespace_dir, 'vectors.npy')),
+                              records['ids'], records['metadata'])
+        os.remove(os.path.join(namespace_dir, 'vectors.npy'))
+        os.remove(os.path.join(namespace_dir, 'records.json'))
+
+    def _load(self, namespace):
+        """
+        Returns the cached vectors, ids, metadata and id positions of a namespace,
+        memory-mapping the vectors and reloading them if another writer changed the files.
+        """
+        namespace_dir = self._namespace_dir(namespace)
+        records_path = os.path.join(namespace_dir, self.RECORDS_FILE)
+        if not os.path.exists(records_path) and os.path.exists(os.path.join(namespace_dir, 'records.json')):
+            self._migrate(namespace_dir)
+        mtime = os.path.getmtime(records_path) if os.path.exists(records_path) else None
+
+        cached = self._namespaces.get(namespace)
+        if cached is not None and cached['mtime'] == mtime:
+            return cached
+
+        ids, metadata = [], []
+        if mtime is not None:
+            with open(records_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.endswith('\n'):
+                        # Cut short by an interrupted write; its vector is ignored too
+                        break
+                    record = json.loads(line)
+                    if record['row'] == len(ids):
+                        ids.append(record['id'])
+                        metadata.append(record['metadata'])
+                    else:
+                        # A later upsert of an existing id
+                        metadata[record['row']] = record['metadata']
+
+        cached = {
+            'mtime': mtime,
+            'vectors': self._map_vectors(namespace_dir, len(ids)),
+            'ids': ids,
+            'metadata': metadata,
+            'positions': {vector_id: i for i, vector_id in enumerate(ids)},
+            'ivf': None,
+        }
+        self._namespaces[namespace] = cached
+        return cached
+
+    def upsert(self, vectors, namespace=""):
+        ids, values, metadata = _parse_records(vectors)
+        if not ids:
+            return {'upserted_count': 0}
+        values = _normalize_vectors(values)
+        if values.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {values.shape[1]} does not match index dimension {self.dimension}")
+
+        with self._lock:
+            current = self._load(namespace)
+            positions = current['positions']
+            count = len(current['ids'])
+
+            # Existing ids are overwritten in place, new ids are appended
+            rows = []
+            new_count = count
+            for vector_id in ids:
+                row = positions.get(vector_id)
+                if row is None:
+                    row = positions[vector_id] = new_count
+                    new_count += 1
+                rows.append(row)
+            rows = np.array(rows)
+
+            namespace_dir = self._namespace_dir(namespace)
+            os.makedirs(namespace_dir, exist_ok=True)
+            vectors_path = os.path.join(namespace_dir, self.VECTORS_FILE)
+            records_path = os.path.join(namespace_dir, self.RECORDS_FILE)
+            row_bytes = self.dimension * np.dtype(np.float32).itemsize
+            try:
+                with open(vectors_path, 'r+b' if os.path.exists(vectors_path) else 'wb') as file:
+                    for row, vector in zip(rows[rows < count], values[rows < count]):
+                        file.seek(int(row) * row_bytes)
+                        file.write(vector.tobytes())
+                    appended = np.zeros((new_count - count, self.dimension), dtype=np.float32)
+                    # The last record of a repeated id wins, as it does for the metadata
+                    appended[rows[rows >= count] - count] = values[rows >= count]
+                    # Written at the end of the known rows, over any rows of an interrupted write
+                    file.seek(count * row_bytes)
+                    file.write(appended.tobytes())
+                    file.truncate()
+                # The vectors are written before the log lines that make them visible
+                with open(records_path, 'a', encoding='utf-8') as file:
+                    file.write(''.join(json.dumps({'id': vector_id, 'row': int(row), 'metadata': meta}) + '\n'
+                                       for vector_id, row, meta in zip(ids, rows, metadata)))
+            except BaseException:
+                # The cached namespace no longer matches the files; it is read back on next use
+                self._namespaces.pop(namespace, None)
+                raise
+
+            for vector_id, row, meta in zip(ids, rows, metadata):
+                if row < len(current['ids']):
+                    current['metadata'][row] = meta
+                else:
+                    current['ids'].append(vector_id)
+                    current['metadata'].append(meta)
+            current['vectors'] = self._map_vectors(namespace_dir, new_count)
+            current['mtime'] = os.path.getmtime(records_path)
+            current['ivf'] = None
+            ivf_path = os.path.join(namespace_dir, 'ivf.npz')
+            if os.path.exists(ivf_path):
+                os.remove(ivf_path)
+
+        return {'upserted_count': len(ids)}
+
+    def list_ids(self, namespace=""):
+        return list(self._load(namespace)['ids'])
+
+    def delete(self, ids, namespace=""):
+        # Rare (once per re-ingest), so the namespace is simply rewritten without the deleted rows
+        with self._lock:
+            current = self._load(namespace)
+            doomed = set(ids)
+            keep = [row for row, vector_id in enumerate(current['ids']) if vector_id not in doomed]
+            if len(keep) == len(current['ids']):
+                return
+            self._write_namespace(self._namespace_dir(namespace), np.asarray(current['vectors'])[keep],
+                                  [current['ids'][row] for row in keep], [current['metadata'][row] for row in keep])
+            self._namespaces.pop(namespace, None)
+
+    def delete_namespace(self, namespace):
+        with self._lock:
+            shutil.rmtree(self._namespace_dir(namespace), ignore_errors=True)
+            self._namespaces.pop(namespace, None)
+
+    def _candidate_rows(self, data, namespace, query_vector):
+        """
+        Returns the rows to score: all rows for exact search, or the members of the
+        nearest IVF clusters when approximate search applies.
+        """
+        count = len(data['ids'])
+        if not self.ann_enabled or count < self.ann_min_vectors:
+            return None
+        if data['ivf'] is None:
+            data['ivf'] = self._load_or_build_ivf(data['vectors'], namespace)
+        centroids, order, offsets = data['ivf']
+        nprobe = min(self.ann_nprobe, len(centroids))
+        nearest = np.argpartition(-(centroids @ query_vector), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([order[offsets[c]:offsets[c + 1]] for c in nearest]))
+
+    def _load_or_build_ivf(self, vectors, namespace, iterations=10, seed=0):
+        """
+        Loads the IVF index of a namespace, building it with spherical k-means if missing.
+
+        Returns:
+        - tuple: (centroids, row order grouped by cluster, cluster offsets into that order).
+        """
+        ivf_path = os.path.join(self._namespace_dir(namespace), 'ivf.npz')
+        if os.path.exists(ivf_path):
+            with np.load(ivf_path) as ivf:
+                return ivf['centroids'], ivf['order'], ivf['offsets']
+
+        vectors = np.asarray(vectors)
+        n_clusters = max(1, int(np.sqrt(len(vectors))))
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors)
+            empty = np.bincount(assignments, minlength=n_clusters) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize_vectors(sums)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=n_clusters))))
+        np.savez(ivf_path, centroids=centroids, order=order, offsets=offsets)
+        return centroids, order, offsets
+
+    def _matches(self, data, scores, rows, top_k, include_metadata, include_values):
+        """
+        Turns the scores of the candidate rows into Pinecone-style matches, best first.
+        """
+        top_k = min(top_k, len(scores))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        best_rows = best if rows is None else rows[best]
+
+        matches = []
+        for rank, row in zip(best, best_rows):
+            match = {'id': data['ids'][row], 'score': float(scores[rank])}
+            if include_metadata:
+                match['metadata'] = data['metadata'][row]
+            if include_values:
+                match['values'] = np.asarray(data['vectors'][row]).tolist()
+            matches.append(match)
+        return matches
+
+    def query(self, vector, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        data = self._load(namespace)
+        if not data['ids']:
+            return {'matches': []}
+
+        query_vector = _normalize_vectors(vector)
+        rows = self._candidate_rows(data, namespace, query_vector)
+        candidates = data['vectors'] if rows is None else data['vectors'][rows]
+        scores = candidates @ query_vector
+        return {'matches': self._matches(data, scores, rows, top_k, include_metadata, include_values)}
+
+    def query_many(self, vectors, top_k=5, include_metadata=True, include_values=False, namespace=""):
+        data = self._load(namespace)
+        query_vectors = _normalize_vectors(np.atleast_2d(vectors))
+        if not data['ids']:
+            return [[] for _ in query_vectors]
+        if self.ann_enabled and len(data['ids']) >= self.ann_min_vectors:
+            return super().query_many(query_vectors, top_k, include_metadata, include_values, namespace)
+
+        # Every query is scored in a single matrix product
+        scores = query_vectors @ np.asarray(data['vectors']).T
+        return [
+            self._matches(data, query_scores, None, top_k, include_metadata, include_values)
+            for query_scores in scores
+        ]
+
+
+# Index handles are opened once per process and reused
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(index_name, dimension, api_key=None, backend=None):
+    """
+    Returns the vector store for an index, using the backend chosen by VECTOR_STORE_BACKEND.
+
+    Args:
+    - index_name (str): Name of the index.
+    - dimension (int): Embedding dimension.
+    - api_key (str, optional): Pinecone API key. Defaults to PINECONE_API_KEY.
+    - backend (str, optional): Overrides VECTOR_STORE_BACKEND ("pinecone" or "local").
+
+    Returns:
+    - VectorStore: The index.
+    """
+    backend = backend or VECTOR_STORE_BACKEND
+    key = (backend, index_name, dimension)
+    with _indexes_lock:
+        if key not in _indexes:
+            if backend == "local":
+                _indexes[key] = LocalVectorStore(index_name, dimension)
+            elif backend == "pinecone":
+                _indexes[key] = PineconeVectorStore(index_name, dimension, api_key)
+            else:
+                raise ValueError(f"Unknown vector store backend: {backend}")
+        return _indexes[key]
@@ -1,16 +1,34 @@
-import ffmpeg
 import os
 
-def extract_audio(video_path, audio_output_path):
+from audio_io import decode_audio, SAMPLE_RATE
+import metrics
+
+def extract_audio(video_path, audio_output_path, mmap_path=None):
+    """
+    Decodes the interview audio once and saves it as a 16 kHz mono WAV.
+
+    Args:
+    - video_path (str): Path to the interview video.
+    - audio_output_path (str): Path of the WAV file to write.
+    - mmap_path (str, optional): Keep the decoded samples in this memory-mapped raw float32 file.
+
+    Returns:
+    - numpy.ndarray: The decoded samples, to be shared by the later stages.
+    """
     if not os.path.isfile(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
     # Ensure output directory exists
     os.makedirs(os.path.dirname(audio_output_path), exist_ok=True)
     
-    # Extract audio using ffmpeg
-    ffmpeg.input(video_path).output(audio_output_path, ac=1, ar=16000).run()
+    import soundfile as sf
+
+    # Decode once with ffmpeg; the WAV is written from the in-memory buffer
+    audio = decode_audio(video_path, mmap_path=mmap_path)
+    sf.write(audio_output_path, audio, SAMPLE_RATE)
+    metrics.increment('audio_seconds_decoded', len(audio) / SAMPLE_RATE)
     print(f"Audio extracted successfully to: {audio_output_path}")
+    return audio
 
 if __name__ == "__main__":
     # Input video path (relative path from scripts directory)
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+
+from benchmark import configure_stand_ins, HashingEmbedder
+
+# The pipeline modules read their settings on import, so the stand-ins are configured first:
+# the local vector store and lexical indexes in a scratch directory, and the stub LLM
+WORK_DIR = tempfile.mkdtemp(prefix='interview-tests-')
+configure_stand_ins(WORK_DIR, llm_latency=0)
+os.environ['LEXICAL_INDEX_DIR'] = os.path.join(WORK_DIR, 'lexical_index')
+
+
+@pytest.fixture
+def embedding_model(monkeypatch):
+    """
+    Offline embedding model used wherever the pipeline asks the registry for the SentenceTransformer.
+    """
+    import model_registry
+
+    model = HashingEmbedder()
+    monkeypatch.setattr(model_registry, 'get_sentence_transformer', lambda *args, **kwargs: model)
+    return model
+
+
+# Sentences of each turn of the test transcript; turn i is spoken by speaker i % 2
+TURNS = [
+    ["Can you tell me about a project you are proud of?"],
+    ["We built a data pipeline.", "I led the design of the storage layer."],
+    ["How did you handle disagreements within your team?"],
+    ["I listened to both sides, um, and we agreed on the tradeoffs early."],
+]
+
+
+@pytest.fixture
+def write_store(embedding_model):
+    """
+    Returns a function writing the test transcript, its sentences and their embeddings
+    to a transcript store, given the store directory and the diarized speaker labels.
+    """
+    import transcript_store
+
+    def write(store_dir, speakers=(0, 1)):
+        words = []
+        for turn, sentences in enumerate(TURNS):
+            for i, word in enumerate(" ".join(sentences).split()):
+                start = turn * 10.0 + i * 0.4
+                words.append({'word': (' ' if i else '') + word, 'start': start, 'end': start + 0.3,
+                              'speaker': turn % 2})
+        store = transcript_store.write_transcript(store_dir, words, speakers)
+        store.write_sentences(TURNS)
+        store = transcript_store.TranscriptStore(store_dir)
+        store.write_embeddings(embedding_model.encode(store.texts(store.sentences)))
+        return store
+
+    return write
@@ -0,0 +1,19 @@
+import os
+
+import numpy as np
+
+from audio_processing import separate_speakers
+from benchmark import _synthesize_voice
+
+
+def test_single_speaker_writes_every_speaker_track(tmp_path):
+    audio = _synthesize_voice(6.0, 120.0, np.random.default_rng(0))
+    speaker_paths = [str(tmp_path / 'speaker1.wav'), str(tmp_path / 'speaker2.wav')]
+
+    diarization = separate_speakers(str(tmp_path / 'main.wav'), speaker_paths, audio=audio,
+                                    n_speakers=1, backend='embedding')
+
+    assert diarization is not None
+    assert set(diarization['speaker']) == {0}
+    for path in speaker_paths:
+        assert os.path.exists(path)
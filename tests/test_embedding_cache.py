@@ -0,0 +1,13 @@
+import model_registry
+from embedding_cache import encode_with_cache
+from embeddings_and_pinecone_store import EMBEDDING_DIMENSION
+
+
+def test_empty_input_does_not_load_the_model(monkeypatch):
+    def load(*args, **kwargs):
+        raise AssertionError("the embedding model was loaded for empty input")
+
+    monkeypatch.setattr(model_registry, 'get_sentence_transformer', load)
+    embeddings = encode_with_cache([])
+
+    assert embeddings.shape == (0, EMBEDDING_DIMENSION)
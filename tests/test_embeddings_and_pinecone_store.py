@@ -0,0 +1,20 @@
+import vector_store
+import lexical_index
+from embeddings_and_pinecone_store import store_interview_embeddings, init_pinecone, EMBEDDING_DIMENSION
+
+
+def test_transcript_without_speakers_fills_only_the_main_index(tmp_path, write_store):
+    interview_id = 'no-speakers'
+    interviewer_index, candidate_index, main_index = init_pinecone(None, "us-east-1")
+    # Left over from an earlier run of the same interview
+    interviewer_index.upsert(vectors=[('stale', [1.0] * EMBEDDING_DIMENSION, {})], namespace=interview_id)
+
+    store = write_store(str(tmp_path / 'store'), speakers=[])
+    assert store.candidate_speaker() is None
+    store_interview_embeddings(str(tmp_path / 'store'), interview_id)
+
+    assert len(main_index.list_ids(interview_id)) == len(store.sentences)
+    for index in (interviewer_index, candidate_index):
+        assert index.list_ids(interview_id) == []
+        assert lexical_index.get_index(index.name, interview_id) is None
+    assert lexical_index.get_index(vector_store.MAIN_INDEX_NAME, interview_id) is not None
@@ -0,0 +1,38 @@
+import os
+
+import retrieval
+import streaming
+import summary_engine
+from main import get_paths, SUMMARY_FILES
+
+SENTENCES = [
+    "Can you tell me about a project you are proud of?",
+    "We built a data pipeline that processed customer events in real time.",
+    "I led the design of the storage layer and coordinated the deployment.",
+    "How did you handle disagreements within your team?",
+    "I listened to both sides and we agreed on the tradeoffs early.",
+]
+
+
+def test_live_summaries_get_context(tmp_path, embedding_model, monkeypatch):
+    paths = get_paths(str(tmp_path), interview_id='live-test')
+    session = streaming.StreamingSession(paths, backend=object())
+    session.store_sentences(SENTENCES)
+
+    retrieved = {}
+    retrieve = retrieval.retrieve
+
+    def recording_retrieve(plans, **settings):
+        matches = retrieve(plans, **settings)
+        retrieved.update(matches)
+        return matches
+
+    monkeypatch.setattr(retrieval, 'retrieve', recording_retrieve)
+    streaming.request_summaries(paths)
+
+    assert set(retrieved) == {analysis['name'] for analysis in summary_engine.build_analyses()}
+    for name, matches_by_index in retrieved.items():
+        for index_name, matches in matches_by_index.items():
+            assert matches, f"{name} got no context from {index_name}"
+    for filename in SUMMARY_FILES:
+        assert os.path.exists(os.path.join(paths['outputs_dir'], filename))
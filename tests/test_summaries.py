@@ -0,0 +1,51 @@
+import os
+
+import summary_engine
+import communication_style_summary
+import active_listening_summary
+import engagement_summary
+import rag_summary_generating
+from interview_metrics import save_interview_metrics
+from embeddings_and_pinecone_store import store_interview_embeddings
+from llm_cache import TextResponse
+
+
+class RecordingModel:
+    """
+    Stand-in LLM that records the prompts it is sent.
+    """
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return TextResponse("Summary.")
+
+
+def test_standalone_prompts_match_the_engine(tmp_path, write_store, embedding_model):
+    interview_id = 'standalone'
+    store_dir = str(tmp_path / 'store')
+    project_dir = str(tmp_path)
+    write_store(store_dir)
+    store_interview_embeddings(store_dir, interview_id)
+    save_interview_metrics(store_dir, os.path.join(project_dir, 'outputs', summary_engine.INTERVIEW_METRICS_FILENAME))
+    settings = {'PINECONE_API_KEY': None, 'project_base_path': project_dir, 'embedding_model': embedding_model,
+                'embedding_dimension': embedding_model.dimension, 'interview_id': interview_id}
+
+    engine_model = RecordingModel()
+    summary_engine.generate_all_summaries(engine_model, **settings)
+
+    standalone_model = RecordingModel()
+    communication_style_summary.generate_communication_style_summary(
+        communication_style_summary.COMMUNICATION_STYLE_QUERY, gemini_model=standalone_model, **settings)
+    active_listening_summary.generate_active_listening_summary(
+        active_listening_summary.ACTIVE_LISTENING_QUERY, gemini_model=standalone_model, **settings)
+    engagement_summary.generate_summary(
+        engagement_summary.ENGAGEMENT_QUERY, gemini_model=standalone_model, analysis_type='engagement', **settings)
+    rag_summary_generating.generate_interview_summary(
+        rag_summary_generating.INTERVIEW_SUMMARY_QUERY, gemini_model=standalone_model, **settings)
+
+    assert sorted(standalone_model.prompts) == sorted(engine_model.prompts)
+    for prompt in standalone_model.prompts:
+        assert "Measured Timing" in prompt